@@ -0,0 +1,97 @@
+# bench_fast_classifier.py
+"""
+Hit rate, accuracy and latency of the rule-based fast path
+(fraud_ai.fast_classifier) on the labelled corpus fast_path_corpus.jsonl.
+
+    python bench_fast_classifier.py
+    python bench_fast_classifier.py --llm      # also label every line with the LLM
+
+hit rate  = share of utterances answered locally (no LLM round trip)
+accuracy  = share of those answers matching the corpus label
+With --llm, the LLM's own accuracy on the whole corpus and the fast path's
+agreement with the LLM on its hits are reported as well.
+"""
+import argparse
+import asyncio
+import json
+import time
+from collections import defaultdict
+from fraud_ai.fast_classifier import FAST_PATH_THRESHOLD, fast_classify
+
+CONTEXT = {
+    "user_verification": "Hello, this is the fraud prevention service. Am I speaking with Mario Rossi?",
+    "user_reply": "Did you authorise $150.00 at Amazon on 2024-05-02 14:10?",
+    "investigation": "Have you noticed any suspicious emails, SMS or calls from people pretending to be bank staff?",
+    "help": "Your card has been blocked. Do you need any other assistance?",
+}
+
+
+def load_corpus(path):
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+async def llm_labels(corpus):
+    from fraud_ai import llm_agent
+    prompts = {
+        "user_verification": (llm_agent._user_verification_prompt, llm_agent.USER_VERIFICATION_LABELS),
+        "user_reply": (llm_agent._user_reply_prompt, llm_agent.USER_REPLY_LABELS),
+        "investigation": (llm_agent._investigation_prompt, llm_agent.INVESTIGATION_LABELS),
+        "help": (llm_agent._help_prompt, llm_agent.HELP_LABELS),
+    }
+
+    async def one(row):
+        build, labels = prompts[row["classifier"]]
+        history = [{"role": "assistant", "content": CONTEXT[row["classifier"]]},
+                   {"role": "user", "content": row["text"]}]
+        # straight to the LLM, bypassing the fast path
+        return await llm_agent._classify_async(build(row["text"], history, ""), labels)
+
+    return await asyncio.gather(*[one(row) for row in corpus])
+
+
+def main(args):
+    corpus = load_corpus(args.corpus)
+    llm = asyncio.run(llm_labels(corpus)) if args.llm else [None] * len(corpus)
+
+    per = defaultdict(lambda: defaultdict(int))
+    start = time.perf_counter()
+    results = [fast_classify(row["classifier"], row["text"]) for row in corpus]
+    elapsed = time.perf_counter() - start
+
+    for row, result, llm_label in zip(corpus, results, llm):
+        c = per[row["classifier"]]
+        c["total"] += 1
+        hit = result is not None and result.label and result.confidence >= args.threshold
+        if hit:
+            c["hits"] += 1
+            c["correct"] += result.label == row["label"]
+            if llm_label is not None:
+                c["agree"] += result.label == llm_label
+            if result.label != row["label"] and args.verbose:
+                print(f"  wrong  {row['classifier']:<18} {row['text']!r}: {result.label} (want {row['label']})")
+        if llm_label is not None:
+            c["llm_correct"] += llm_label == row["label"]
+
+    header = f"{'classifier':<18} {'n':>4} {'hit rate':>9} {'accuracy':>9}"
+    if args.llm:
+        header += f" {'llm acc':>8} {'agree':>7}"
+    print(header)
+    for name, c in list(per.items()) + [("ALL", {k: sum(p[k] for p in per.values())
+                                                 for k in ("total", "hits", "correct", "agree", "llm_correct")})]:
+        line = (f"{name:<18} {c['total']:>4} {c['hits'] / c['total']:>8.0%} "
+                f"{(c['correct'] / c['hits'] if c['hits'] else 0):>9.0%}")
+        if args.llm:
+            line += (f" {c['llm_correct'] / c['total']:>8.0%}"
+                     f" {(c['agree'] / c['hits'] if c['hits'] else 0):>7.0%}")
+        print(line)
+    print(f"\nfast path: {elapsed / len(corpus) * 1e6:.1f} µs per utterance")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Fast-path classifier hit rate / accuracy")
+    parser.add_argument("--corpus", default="fast_path_corpus.jsonl")
+    parser.add_argument("--threshold", type=float, default=FAST_PATH_THRESHOLD)
+    parser.add_argument("--llm", action="store_true", help="compare with the LLM classifiers (needs an OpenAI key)")
+    parser.add_argument("-v", "--verbose", action="store_true", help="print wrong fast-path answers")
+    main(parser.parse_args())
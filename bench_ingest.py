@@ -0,0 +1,91 @@
+# bench_ingest.py
+"""
+Compare the per-row create_transaction path with bulk_create_transactions.
+
+    python bench_ingest.py --rows 20000 --batch-size 1000
+
+Each path writes to its own throw-away SQLite file, so the real fraud_ai.db
+is never touched.
+"""
+import argparse
+import logging
+import os
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from fraud_ai.models import Base
+from fraud_ai.data import create_transaction, bulk_create_transactions
+
+logging.getLogger("sqlalchemy.engine").setLevel(logging.WARNING)
+
+
+def generate_transactions(n, seed=42):
+    rnd = random.Random(seed)
+    start = datetime(2025, 1, 1)
+    merchants = ["Amazon", "Google", "Netflix", "Esselunga", "Zara", "Uber"]
+    for i in range(n):
+        yield {
+            "card_number": f"{rnd.randrange(10**15, 10**16)}",
+            "amount": round(rnd.uniform(1, 2000), 2),
+            "timestamp": start + timedelta(seconds=i * 7),
+            "status": rnd.choice(["approved", "declined", "pending"]),
+            "fraud_score": rnd.random() * 1000,
+            "is_fraud": False,
+            "merchant_id": f"M{rnd.randrange(1000)}",
+            "merchant_name": rnd.choice(merchants),
+            "mcc": "5999",
+            "country": "US",
+            "customer_first_name": "John",
+            "customer_last_name": "Doe",
+        }
+
+
+def _fresh_session(tmpdir, name):
+    engine = create_engine(f"sqlite:///{os.path.join(tmpdir, name)}")
+    Base.metadata.create_all(bind=engine)
+    return engine, sessionmaker(bind=engine)()
+
+
+def bench_per_row(tmpdir, rows):
+    engine, db = _fresh_session(tmpdir, "per_row.db")
+    start = time.perf_counter()
+    for row in generate_transactions(rows):
+        create_transaction(db, **row)
+    elapsed = time.perf_counter() - start
+    db.close()
+    engine.dispose()
+    return elapsed
+
+
+def bench_bulk(tmpdir, rows, batch_size):
+    engine, db = _fresh_session(tmpdir, "bulk.db")
+    start = time.perf_counter()
+    inserted = bulk_create_transactions(db, generate_transactions(rows), batch_size=batch_size)
+    elapsed = time.perf_counter() - start
+    assert inserted == rows
+    db.close()
+    engine.dispose()
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=5000)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        per_row = bench_per_row(tmpdir, args.rows)
+        bulk = bench_bulk(tmpdir, args.rows, args.batch_size)
+
+    print(f"rows={args.rows} batch_size={args.batch_size}")
+    print(f"per-row : {per_row:8.3f}s  ({args.rows / per_row:10.0f} rows/s)")
+    print(f"bulk    : {bulk:8.3f}s  ({args.rows / bulk:10.0f} rows/s)")
+    print(f"speed-up: {per_row / bulk:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+# bench_playback.py
+"""
+Underruns and event-loop responsiveness of fraud_ai.playback.PlaybackEngine,
+measured offline with a real-time NullSink (no sound card needed).
+
+A simulated network stream delivers `--chunk-ms` of audio per chunk, slightly
+faster than real time, with random delays of up to `--jitter-ms` and one
+stall of `--stall-ms` halfway through. Each prebuffer size is reported with
+its underrun count, buffer depth and how late a 5 ms event-loop ticker ran.
+
+    python bench_playback.py --seconds 3 --jitter-ms 60
+"""
+import argparse
+import asyncio
+import random
+import time
+from fraud_ai.playback import PlaybackEngine, NullSink
+
+SAMPLERATE = 22050
+
+
+async def network_stream(args):
+    chunks = int(args.seconds * 1000 / args.chunk_ms)
+    chunk = b"\x01\x00" * int(SAMPLERATE * args.chunk_ms / 1000)
+    for i in range(chunks):
+        delay = args.chunk_ms * 0.6 + random.uniform(0, args.jitter_ms)
+        if i == chunks // 2:
+            delay += args.stall_ms
+        await asyncio.sleep(delay / 1000)
+        yield chunk
+
+
+async def loop_lag(stop):
+    """Worst delay of a 5 ms ticker: how long the event loop was blocked."""
+    worst = 0.0
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(0.005)
+        worst = max(worst, time.perf_counter() - start - 0.005)
+    return worst
+
+
+async def run(args, prebuffer_ms):
+    random.seed(args.seed)
+    stop = asyncio.Event()
+    lag = asyncio.create_task(loop_lag(stop))
+    engine = PlaybackEngine(NullSink(SAMPLERATE), samplerate=SAMPLERATE, prebuffer_ms=prebuffer_ms)
+    async with engine:
+        async for pcm in network_stream(args):
+            await engine.write(pcm)
+        await engine.drain()
+    stop.set()
+    stats = engine.stats()
+    print(f"prebuffer={prebuffer_ms:>4} ms  underruns={stats['underruns']:>3}  "
+          f"buffer mean={stats['buffer_mean_ms']:6.1f} ms max={stats['buffer_max_ms']:6.1f} ms  "
+          f"loop lag max={await lag * 1000:5.1f} ms")
+
+
+async def main(args):
+    for prebuffer_ms in args.prebuffer:
+        await run(args, prebuffer_ms)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--seconds", type=float, default=3.0)
+    parser.add_argument("--chunk-ms", type=int, default=40)
+    parser.add_argument("--jitter-ms", type=int, default=30)
+    parser.add_argument("--stall-ms", type=int, default=250)
+    parser.add_argument("--prebuffer", type=int, nargs="+", default=[0, 100, 300])
+    parser.add_argument("--seed", type=int, default=1)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,92 @@
+# bench_sentence_split.py
+"""
+Micro-benchmark: streaming sentence splitting for TTS.
+
+Replays a long reply token by token through
+  - the old loop (nltk sent_tokenize over the whole growing buffer), and
+  - fraud_ai.sentence_splitter.SentenceSplitter (incremental),
+and reports total time, time per token and the sentences produced.
+
+    python bench_sentence_split.py --sentences 40 --token-chars 4
+"""
+import argparse
+import time
+import nltk
+from nltk.tokenize import sent_tokenize
+from fraud_ai.sentence_splitter import SentenceSplitter
+
+SAMPLE = (
+    "Hello Mr. Rossi, I'm Agata, the AI fraud analyst from SAS Bank. "
+    "We declined a payment of $150.00 at Amazon on 2025-01-02 at 10:00. "
+    "Did you authorise it? "
+    "If not, we will block the card, e.g. right away, and open an investigation. "
+    "Please never share your PIN or passwords with anyone! "
+)
+
+
+def tokens_for(n_sentences, token_chars):
+    text = (SAMPLE * (n_sentences // 5 + 1)).strip()
+    return [text[i:i + token_chars] for i in range(0, len(text), token_chars)]
+
+
+def run_nltk(tokens):
+    out = []
+    buffer = ""
+    for token in tokens:
+        buffer += token
+        sentences = sent_tokenize(buffer)
+        if len(sentences) > 1:
+            out.extend(s.strip() for s in sentences[:-1])
+            buffer = sentences[-1]
+    if buffer.strip():
+        out.append(buffer.strip())
+    return out
+
+
+def run_incremental(tokens):
+    out = []
+    splitter = SentenceSplitter()
+    for token in tokens:
+        out.extend(splitter.feed(token))
+    rest = splitter.flush()
+    if rest:
+        out.append(rest)
+    return out
+
+
+def timed(fn, tokens, repeat):
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn(tokens)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Streaming sentence splitting benchmark")
+    parser.add_argument("--sentences", type=int, default=40)
+    parser.add_argument("--token-chars", type=int, default=4)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    nltk.download("punkt", quiet=True)
+    nltk.download("punkt_tab", quiet=True)
+
+    tokens = tokens_for(args.sentences, args.token_chars)
+    t_nltk, s_nltk = timed(run_nltk, tokens, args.repeat)
+    t_inc, s_inc = timed(run_incremental, tokens, args.repeat)
+
+    print(f"tokens={len(tokens)} chars={sum(map(len, tokens))}")
+    print(f"nltk sent_tokenize : {t_nltk * 1000:9.2f} ms  ({t_nltk / len(tokens) * 1e6:7.1f} us/token)  sentences={len(s_nltk)}")
+    print(f"SentenceSplitter   : {t_inc * 1000:9.2f} ms  ({t_inc / len(tokens) * 1e6:7.1f} us/token)  sentences={len(s_inc)}")
+    print(f"speed-up: {t_nltk / t_inc:.1f}x")
+    if s_nltk != s_inc:
+        first = next((i for i, (a, b) in enumerate(zip(s_nltk, s_inc)) if a != b), min(len(s_nltk), len(s_inc)))
+        print(f"note: outputs differ from sentence {first}: "
+              f"nltk={s_nltk[first:first + 1]!r} incremental={s_inc[first:first + 1]!r}")
+
+
+if __name__ == "__main__":
+    main()
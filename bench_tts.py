@@ -0,0 +1,75 @@
+# bench_tts.py
+"""
+Time-to-first-audio for ElevenLabs-style streaming TTS, measured offline
+against fraud_ai.tts_standin.TTSStandInServer.
+
+Compares the old behaviour (new aiohttp.ClientSession per sentence) with the
+pooled ElevenLabsTTSClient, for `--calls` concurrent calls of `--sentences`
+sentences each.
+
+    python bench_tts.py --calls 10 --sentences 5 --setup-delay 0.15
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from fraud_ai.tts_client import ElevenLabsTTSClient
+from fraud_ai.tts_standin import TTSStandInServer
+
+SENTENCE = "Did you authorise a payment of $150.00 at Amazon?"
+
+
+async def first_audio(client, text):
+    start = time.perf_counter()
+    ttfa = None
+    async for _ in client.stream(text):
+        if ttfa is None:
+            ttfa = time.perf_counter() - start
+    return ttfa
+
+
+async def call_per_sentence_session(base_url, sentences):
+    results = []
+    for _ in range(sentences):
+        # old path: a brand-new session (and connection) for every sentence
+        async with ElevenLabsTTSClient(base_url=base_url, api_key="test") as client:
+            results.append(await first_audio(client, SENTENCE))
+    return results
+
+
+async def call_pooled(client, sentences):
+    return [await first_audio(client, SENTENCE) for _ in range(sentences)]
+
+
+def report(name, samples, connections):
+    samples = sorted(samples)
+    p95 = samples[int(len(samples) * 0.95) - 1] if len(samples) > 1 else samples[0]
+    print(f"{name:<22} mean={statistics.mean(samples) * 1000:7.1f} ms  "
+          f"p95={p95 * 1000:7.1f} ms  connections={connections}")
+
+
+async def main(args):
+    server = TTSStandInServer(setup_delay=args.setup_delay, first_byte_delay=args.first_byte_delay)
+    base_url = await server.start()
+    try:
+        per_call = await asyncio.gather(*[
+            call_per_sentence_session(base_url, args.sentences) for _ in range(args.calls)
+        ])
+        report("session per sentence", [t for call in per_call for t in call], len(server.connections))
+
+        server.connections.clear()
+        async with ElevenLabsTTSClient(base_url=base_url, api_key="test") as client:
+            pooled = await asyncio.gather(*[call_pooled(client, args.sentences) for _ in range(args.calls)])
+        report("pooled client", [t for call in pooled for t in call], len(server.connections))
+    finally:
+        await server.stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Streaming TTS time-to-first-audio benchmark")
+    parser.add_argument("--calls", type=int, default=10)
+    parser.add_argument("--sentences", type=int, default=5)
+    parser.add_argument("--setup-delay", type=float, default=0.15,
+                        help="simulated DNS+TCP+TLS cost per new connection (s)")
+    parser.add_argument("--first-byte-delay", type=float, default=0.05)
+    asyncio.run(main(parser.parse_args()))
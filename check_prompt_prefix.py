@@ -0,0 +1,78 @@
+# check_prompt_prefix.py
+"""
+Checks that system prompts share a byte-identical prefix across customers,
+with all per-customer data after it, so provider-side prompt caching can
+reuse the prefix.
+
+    python check_prompt_prefix.py
+
+Exits non-zero on failure.
+"""
+import os
+import sys
+from datetime import datetime
+from types import SimpleNamespace
+from fraud_ai.prompt_builder import (
+    GREETING_TEMPLATE, VERIFICATION_TEMPLATE, build_system_prompt
+)
+from fraud_ai.history_window import count_tokens
+
+
+def make_tx(tx_id, first, last, amount, merchant, ts):
+    return SimpleNamespace(id=tx_id, customer_first_name=first, customer_last_name=last,
+                           amount=amount, merchant_name=merchant, timestamp=ts)
+
+
+CUSTOMERS = [
+    (make_tx(1, "Mario", "Rossi", 150.0, "Amazon", datetime(2024, 5, 2, 14, 10)),
+     [make_tx(2, "Mario", "Rossi", 12.5, "Esselunga", datetime(2024, 5, 1, 9, 0))]),
+    (make_tx(10, "Jane", "Doe", 999.99, "Apple Store", datetime(2024, 6, 30, 23, 59)), []),
+    (make_tx(20, "Ana", "Núñez", 42.0, "Zara", datetime(2023, 1, 15, 8, 5)),
+     [make_tx(21, "Ana", "Núñez", 7.0, "Bar", datetime(2023, 1, 14, 8, 0)),
+      make_tx(22, "Ana", "Núñez", 80.0, "Shell", datetime(2023, 1, 13, 18, 30))]),
+]
+
+
+def common_prefix(strings):
+    return os.path.commonprefix(strings)
+
+
+def check(name, template, prompts, customer_values):
+    failures = []
+    prefix = common_prefix(prompts)
+    if not prefix.startswith(template.prefix):
+        failures.append(f"{name}: prompts diverge before the end of the static block "
+                        f"(shared {len(prefix)} of {len(template.prefix)} chars)")
+    for prompt, values in zip(prompts, customer_values):
+        for value in values:
+            position = prompt.find(value)
+            if 0 <= position < len(template.prefix):
+                failures.append(f"{name}: {value!r} appears inside the static prefix")
+    print(f"{name:<13} static prefix {len(template.prefix):>5} chars ~{count_tokens(template.prefix):>4} tokens, "
+          f"shared by {len(prompts)} customers: {'yes' if not failures else 'NO'}")
+    return failures
+
+
+def main():
+    failures = []
+    for greeting_mode, template, name in ((True, GREETING_TEMPLATE, "greeting"),
+                                          (False, VERIFICATION_TEMPLATE, "verification")):
+        prompts = [build_system_prompt(tx, recent, greeting_mode=greeting_mode) for tx, recent in CUSTOMERS]
+        values = [[tx.customer_first_name, tx.merchant_name] for tx, _ in CUSTOMERS]
+        failures += check(name, template, prompts, values)
+
+        # the demos reseed the database: same row ids, another customer
+        tx, recent = CUSTOMERS[0]
+        reseeded = make_tx(tx.id, "John", "Doe", 310.0, "Netflix", datetime(2025, 2, 3, 10, 0))
+        prompt = build_system_prompt(reseeded, [make_tx(t.id, "John", "Doe", 1.0, "Bar", t.timestamp) for t in recent],
+                                     greeting_mode=greeting_mode)
+        if "John Doe" not in prompt or "Mario" in prompt:
+            failures.append(f"{name}: reseeded row ids got another customer's prompt")
+
+    for failure in failures:
+        print("FAIL", failure)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
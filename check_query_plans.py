@@ -0,0 +1,109 @@
+# check_query_plans.py
+"""
+Checks that every hot query (reads and expiry sweeps) is served by an index, with
+EXPLAIN QUERY PLAN on a throwaway SQLite database built from the models.
+
+Each query is captured from the real fraud_ai function (so a change in the
+query code is checked too) and fails if its plan scans a whole table or
+sorts in a temporary B-tree instead of reading rows in index order.
+
+    python check_query_plans.py
+
+Exits non-zero on failure.
+"""
+import sys
+from datetime import datetime, timedelta
+from sqlalchemy import event
+from sqlalchemy.orm import sessionmaker
+from fraud_ai.engine import make_engine
+from fraud_ai.migrations import upgrade
+from fraud_ai.models import Alert, AlertConversation, BlockedCard, PasswordReset, Transaction
+from fraud_ai import alerts, conversation, data, expiry
+
+CARD = "4000111122223333"
+
+
+def seed(db):
+    start = datetime(2024, 5, 1)
+    for i in range(50):
+        tx = Transaction(card_number=CARD if i % 2 else f"5000{i:012d}", amount=10.0 + i,
+                         timestamp=start + timedelta(hours=i), merchant_name="Shop",
+                         customer_first_name="Mario", customer_last_name="Rossi")
+        db.add(tx)
+        db.flush()
+        alert = Alert(transaction_id=tx.id, created_at=tx.timestamp, status="open" if i % 3 else "closed")
+        db.add(alert)
+        db.flush()
+        db.add(AlertConversation(alert_id=alert.id, role="assistant", content="Hello", timestamp=tx.timestamp))
+    db.commit()
+
+
+def hot_queries(db):
+    """(name, callable) for every query on the hot path."""
+    t = datetime(2024, 5, 2)
+    sweep_policies = [expiry.ExpiryPolicy(BlockedCard, "blocked_at", timedelta(days=1)),
+                      expiry.ExpiryPolicy(PasswordReset, "timestamp", timedelta(days=1))]
+    alert_page = alerts.get_alerts_page(db, status="open", limit=5)
+    tx_page = data.get_transactions_page(db, card_number=CARD, limit=5)
+    conv_page = conversation.get_conversation_page(db, 1, limit=1)
+    return [
+        ("poll open alerts", lambda: alerts.get_alerts(db, status="open", limit=20)),
+        ("alerts page (status)", lambda: alerts.get_alerts_page(db, status="open", after=alert_page.next_cursor, limit=5)),
+        ("alerts page (newest)", lambda: alerts.get_alerts_page(db, limit=5, descending=True)),
+        ("card window (last 24h)", lambda: data.get_transactions_in_window(db, CARD, t)),
+        ("transactions page (card)", lambda: data.get_transactions_page(db, card_number=CARD, after=tx_page.next_cursor, limit=5)),
+        ("transactions page (all)", lambda: data.get_transactions_page(db, limit=5, descending=True)),
+        ("conversation", lambda: conversation.get_conversation(db, 1)),
+        ("conversation page", lambda: conversation.get_conversation_page(db, 1, after=conv_page.next_cursor, limit=1)),
+        ("expiry sweep", lambda: expiry.sweep(db, [expiry.whitelist_policy(30), *sweep_policies])),
+    ]
+
+
+def capture(engine, func):
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith(("SELECT", "DELETE")):
+            statements.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        func()
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+    return statements
+
+
+def plan_problems(plan):
+    problems = []
+    for detail in plan:
+        if detail.startswith("SCAN ") and " USING " not in detail:
+            problems.append(f"full table scan: {detail}")
+        if "TEMP B-TREE" in detail:
+            problems.append(f"sort not served by an index: {detail}")
+    return problems
+
+
+def main():
+    engine = make_engine("sqlite://", "development", echo=False)
+    upgrade(engine)
+    db = sessionmaker(bind=engine)()
+    seed(db)
+
+    failures = []
+    for name, func in hot_queries(db):
+        statements = capture(engine, func)
+        for statement, parameters in statements:
+            with engine.connect() as conn:
+                plan = [row[-1] for row in conn.exec_driver_sql("EXPLAIN QUERY PLAN " + statement, parameters)]
+            problems = plan_problems(plan)
+            print(f"{name:<26} {'ok ' if not problems else 'BAD'} {' | '.join(plan)}")
+            failures += [f"{name}: {p}" for p in problems]
+
+    for failure in failures:
+        print("FAIL", failure)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -12,7 +12,7 @@ from openai import AsyncOpenAI
 from fraud_ai.config import OPENAI_API_KEY
 from fraud_ai.voice import speak_stream_text
 from fraud_ai.voice_2 import tts_worker
-from nltk.tokenize import sent_tokenize
+from fraud_ai.sentence_splitter import SentenceSplitter
 from fraud_ai.prompt_builder import build_system_prompt
 from fraud_ai.conversation import add_message
 from fraud_ai.data import init_db, get_db, create_transaction, update_transaction, Transaction
@@ -104,21 +104,18 @@ async def stream_llm_with_tts(step_prompt: str, history: list, tts_backend: str,
     elif tts_backend == "elevenlabs":
         tts_queue = asyncio.Queue()
         tts_task = asyncio.create_task(tts_worker(tts_queue))
-        buffer = ""
+        splitter = SentenceSplitter()
         async for event in stream:
             delta = event.choices[0].delta
             if delta and delta.content:
                 token = delta.content
                 print(token, end="", flush=True)
-                buffer += token
                 full_text += token
-                sentences = sent_tokenize(buffer)
-                if len(sentences) > 1:
-                    for s in sentences[:-1]:
-                        await tts_queue.put(s.strip())
-                    buffer = sentences[-1]
-        if buffer.strip():
-            await tts_queue.put(buffer.strip())
+                for s in splitter.feed(token):
+                    await tts_queue.put(s)
+        rest = splitter.flush()
+        if rest:
+            await tts_queue.put(rest)
         await tts_queue.put(None)
         await tts_task
         print()
@@ -3,22 +3,22 @@ from streamlit_autorefresh import st_autorefresh
 from st_aggrid import AgGrid, GridOptionsBuilder, GridUpdateMode, JsCode
 import pandas as pd
 from sqlalchemy.orm import Session
-from fraud_ai.data import get_db, update_transaction
+from fraud_ai.data import ScopedSession, update_transaction
 from fraud_ai.alerts import get_alerts, update_alert
 from fraud_ai.models import Transaction
 from fraud_ai.whitelist import add_to_whitelist, is_card_whitelisted, remove_from_whitelist
 from fraud_ai.blocked import add_to_blocked, is_card_blocked, remove_from_blocked
 from fraud_ai.reset_password import add_password_reset, has_password_reset, remove_password_reset
 from fraud_ai.conversation import get_conversation
+from fraud_ai import card_status
 from datetime import datetime
 
 st.set_page_config(page_title="Fraud Alert Management", page_icon="🚨", layout="wide")
 
-@st.cache_resource
-def get_db_cached():
-    return next(get_db())
-
-db = get_db_cached()
+# one session per script run, private to this viewer's thread (a cached
+# Session would be shared by every viewer, rerun and call thread)
+ScopedSession.remove()
+db = ScopedSession()
 
 @st.cache_data(ttl=15)
 def load_alerts(refresh_counter):
@@ -32,10 +32,8 @@ def load_transactions(card_number, refresh_counter):
     return txs
 
 def get_card_status(card_number):
-    whitelisted = is_card_whitelisted(db, card_number) is not None
-    blocked = is_card_blocked(db, card_number) is not None
-    reset = has_password_reset(db, card_number) is not None
-    return whitelisted, blocked, reset
+    status = card_status.get_card_status(db, card_number)
+    return status.whitelisted, status.blocked, status.password_reset
 
 def toggle_block_card(db: Session, card_number: str):
     try:
@@ -330,4 +328,8 @@ if alert is not None:
                 st.session_state.refresh_counter += 1
                 st.experimental_rerun()
             else:
-                st.warning("This is the last alert.")
\ No newline at end of file
+                st.warning("This is the last alert.")
+
+# release this run's session with the run; a rerun starts over at the top,
+# which removes it as well
+ScopedSession.remove()
@@ -4,7 +4,7 @@ from st_aggrid import AgGrid, GridOptionsBuilder, GridUpdateMode, JsCode
 from st_aggrid import StAggridTheme
 import pandas as pd
 from sqlalchemy.orm import Session
-from fraud_ai.data import get_db, update_transaction
+from fraud_ai.data import ScopedSession, update_transaction
 #from fraud_ai.config import OPENAI_API_KEY, ELEVEN_KEY, DATABASE_URL
 from fraud_ai.config import DATABASE_URL
 from fraud_ai.alerts import get_alerts, update_alert
@@ -13,6 +13,7 @@ from fraud_ai.whitelist import add_to_whitelist, is_card_whitelisted, remove_fro
 from fraud_ai.blocked import add_to_blocked, is_card_blocked, remove_from_blocked
 from fraud_ai.reset_password import add_password_reset, has_password_reset, remove_password_reset
 from fraud_ai.conversation import get_conversation
+from fraud_ai import card_status
 from datetime import datetime
 import asyncio
 import os
@@ -95,11 +96,10 @@ else:
         st.markdown("<br><span class='Title'>Agatha control dashboard</span>", unsafe_allow_html=True)
 
     # --- DB CONNECTION ---
-    @st.cache_resource
-    def get_db_cached():
-        return next(get_db())
-
-    db = get_db_cached()
+    # one session per script run, private to this viewer's thread (a cached
+    # Session would be shared by every viewer, rerun and call thread)
+    ScopedSession.remove()
+    db = ScopedSession()
 
     @st.cache_data(ttl=15)
     def load_alerts(refresh_counter):
@@ -114,10 +114,8 @@ else:
 
     # --- Helpers ---
     def get_card_status(card_number):
-        whitelisted = is_card_whitelisted(db, card_number) is not None
-        blocked = is_card_blocked(db, card_number) is not None
-        reset = has_password_reset(db, card_number) is not None
-        return whitelisted, blocked, reset
+        status = card_status.get_card_status(db, card_number)
+        return status.whitelisted, status.blocked, status.password_reset
 
     # --- Toggle actions ---
     def toggle_block_card(db: Session, card_number: str):
@@ -390,3 +388,7 @@ else:
 
 
 
+
+# release this run's session with the run; a rerun starts over at the top,
+# which removes it as well
+ScopedSession.remove()
@@ -4,14 +4,13 @@ from st_aggrid import AgGrid, GridOptionsBuilder, GridUpdateMode, JsCode
 from st_aggrid import StAggridTheme
 import pandas as pd
 from sqlalchemy.orm import Session
-from fraud_ai.data import get_db, update_transaction
+from fraud_ai.data import ScopedSession, update_transaction
 from fraud_ai.config import OPENAI_API_KEY, ELEVEN_KEY, DATABASE_URL
 from fraud_ai.alerts import get_alerts, update_alert
-from fraud_ai.models import Transaction
+from fraud_ai.alert_detail import load_alert_detail
 from fraud_ai.whitelist import add_to_whitelist, is_card_whitelisted, remove_from_whitelist
 from fraud_ai.blocked import add_to_blocked, is_card_blocked, remove_from_blocked
 from fraud_ai.reset_password import add_password_reset, has_password_reset, remove_password_reset
-from fraud_ai.conversation import get_conversation
 from datetime import datetime
 import time
 
@@ -208,29 +207,21 @@ else:
     """
 
     # --- DB CONNECTION ---
-    @st.cache_resource
-    def get_db_cached():
-        return next(get_db())
-
-    db = get_db_cached()
+    # one session per script run, private to this viewer's thread (a cached
+    # Session would be shared by every viewer, rerun and call thread)
+    ScopedSession.remove()
+    db = ScopedSession()
 
     @st.cache_data(ttl=15)
     def load_alerts(refresh_counter):
         return get_alerts(db, limit=10)
 
-    @st.cache_data(ttl=15)
-    def load_transactions(card_number, refresh_counter):
-        txs = db.query(Transaction).filter(
-            Transaction.card_number == card_number
-        ).order_by(Transaction.id.desc()).limit(10).all()
-        return txs
-
-    # --- Helpers ---
-    def get_card_status(card_number):
-        whitelisted = is_card_whitelisted(db, card_number) is not None
-        blocked = is_card_blocked(db, card_number) is not None
-        reset = has_password_reset(db, card_number) is not None
-        return whitelisted, blocked, reset
+    # alert + transaction + card flags + last 10 card transactions + transcript in
+    # three queries, as immutable data. TTL below the 10 s auto-refresh, so each tick
+    # shows fresh data while the reruns in between are served from the cache
+    @st.cache_data(ttl=8)
+    def load_detail(alert_id, refresh_counter):
+        return load_alert_detail(db, alert_id, recent_limit=10)
 
     # --- Toggle actions ---
     def toggle_block_card(db: Session, card_number: str):
@@ -325,8 +316,7 @@ else:
         return pd.DataFrame(data)
 
     # --- Conversation UI Premium Fixed (User Text Right-Aligned Corrected) ---
-    def render_conversation(alert_id):
-        messages = get_conversation(db, alert_id)
+    def render_conversation(messages):
 
         # aggiorna solo i nuovi messaggi
         if len(messages) > len(st.session_state.chat_messages):
@@ -430,15 +420,11 @@ else:
     def load_alert(index, refresh_counter):
         if index < 0 or index >= len(alerts):
             return None, None, None, None, None
-        alert = alerts[index]
-        tx = db.query(Transaction).filter(Transaction.id == alert.transaction_id).first()
-        if not tx:
+        alert = load_detail(alerts[index].id, refresh_counter)
+        if alert is None or alert.transaction is None:
             return alert, None, None, None, None
-        card_number = tx.card_number
-        customer_name = f"{tx.customer_first_name} {tx.customer_last_name}" if tx.customer_first_name and tx.customer_last_name else "Unknown"
         notes = alert.analyst_notes or ""
-        tx_list = load_transactions(card_number, refresh_counter)
-        return alert, card_number, customer_name, notes, tx_list
+        return alert, alert.card_number, alert.customer_name, notes, alert.recent_transactions
 
     alert, card_number, customer_name, notes, tx_list = load_alert(st.session_state.alert_index, st.session_state.refresh_counter)
     if notes != st.session_state.get("analyst_notes", ""):
@@ -447,7 +433,7 @@ else:
     if alert is None:
         st.markdown(page_style + f"<span class='Title'>No alerts to display.</span><br>", unsafe_allow_html=True)
     else:
-        whitelisted, blocked, reset = get_card_status(card_number)
+        whitelisted, blocked, reset = alert.card_status or (False, False, False)
         status_parts = []
         if whitelisted:
             status_parts.append("✅ Whitelisted")
@@ -486,7 +472,7 @@ else:
                         </style>''', unsafe_allow_html=True)
             with st.container(border=True, key='gino', height=250):
                     st.markdown("<span class='subTitle'> 💬 Conversation Transcript</span>", unsafe_allow_html=True)
-                    render_conversation(alert.id)
+                    render_conversation(alert.messages)
         
         with col_annotation:
             # Analyst notes + actions
@@ -639,3 +625,7 @@ else:
                 if st.button("Next Alert", icon = "➡️"):
                     st.session_state.alert_index = min(len(alerts)-1, st.session_state.alert_index + 1)
                     st.experimental_rerun()
+
+# release this run's session with the run; a rerun starts over at the top,
+# which removes it as well
+ScopedSession.remove()
@@ -4,22 +4,16 @@ import asyncio
 import subprocess
 import sys
 import logging
-from datetime import timedelta
 from sqlalchemy.orm import Session
-from fraud_ai.data import init_db, get_db, create_transaction, Transaction
+from fraud_ai.data import init_db, get_db, create_transaction, get_transactions_in_window, Transaction
 from fraud_ai.alerts import create_alert, get_alerts
 from fraud_ai.fraud_flow import full_fraud_flow
+from fraud_ai.tts_client import close_tts_client
 
 
 
 def get_transactions_last_24h(db: Session, card_number: str, alerted_tx_time, window_hours=24):
-    start_time = alerted_tx_time - timedelta(hours=window_hours)
-    end_time = alerted_tx_time + timedelta(hours=window_hours)
-    return db.query(Transaction).filter(
-        Transaction.card_number == card_number,
-        Transaction.timestamp >= start_time,
-        Transaction.timestamp <= end_time
-    ).order_by(Transaction.timestamp.asc()).all()
+    return get_transactions_in_window(db, card_number, alerted_tx_time, window_hours)
 
 async def run_demo(tts_backend="openai", stt_enabled=False, stt_provider="openai", name="John", surname="Doe"):
     logging.getLogger("sqlalchemy.engine").setLevel(logging.WARNING)
@@ -74,15 +68,19 @@ async def run_demo(tts_backend="openai", stt_enabled=False, stt_provider="openai
 
     
     # === RUN fraud flow ===
-    await full_fraud_flow(
-        db,
-        alert,
-        last_tx,
-        recent_txs,
-        tts_backend,
-        stt_enabled,
-        stt_provider,
-    )
+    try:
+        await full_fraud_flow(
+            db,
+            alert,
+            last_tx,
+            recent_txs,
+            tts_backend,
+            stt_enabled,
+            stt_provider,
+        )
+    finally:
+        # the pooled TTS session belongs to this thread's event loop
+        await close_tts_client()
 
 if __name__ == "__main__":
     asyncio.run(run_demo())
\ No newline at end of file
@@ -1,37 +1,66 @@
+import queue
+import time
 import streamlit as st
 from streamlit_webrtc import webrtc_streamer, WebRtcMode, ClientSettings
-import numpy as np
-import tempfile
-import soundfile as sf
 import openai
 from elevenlabs import ElevenLabs
 from fraud_ai.config import ELEVEN_KEY, OPENAI_API_KEY
+from fraud_ai.audio_buffer import encode_audio, frame_to_mono_int16
+from fraud_ai.vad import VADEndpointer
 
 openai.api_key = OPENAI_API_KEY
 eleven_client = ElevenLabs(api_key=ELEVEN_KEY)
 
-# Funzione per trascrivere file audio con ElevenLabs
-def transcribe_with_elevenlabs(temp_path):
-    with open(temp_path, "rb") as f:
-        result_stream = eleven_client.speech_to_text.convert(
-            model_id="scribe_v1",
-            file=f
-        )
-        texts = []
-        lang_code = None
-        lang_prob = None
-        for key, value in result_stream:
-            if key == "language_code":
-                lang_code = value
-            elif key == "language_probability":
-                lang_prob = value
-            elif key == "text":
-                texts.append(value)
+MAX_UTTERANCE_SECONDS = 20
+
+# Funzione per trascrivere audio con ElevenLabs (file-like in memoria o path)
+def transcribe_with_elevenlabs(audio):
+    if isinstance(audio, str):
+        with open(audio, "rb") as f:
+            return transcribe_with_elevenlabs(f)
+
+    result_stream = eleven_client.speech_to_text.convert(
+        model_id="scribe_v1",
+        file=audio
+    )
+    texts = []
+    lang_code = None
+    lang_prob = None
+    for key, value in result_stream:
+        if key == "language_code":
+            lang_code = value
+        elif key == "language_probability":
+            lang_prob = value
+        elif key == "text":
+            texts.append(value)
     final_text = " ".join(t.strip() for t in texts if t.strip())
     return final_text.strip(), lang_code, lang_prob
 
+# Trascrizione di un buffer audio in memoria (nessun file temporaneo)
+def transcribe_audio(audio_file, stt_provider="openai", language=None):
+    if stt_provider.lower() == "openai":
+        resp = openai.audio.transcriptions.create(
+            model="gpt-4o-mini-transcribe",
+            file=audio_file,
+            language=language
+        )
+        return resp.text.strip()
+    elif stt_provider.lower() == "elevenlabs":
+        transcription_text, _, _ = transcribe_with_elevenlabs(audio_file)
+        return transcription_text
+    else:
+        raise ValueError("stt_provider must be 'openai' or 'elevenlabs'.")
+
 # Funzione principale STT live
-def listen_and_transcribe_live(stt_provider="openai", language=None):
+def listen_and_transcribe_live(stt_provider="openai", language=None,
+                               max_wait=10, hangover_ms=700, vad_aggressiveness=2):
+    """
+    Record one customer turn and transcribe it.
+
+    Audio goes through a VAD endpointer: recording stops `hangover_ms` after
+    the customer stops talking (or after `max_wait` seconds without speech)
+    and only the voiced segment is uploaded.
+    """
     st.info("🎙️ Premere **Start** e parlare nel microfono")
 
     # Config WebRTC
@@ -46,35 +75,50 @@ def listen_and_transcribe_live(stt_provider="openai", language=None):
         async_processing=False
     )
 
-    if ctx.audio_receiver:
-        frames = ctx.audio_receiver.get_frames(timeout=10)
-        if not frames:
-            return "silence"
-
-        # Converti i frame in un array numpy
-        audio_data = np.concatenate([f.to_ndarray() for f in frames], axis=0)
-
-        # Salva temporaneamente il file audio
-        with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as f:
-            sf.write(f.name, audio_data, 16000)
-            temp_path = f.name
-
-        # Trascrizione
-        if stt_provider.lower() == "openai":
-            with open(temp_path, "rb") as f_audio:
-                resp = openai.audio.transcriptions.create(
-                    model="gpt-4o-mini-transcribe",
-                    file=f_audio,
-                    language=language
-                )
-            transcription_text = resp.text.strip()
-            return transcription_text if transcription_text else "silence"
-
-        elif stt_provider.lower() == "elevenlabs":
-            transcription_text, _, _ = transcribe_with_elevenlabs(temp_path)
-            return transcription_text if transcription_text else "silence"
-
-        else:
-            raise ValueError("stt_provider must be 'openai' or 'elevenlabs'.")
-    else:
+    if not ctx.audio_receiver:
+        return "silence"
+
+    utterance, samplerate = _record_utterance(ctx.audio_receiver, max_wait, hangover_ms, vad_aggressiveness)
+    if utterance is None or not len(utterance):
         return "silence"
+
+    # Segmento parlato -> FLAC in memoria: zero I/O su disco
+    audio_file = encode_audio(utterance, samplerate, "FLAC")
+    transcription_text = transcribe_audio(audio_file, stt_provider, language)
+    return transcription_text if transcription_text else "silence"
+
+
+def _record_utterance(audio_receiver, max_wait, hangover_ms, vad_aggressiveness):
+    """Pull WebRTC frames until the endpointer closes an utterance."""
+    endpointer = None
+    deadline = time.monotonic() + max_wait
+    hard_deadline = deadline + MAX_UTTERANCE_SECONDS
+    while True:
+        # once the customer is talking, keep listening until they stop
+        now = time.monotonic()
+        speaking = endpointer is not None and endpointer.speech_started
+        if now >= hard_deadline or (now >= deadline and not speaking):
+            break
+        try:
+            frames = audio_receiver.get_frames(timeout=1)
+        except queue.Empty:
+            continue
+        for frame in frames:
+            samples, samplerate = frame_to_mono_int16(frame)
+            if endpointer is None:
+                endpointer = VADEndpointer(samplerate, aggressiveness=vad_aggressiveness,
+                                           hangover_ms=hangover_ms, max_utterance_s=MAX_UTTERANCE_SECONDS)
+            utterances = endpointer.feed(samples)
+            if utterances:
+                return utterances[0], endpointer.samplerate
+    if endpointer is None:
+        return None, None
+    return endpointer.flush(), endpointer.samplerate
+
+
+# Punto di ingresso usato dal flusso di chiamata (fraud_flow, conversation_manager)
+def listen_and_transcribe(stt_enabled=True, stt_provider="openai", language=None, **vad_options):
+    """One customer turn: VAD-endpointed live STT, or the keyboard when STT is off."""
+    if not stt_enabled:
+        return input("Customer says: ")
+    return listen_and_transcribe_live(stt_provider, language, **vad_options)
@@ -0,0 +1,34 @@
+# aio/__init__.py
+"""
+Async data access on sqlalchemy.ext.asyncio (aiosqlite for SQLite, asyncpg
+for Postgres), for code running on the event loop.
+
+Same function names and arguments as the sync modules, with an AsyncSession
+in place of the Session and every call awaited:
+
+    from fraud_ai import aio
+
+    async with aio.session_scope() as db:
+        alert = await aio.get_alert(db, alert_id)
+        await aio.update_transaction(db, alert.transaction_id, is_fraud=True)
+
+    await aio.add_to_blocked(None, card_number)    # db=None: own unit of work
+
+The engine uses the configured DATABASE_URL and DATABASE_PROFILE; the URL is
+converted to its async driver (see engine.async_url).
+"""
+from .engine import async_url, make_async_engine
+from .data import (
+    engine, AsyncSessionLocal, init_db, get_db, session_scope, with_session,
+    create_transaction, bulk_create_transactions, get_transaction, get_transactions,
+    get_transactions_page, get_transactions_in_window, update_transaction, delete_transaction,
+)
+from .alerts import (
+    create_alert, get_alert, get_alerts, get_alerts_page, update_alert, claim_alert, delete_alert,
+)
+from .blocked import add_to_blocked, is_card_blocked, get_blocked_cards, remove_from_blocked
+from .whitelist import (
+    add_to_whitelist, is_card_whitelisted, get_whitelist, remove_from_whitelist, cleanup_expired_whitelist,
+)
+from .reset_password import add_password_reset, has_password_reset, remove_password_reset
+from .conversation import add_message, get_conversation, get_conversation_page
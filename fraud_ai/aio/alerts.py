@@ -0,0 +1,76 @@
+# alerts.py
+"""Async Alert CRUD; mirrors fraud_ai.alerts."""
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from ..models import Alert
+from ..pagination import keyset_query, make_page
+from .data import with_session
+
+# CREATE
+@with_session
+async def create_alert(db: AsyncSession, transaction_id: int, status="open", analyst_notes=None):
+    alert = Alert(
+        transaction_id=transaction_id,
+        status=status,
+        analyst_notes=analyst_notes
+    )
+    db.add(alert)
+    await db.commit()
+    await db.refresh(alert)
+    return alert
+
+# READ (by ID)
+@with_session
+async def get_alert(db: AsyncSession, alert_id: int):
+    return await db.get(Alert, alert_id)
+
+# READ (all, with optional filters)
+@with_session
+async def get_alerts(db: AsyncSession, status=None, skip=0, limit=100):
+    stmt = select(Alert)
+    if status:
+        stmt = stmt.where(Alert.status == status)
+    return (await db.scalars(stmt.offset(skip).limit(limit))).all()
+
+# READ (keyset page, by creation time)
+@with_session
+async def get_alerts_page(db: AsyncSession, status=None, after=None, limit=100, descending=False):
+    stmt = select(Alert)
+    if status:
+        stmt = stmt.where(Alert.status == status)
+    order = [Alert.created_at, Alert.id]
+    rows = (await db.scalars(keyset_query(stmt, order, after, limit, descending))).all()
+    return make_page(rows, order, limit)
+
+# UPDATE
+@with_session
+async def update_alert(db: AsyncSession, alert_id: int, **kwargs):
+    alert = await get_alert(db, alert_id)
+    if not alert:
+        return None
+    for key, value in kwargs.items():
+        setattr(alert, key, value)
+    await db.commit()
+    await db.refresh(alert)
+    return alert
+
+# CLAIM: atomically move an alert from one status to another (see fraud_ai.alerts.claim_alert)
+@with_session
+async def claim_alert(db: AsyncSession, alert_id: int, from_status="open", to_status="in_progress"):
+    result = await db.execute(
+        update(Alert)
+        .where(Alert.id == alert_id, Alert.status == from_status)
+        .values(status=to_status)
+    )
+    await db.commit()
+    return result.rowcount == 1
+
+# DELETE
+@with_session
+async def delete_alert(db: AsyncSession, alert_id: int):
+    alert = await get_alert(db, alert_id)
+    if not alert:
+        return False
+    await db.delete(alert)
+    await db.commit()
+    return True
@@ -0,0 +1,38 @@
+# blocked.py
+"""Async blocked-card CRUD; mirrors fraud_ai.blocked."""
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from ..models import BlockedCard
+from .. import card_status
+from .data import with_session
+
+# CREATE
+@with_session
+async def add_to_blocked(db: AsyncSession, card_number: str):
+    entry = BlockedCard(card_number=card_number)
+    db.add(entry)
+    await db.commit()
+    card_status.invalidate(card_number)
+    await db.refresh(entry)
+    return entry
+
+# READ (by card number)
+@with_session
+async def is_card_blocked(db: AsyncSession, card_number: str):
+    return (await db.scalars(select(BlockedCard).where(BlockedCard.card_number == card_number))).first()
+
+# READ (all)
+@with_session
+async def get_blocked_cards(db: AsyncSession):
+    return (await db.scalars(select(BlockedCard))).all()
+
+# DELETE (by card number)
+@with_session
+async def remove_from_blocked(db: AsyncSession, card_number: str):
+    entry = await is_card_blocked(db, card_number)
+    if entry:
+        await db.delete(entry)
+        await db.commit()
+        card_status.invalidate(card_number)
+        return True
+    return False
@@ -0,0 +1,41 @@
+# conversation.py
+"""Async transcript CRUD; mirrors fraud_ai.conversation."""
+from datetime import datetime
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from ..models import AlertConversation
+from ..pagination import keyset_query, make_page
+from ..transcript_logger import current_transcript_logger
+from .data import with_session
+
+@with_session
+async def add_message(db: AsyncSession, alert_id: int, role: str, content: str):
+    # Inside a call with a write-behind logger the row is only queued
+    transcript = current_transcript_logger()
+    if transcript is not None:
+        return transcript.add_message(alert_id, role, content)
+
+    msg = AlertConversation(
+        alert_id=alert_id,
+        role=role,
+        content=content,
+        timestamp=datetime.utcnow()
+    )
+    db.add(msg)
+    await db.commit()
+    await db.refresh(msg)
+    return msg
+
+@with_session
+async def get_conversation(db: AsyncSession, alert_id: int):
+    return (await db.scalars(
+        select(AlertConversation).where(AlertConversation.alert_id == alert_id)
+        .order_by(AlertConversation.timestamp, AlertConversation.id)
+    )).all()
+
+@with_session
+async def get_conversation_page(db: AsyncSession, alert_id: int, after=None, limit=100):
+    stmt = select(AlertConversation).where(AlertConversation.alert_id == alert_id)
+    order = [AlertConversation.timestamp, AlertConversation.id]
+    rows = (await db.scalars(keyset_query(stmt, order, after, limit))).all()
+    return make_page(rows, order, limit)
@@ -0,0 +1,147 @@
+# data.py
+"""
+Async engine, sessions and Transaction CRUD; mirrors fraud_ai.data.
+"""
+import functools
+from contextlib import asynccontextmanager
+from datetime import timedelta
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from ..config import DATABASE_URL, DATABASE_PROFILE
+from ..migrations import upgrade
+from ..models import Transaction
+from ..pagination import keyset_query, make_page
+from .engine import make_async_engine
+
+engine = make_async_engine(DATABASE_URL, DATABASE_PROFILE)
+# attributes stay loaded after commit: an expired attribute would need a lazy
+# load, which cannot happen implicitly under asyncio
+AsyncSessionLocal = async_sessionmaker(engine, expire_on_commit=False)
+
+async def init_db():
+    async with engine.begin() as conn:
+        await conn.run_sync(upgrade)
+
+async def get_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+# ---------------------------
+# Units of work
+# ---------------------------
+
+@asynccontextmanager
+async def session_scope(session_factory=AsyncSessionLocal):
+    """Async session_scope: commit on success, rollback on error, always closed."""
+    async with session_factory() as db:
+        try:
+            yield db
+            await db.commit()
+        except BaseException:
+            await db.rollback()
+            raise
+
+def with_session(func):
+    """Makes `db` optional: called with db=None (or without it), the helper runs in its own
+    session_scope(). A positional first argument is `db` only if it is an AsyncSession or None."""
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        if "db" in kwargs:
+            db = kwargs.pop("db")
+        elif args and (args[0] is None or isinstance(args[0], AsyncSession)):
+            db, args = args[0], args[1:]
+        else:
+            db = None
+        if db is not None:
+            return await func(db, *args, **kwargs)
+        async with session_scope() as db:
+            return await func(db, *args, **kwargs)
+    return wrapper
+
+# ---------------------------
+# Transaction CRUD functions
+# ---------------------------
+
+# CREATE
+@with_session
+async def create_transaction(db: AsyncSession, **kwargs):
+    tx = Transaction(**kwargs)
+    db.add(tx)
+    await db.commit()
+    await db.refresh(tx)
+    return tx
+
+# CREATE (bulk)
+@with_session
+async def bulk_create_transactions(db: AsyncSession, rows, batch_size=1000):
+    """Insert an iterable of transaction dicts, `batch_size` per INSERT + commit."""
+    total = 0
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= batch_size:
+            total += await _insert_batch(db, batch)
+            batch = []
+    if batch:
+        total += await _insert_batch(db, batch)
+    return total
+
+async def _insert_batch(db: AsyncSession, batch):
+    await db.execute(insert(Transaction), batch)
+    await db.commit()
+    return len(batch)
+
+# READ (by ID)
+@with_session
+async def get_transaction(db: AsyncSession, tx_id: int):
+    return await db.get(Transaction, tx_id)
+
+# READ (all, with optional filters)
+@with_session
+async def get_transactions(db: AsyncSession, skip=0, limit=100):
+    return (await db.scalars(select(Transaction).offset(skip).limit(limit))).all()
+
+# READ (keyset page, by time; optionally one card)
+@with_session
+async def get_transactions_page(db: AsyncSession, card_number=None, after=None, limit=100, descending=False):
+    stmt = select(Transaction)
+    if card_number:
+        stmt = stmt.where(Transaction.card_number == card_number)
+    order = [Transaction.timestamp, Transaction.id]
+    rows = (await db.scalars(keyset_query(stmt, order, after, limit, descending))).all()
+    return make_page(rows, order, limit)
+
+# READ (card transactions around a point in time)
+@with_session
+async def get_transactions_in_window(db: AsyncSession, card_number: str, center_time, window_hours=24):
+    start_time = center_time - timedelta(hours=window_hours)
+    end_time = center_time + timedelta(hours=window_hours)
+    return (await db.scalars(
+        select(Transaction).where(
+            Transaction.card_number == card_number,
+            Transaction.timestamp >= start_time,
+            Transaction.timestamp <= end_time
+        ).order_by(Transaction.timestamp.asc())
+    )).all()
+
+# UPDATE
+@with_session
+async def update_transaction(db: AsyncSession, tx_id: int, **kwargs):
+    tx = await get_transaction(db, tx_id)
+    if not tx:
+        return None
+    for key, value in kwargs.items():
+        setattr(tx, key, value)
+    await db.commit()
+    await db.refresh(tx)
+    return tx
+
+# DELETE
+@with_session
+async def delete_transaction(db: AsyncSession, tx_id: int):
+    tx = await get_transaction(db, tx_id)
+    if not tx:
+        return False
+    await db.delete(tx)
+    await db.commit()
+    return True
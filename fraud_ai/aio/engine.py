@@ -0,0 +1,64 @@
+# engine.py
+"""
+Async engines with the same tuning profiles as fraud_ai.engine.
+
+The configured DATABASE_URL is a sync URL; async_url() swaps in an async
+driver for the same database:
+
+    sqlite:///fraud_ai.db          -> sqlite+aiosqlite:///fraud_ai.db
+    postgresql://u:p@host/db       -> postgresql+asyncpg://u:p@host/db
+    postgres://u:p@host/db         -> postgresql+asyncpg://u:p@host/db
+    mysql://u:p@host/db            -> mysql+aiomysql://u:p@host/db
+
+URLs that already name an async driver are left alone.
+"""
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import create_async_engine
+from ..engine import ENGINE_PROFILES, _install_sqlite_pragmas, _is_sqlite_memory
+
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+    "postgres": "postgresql+asyncpg",
+    "mysql": "mysql+aiomysql",
+}
+KNOWN_ASYNC_DRIVERS = {"aiosqlite", "asyncpg", "psycopg", "aiomysql", "asyncmy"}
+
+
+def async_url(url):
+    url = make_url(url)
+    backend, _, driver = url.drivername.partition("+")
+    if driver in KNOWN_ASYNC_DRIVERS:
+        return url
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"No async driver known for '{url.drivername}'. Pass an async URL explicitly.")
+    return url.set(drivername=ASYNC_DRIVERS[backend])
+
+
+def make_async_engine(url, profile="development", **overrides):
+    """
+    AsyncEngine for `url` (sync or async form) tuned according to `profile`;
+    see fraud_ai.engine.make_engine.
+    """
+    if profile not in ENGINE_PROFILES:
+        raise ValueError(f"Unknown database profile '{profile}'. Choose from: {', '.join(ENGINE_PROFILES)}")
+    settings = ENGINE_PROFILES[profile]
+    url = async_url(url)
+    is_sqlite = url.get_backend_name() == "sqlite"
+
+    kwargs = {"echo": settings["echo"]}
+    if not (is_sqlite and _is_sqlite_memory(url)):
+        kwargs.update(settings["pool"])
+    kwargs.update(overrides)
+
+    engine = create_async_engine(url, **kwargs)
+
+    if is_sqlite and settings["sqlite_pragmas"]:
+        pragmas = dict(settings["sqlite_pragmas"])
+        if _is_sqlite_memory(url):
+            pragmas.pop("journal_mode", None)
+            pragmas.pop("mmap_size", None)
+        # connection events live on the sync engine behind the async facade
+        _install_sqlite_pragmas(engine.sync_engine, pragmas)
+
+    return engine
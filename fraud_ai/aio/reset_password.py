@@ -0,0 +1,37 @@
+# reset_password.py
+"""Async password-reset CRUD; mirrors fraud_ai.reset_password."""
+from datetime import datetime
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from ..models import PasswordReset
+from .. import card_status
+from .data import with_session
+
+@with_session
+async def add_password_reset(db: AsyncSession, card_number: str, reason: str = "compromised credentials"):
+    reset = PasswordReset(
+        card_number=card_number,
+        reason=reason,
+        timestamp=datetime.utcnow()
+    )
+    db.add(reset)
+    await db.commit()
+    card_status.invalidate(card_number)
+    await db.refresh(reset)
+    return reset
+
+@with_session
+async def has_password_reset(db: AsyncSession, card_number: str):
+    return (await db.scalars(
+        select(PasswordReset).where(
+            PasswordReset.card_number == card_number
+        ).order_by(PasswordReset.timestamp.desc())
+    )).first()
+
+@with_session
+async def remove_password_reset(db: AsyncSession, card_number: str):
+    reset = await has_password_reset(db, card_number)
+    if reset:
+        await db.delete(reset)
+        await db.commit()
+        card_status.invalidate(card_number)
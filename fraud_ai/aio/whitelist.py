@@ -0,0 +1,44 @@
+# whitelist.py
+"""Async whitelist CRUD; mirrors fraud_ai.whitelist."""
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from ..models import Whitelist
+from .. import card_status, expiry
+from .data import with_session
+
+# CREATE
+@with_session
+async def add_to_whitelist(db: AsyncSession, card_number: str):
+    entry = Whitelist(card_number=card_number)
+    db.add(entry)
+    await db.commit()
+    card_status.invalidate(card_number)
+    await db.refresh(entry)
+    return entry
+
+# READ (by card number)
+@with_session
+async def is_card_whitelisted(db: AsyncSession, card_number: str):
+    return (await db.scalars(select(Whitelist).where(Whitelist.card_number == card_number))).first()
+
+# READ (all)
+@with_session
+async def get_whitelist(db: AsyncSession):
+    return (await db.scalars(select(Whitelist))).all()
+
+# DELETE (by card number)
+@with_session
+async def remove_from_whitelist(db: AsyncSession, card_number: str):
+    entry = await is_card_whitelisted(db, card_number)
+    if entry:
+        await db.delete(entry)
+        await db.commit()
+        card_status.invalidate(card_number)
+        return True
+    return False
+
+# CLEANUP: Remove expired whitelist entries (older than 30 min), in one DELETE (see expiry.py)
+@with_session
+async def cleanup_expired_whitelist(db: AsyncSession, expiry_minutes=30):
+    policy = expiry.whitelist_policy(expiry_minutes)
+    return (await expiry.sweep_async(db, [policy])).deleted[policy.table]
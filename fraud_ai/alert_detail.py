@@ -0,0 +1,138 @@
+# alert_detail.py
+"""
+Read model for the alert dashboards.
+
+Rendering one alert used to cost a query for the alert, one for its
+transaction, one for the card's recent transactions, the card flags and one
+for the transcript, all repeated on every auto-refresh. load_alert_details
+fetches everything for any number of alerts in three statements:
+
+1. the alerts joined to their transaction, with the three card flags as
+   EXISTS columns on the same row;
+2. the transcripts of all the alerts (selectinload of Alert.messages);
+3. the last `recent_limit` transactions of every card involved (one
+   window-function query).
+
+The result is plain immutable NamedTuples, not ORM instances. They are not
+bound to a session, never lazy-load, and can be pickled into st.cache_data
+or shared between threads.
+"""
+from datetime import datetime
+from typing import NamedTuple, Optional
+from sqlalchemy import exists, func, select
+from sqlalchemy.orm import Session, contains_eager, selectinload
+from .card_status import CardStatus
+from .models import Alert, BlockedCard, PasswordReset, Transaction, Whitelist
+
+
+class TransactionRecord(NamedTuple):
+    id: int
+    card_number: str
+    amount: float
+    timestamp: datetime
+    status: str
+    fraud_score: Optional[float]
+    is_fraud: bool
+    merchant_name: str
+    customer_first_name: str
+    customer_last_name: str
+
+
+class MessageRecord(NamedTuple):
+    role: str
+    content: str
+    timestamp: datetime
+
+
+class AlertDetail(NamedTuple):
+    id: int
+    transaction_id: int
+    status: str
+    created_at: datetime
+    analyst_notes: Optional[str]
+    transaction: Optional[TransactionRecord]
+    card_status: Optional[CardStatus]
+    recent_transactions: tuple      # TransactionRecord, newest first
+    messages: tuple                 # MessageRecord, in conversation order
+
+    @property
+    def card_number(self):
+        return self.transaction.card_number if self.transaction else None
+
+    @property
+    def customer_name(self):
+        tx = self.transaction
+        if tx and tx.customer_first_name and tx.customer_last_name:
+            return f"{tx.customer_first_name} {tx.customer_last_name}"
+        return "Unknown"
+
+
+def _transaction_record(tx):
+    return TransactionRecord(
+        tx.id, tx.card_number, tx.amount, tx.timestamp, tx.status, tx.fraud_score,
+        tx.is_fraud, tx.merchant_name, tx.customer_first_name, tx.customer_last_name,
+    )
+
+
+def _recent_transactions(db: Session, card_numbers, limit):
+    """{card_number: (TransactionRecord, ...)} with the `limit` newest per card."""
+    if not card_numbers:
+        return {}
+    ranked = select(
+        Transaction.id,
+        func.row_number().over(partition_by=Transaction.card_number,
+                               order_by=Transaction.id.desc()).label("rank"),
+    ).where(Transaction.card_number.in_(card_numbers)).subquery()
+    rows = (
+        db.query(Transaction)
+        .join(ranked, ranked.c.id == Transaction.id)
+        .filter(ranked.c.rank <= limit)
+        .order_by(Transaction.card_number, Transaction.id.desc())
+        .all()
+    )
+    recent = {card: [] for card in card_numbers}
+    for tx in rows:
+        recent[tx.card_number].append(_transaction_record(tx))
+    return {card: tuple(txs) for card, txs in recent.items()}
+
+
+def load_alert_details(db: Session, alert_ids, recent_limit=10):
+    """AlertDetail for each id that exists, in the order of `alert_ids`."""
+    alert_ids = list(alert_ids)
+    if not alert_ids:
+        return []
+    rows = (
+        db.query(
+            Alert,
+            exists().where(Whitelist.card_number == Transaction.card_number),
+            exists().where(BlockedCard.card_number == Transaction.card_number),
+            exists().where(PasswordReset.card_number == Transaction.card_number),
+        )
+        .outerjoin(Alert.transaction)
+        .options(contains_eager(Alert.transaction), selectinload(Alert.messages))
+        .filter(Alert.id.in_(alert_ids))
+        .all()
+    )
+    cards = sorted({a.transaction.card_number for a, *_ in rows if a.transaction is not None})
+    recent = _recent_transactions(db, cards, recent_limit)
+
+    by_id = {}
+    for alert, whitelisted, blocked, password_reset in rows:
+        tx = alert.transaction
+        by_id[alert.id] = AlertDetail(
+            id=alert.id,
+            transaction_id=alert.transaction_id,
+            status=alert.status,
+            created_at=alert.created_at,
+            analyst_notes=alert.analyst_notes,
+            transaction=_transaction_record(tx) if tx is not None else None,
+            card_status=CardStatus(bool(whitelisted), bool(blocked), bool(password_reset)) if tx is not None else None,
+            recent_transactions=recent.get(tx.card_number, ()) if tx is not None else (),
+            messages=tuple(MessageRecord(m.role, m.content, m.timestamp) for m in alert.messages),
+        )
+    return [by_id[i] for i in alert_ids if i in by_id]
+
+
+def load_alert_detail(db: Session, alert_id: int, recent_limit=10):
+    details = load_alert_details(db, [alert_id], recent_limit)
+    return details[0] if details else None
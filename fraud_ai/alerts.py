@@ -1,7 +1,11 @@
+from sqlalchemy import update
 from sqlalchemy.orm import Session
+from .data import with_session
 from .models import Alert
+from .pagination import keyset_paginate
 
 # CREATE
+@with_session
 def create_alert(db: Session, transaction_id: int, status="open", analyst_notes=None):
     alert = Alert(
         transaction_id=transaction_id,
@@ -14,17 +18,28 @@ def create_alert(db: Session, transaction_id: int, status="open", analyst_notes=
     return alert
 
 # READ (by ID)
+@with_session
 def get_alert(db: Session, alert_id: int):
     return db.query(Alert).filter(Alert.id == alert_id).first()
 
 # READ (all, with optional filters)
+@with_session
 def get_alerts(db: Session, status=None, skip=0, limit=100):
     query = db.query(Alert)
     if status:
         query = query.filter(Alert.status == status)
     return query.offset(skip).limit(limit).all()
 
+# READ (keyset page, by creation time). Cost does not grow with depth, see pagination.py
+@with_session
+def get_alerts_page(db: Session, status=None, after=None, limit=100, descending=False):
+    query = db.query(Alert)
+    if status:
+        query = query.filter(Alert.status == status)
+    return keyset_paginate(query, [Alert.created_at, Alert.id], after, limit, descending)
+
 # UPDATE
+@with_session
 def update_alert(db: Session, alert_id: int, **kwargs):
     alert = get_alert(db, alert_id)
     if not alert:
@@ -35,7 +50,21 @@ def update_alert(db: Session, alert_id: int, **kwargs):
     db.refresh(alert)
     return alert
 
+# CLAIM: atomically move an alert from one status to another.
+# Returns True only for the worker whose UPDATE actually flipped the row,
+# so two workers polling the same open alerts never dial the same customer.
+@with_session
+def claim_alert(db: Session, alert_id: int, from_status="open", to_status="in_progress"):
+    result = db.execute(
+        update(Alert)
+        .where(Alert.id == alert_id, Alert.status == from_status)
+        .values(status=to_status)
+    )
+    db.commit()
+    return result.rowcount == 1
+
 # DELETE
+@with_session
 def delete_alert(db: Session, alert_id: int):
     alert = get_alert(db, alert_id)
     if not alert:
@@ -0,0 +1,101 @@
+# audio_buffer.py
+"""
+In-memory audio path for speech-to-text.
+
+WebRTC frames are copied into a preallocated int16 ring buffer (no
+np.concatenate growth per turn) and encoded straight into a BytesIO that
+the transcription clients accept as a file, so a turn never touches disk.
+"""
+import io
+import numpy as np
+import soundfile as sf
+
+
+def frame_to_mono_int16(frame):
+    """av.AudioFrame -> (mono int16 samples, sample rate)."""
+    samples = frame.to_ndarray()
+    channels = len(frame.layout.channels)
+    if frame.format.is_planar:
+        samples = samples.reshape(channels, -1)
+    else:
+        samples = samples.reshape(-1, channels).T   # packed: interleaved L R L R...
+    if np.issubdtype(samples.dtype, np.floating):
+        samples = np.clip(samples, -1.0, 1.0) * 32767
+    if channels > 1:
+        samples = samples.mean(axis=0)
+    else:
+        samples = samples[0]
+    samples = samples.astype(np.int16, copy=False)
+    return samples, frame.sample_rate
+
+
+class PCMRingBuffer:
+    """Fixed-size mono int16 buffer; once full, the oldest samples are overwritten."""
+
+    def __init__(self, samplerate=48000, max_seconds=30):
+        self.max_seconds = max_seconds
+        self._allocate(samplerate)
+
+    def _allocate(self, samplerate):
+        self.samplerate = samplerate
+        self._data = np.zeros(int(samplerate * self.max_seconds), dtype=np.int16)
+        self._start = 0
+        self._len = 0
+
+    @property
+    def capacity(self):
+        return len(self._data)
+
+    @property
+    def duration(self):
+        return self._len / self.samplerate
+
+    def __len__(self):
+        return self._len
+
+    def clear(self):
+        self._start = 0
+        self._len = 0
+
+    def append(self, samples):
+        samples = np.asarray(samples, dtype=np.int16).reshape(-1)
+        cap = self.capacity
+        if len(samples) >= cap:
+            self._data[:] = samples[-cap:]
+            self._start = 0
+            self._len = cap
+            return
+        end = (self._start + self._len) % cap
+        first = min(len(samples), cap - end)
+        self._data[end:end + first] = samples[:first]
+        self._data[:len(samples) - first] = samples[first:]
+        overflow = max(0, self._len + len(samples) - cap)
+        self._start = (self._start + overflow) % cap
+        self._len = min(cap, self._len + len(samples))
+
+    def append_frame(self, frame):
+        samples, samplerate = frame_to_mono_int16(frame)
+        if samplerate != self.samplerate:
+            # sample rate changed mid-stream (new track): start over at the new rate
+            self._allocate(samplerate)
+        self.append(samples)
+
+    def samples(self):
+        """Buffered audio in chronological order."""
+        end = self._start + self._len
+        if end <= self.capacity:
+            return self._data[self._start:end].copy()
+        return np.concatenate((self._data[self._start:], self._data[:end - self.capacity]))
+
+    def encode(self, fmt="FLAC"):
+        return encode_audio(self.samples(), self.samplerate, fmt)
+
+
+def encode_audio(samples, samplerate, fmt="FLAC"):
+    """Encode int16 samples into a named BytesIO ready for upload."""
+    fmt = fmt.upper()
+    buffer = io.BytesIO()
+    sf.write(buffer, samples, samplerate, format=fmt, subtype="PCM_16" if fmt in ("WAV", "FLAC") else None)
+    buffer.seek(0)
+    buffer.name = f"speech.{fmt.lower()}"   # the OpenAI client infers the format from the name
+    return buffer
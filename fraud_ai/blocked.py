@@ -1,27 +1,35 @@
 from sqlalchemy.orm import Session
+from .data import with_session
 from .models import BlockedCard
+from . import card_status
 
 # CREATE
+@with_session
 def add_to_blocked(db: Session, card_number: str):
     entry = BlockedCard(card_number=card_number)
     db.add(entry)
     db.commit()
+    card_status.invalidate(card_number)
     db.refresh(entry)
     return entry
 
 # READ (by card number)
+@with_session
 def is_card_blocked(db: Session, card_number: str):
     return db.query(BlockedCard).filter(BlockedCard.card_number == card_number).first()
 
 # READ (all)
+@with_session
 def get_blocked_cards(db: Session):
     return db.query(BlockedCard).all()
 
 # DELETE (by card number)
+@with_session
 def remove_from_blocked(db: Session, card_number: str):
     entry = is_card_blocked(db, card_number)
     if entry:
         db.delete(entry)
         db.commit()
+        card_status.invalidate(card_number)
         return True
     return False
\ No newline at end of file
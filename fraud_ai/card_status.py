@@ -0,0 +1,140 @@
+# card_status.py
+"""
+Whitelist / blocked / password-reset flags for a card, in one query.
+
+Results are kept in a small in-process LRU cache with a TTL. The write
+helpers in whitelist.py, blocked.py and reset_password.py call invalidate()
+after every commit, so a status check after a change in this process is
+never stale. Writes made by another process are picked up when the TTL
+expires.
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import NamedTuple
+from sqlalchemy import exists, literal, select, union_all
+from sqlalchemy.orm import Session
+from .models import Whitelist, BlockedCard, PasswordReset
+
+
+class CardStatus(NamedTuple):
+    whitelisted: bool
+    blocked: bool
+    password_reset: bool
+
+
+class TTLCache:
+    """Thread-safe LRU cache whose entries expire after `ttl` seconds."""
+
+    def __init__(self, maxsize=10000, ttl=15.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._data)
+
+    def get(self, key):
+        now = time.monotonic()
+        with self._lock:
+            item = self._data.get(key)
+            if item is None or item[1] < now:
+                if item is not None:
+                    del self._data[key]
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return item[0]
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = (value, time.monotonic() + self.ttl)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def pop(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+_cache = TTLCache()
+
+# Keep IN (...) lists well under SQLite's bound-parameter limit
+_BATCH_SIZE = 500
+
+
+def invalidate(card_number: str = None):
+    """Drop the cached status of one card, or of every card if none is given."""
+    if card_number is None:
+        _cache.clear()
+    else:
+        _cache.pop(card_number)
+
+
+# ---------------------------
+# Queries
+# ---------------------------
+
+def _query_card_status(db: Session, card_number: str):
+    row = db.execute(select(
+        exists().where(Whitelist.card_number == card_number),
+        exists().where(BlockedCard.card_number == card_number),
+        exists().where(PasswordReset.card_number == card_number),
+    )).one()
+    return CardStatus(bool(row[0]), bool(row[1]), bool(row[2]))
+
+
+def _query_card_statuses(db: Session, card_numbers):
+    flags = {card: [False, False, False] for card in card_numbers}
+    query = union_all(
+        select(Whitelist.card_number, literal(0)).where(Whitelist.card_number.in_(card_numbers)),
+        select(BlockedCard.card_number, literal(1)).where(BlockedCard.card_number.in_(card_numbers)),
+        select(PasswordReset.card_number, literal(2)).where(PasswordReset.card_number.in_(card_numbers)),
+    )
+    for card_number, flag in db.execute(query):
+        flags[card_number][flag] = True
+    return {card: CardStatus(*values) for card, values in flags.items()}
+
+
+# ---------------------------
+# Public API
+# ---------------------------
+
+def get_card_status(db: Session, card_number: str, use_cache=True):
+    if use_cache:
+        cached = _cache.get(card_number)
+        if cached is not None:
+            return cached
+    status = _query_card_status(db, card_number)
+    _cache.set(card_number, status)
+    return status
+
+
+def get_card_statuses(db: Session, card_numbers, use_cache=True):
+    """Status of many cards; cache misses cost one query per 500 cards."""
+    result = {}
+    missing = []
+    for card_number in dict.fromkeys(card_numbers):
+        cached = _cache.get(card_number) if use_cache else None
+        if cached is None:
+            missing.append(card_number)
+        else:
+            result[card_number] = cached
+    for i in range(0, len(missing), _BATCH_SIZE):
+        for card_number, status in _query_card_statuses(db, missing[i:i + _BATCH_SIZE]).items():
+            _cache.set(card_number, status)
+            result[card_number] = status
+    return result
+
+
+def cache_stats():
+    return {"hits": _cache.hits, "misses": _cache.misses, "size": len(_cache)}
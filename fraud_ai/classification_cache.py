@@ -0,0 +1,181 @@
+# classification_cache.py
+"""
+Cache of LLM classification results.
+
+Short replies ("yes", "no", "thank you, bye") come back thousands of times
+across calls; once one has been classified by the LLM for a given step, the
+label is reused instead of paying another round trip.
+
+Key = (classifier, flow state, normalized utterance, optional hash of the
+last assistant turn). The utterance is normalized with
+fast_classifier.normalize (case, accents, punctuation), so "Yes." and "yes"
+share an entry. The state is the step of the flow the reply answers, set
+by fraud_flow.ask_and_classify with use_flow_state. It is needed because one
+classifier can serve several steps: user_reply answers the transaction
+question, the re-ask and the secondary-transaction checks. Outside a flow
+step it is "". The assistant turn is left out by default,
+since it is LLM-generated and differs on every call. Turn it on where the
+same words can mean different things after different questions.
+
+Two tiers:
+- an in-process LRU with TTL (card_status.TTLCache);
+- an optional SQLite file shared by every worker process on the host.
+  Memory misses fall through to it, and disk hits are promoted into memory.
+
+REPEAT is never stored: it is also what an unparseable LLM answer maps to.
+"""
+import hashlib
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from fraud_ai.card_status import TTLCache
+from fraud_ai.fast_classifier import normalize
+
+UNCACHED_LABELS = ("REPEAT",)
+
+_current_state = ContextVar("classification_flow_state", default="")
+
+
+def current_flow_state():
+    """Flow step being classified (part of the cache key)."""
+    return _current_state.get()
+
+
+@contextmanager
+def use_flow_state(state):
+    token = _current_state.set(state or "")
+    try:
+        yield state
+    finally:
+        _current_state.reset(token)
+
+
+def make_key(classifier, utterance, state="", last_assistant=None):
+    parts = [classifier, state or "", normalize(utterance)]
+    if last_assistant is not None:
+        parts.append(hashlib.sha1(normalize(last_assistant).encode("utf-8")).hexdigest()[:16])
+    return "\x1f".join(parts)
+
+
+def last_assistant_turn(conversation_history):
+    for message in reversed(conversation_history):
+        if message["role"] == "assistant":
+            return message["content"]
+    return ""
+
+
+class ClassificationCache:
+    def __init__(self, max_entries=10000, ttl=86400.0, path=None):
+        self.ttl = ttl
+        self.path = path
+        self._memory = TTLCache(maxsize=max_entries, ttl=ttl)
+        self._lock = threading.Lock()
+        self._conn = None
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        if path:
+            self._open()
+
+    # ---------------------------
+    # SQLite backing store
+    # ---------------------------
+
+    def _open(self):
+        self._conn = sqlite3.connect(self.path, timeout=5, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS classification_cache ("
+            " key TEXT PRIMARY KEY, label TEXT NOT NULL, expires_at REAL NOT NULL)"
+        )
+
+    def _disk_get(self, key):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT label FROM classification_cache WHERE key = ? AND expires_at > ?",
+                (key, time.time()),
+            ).fetchone()
+        return row[0] if row else None
+
+    def _disk_set(self, key, label):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO classification_cache (key, label, expires_at) VALUES (?, ?, ?)",
+                (key, label, time.time() + self.ttl),
+            )
+
+    def purge_expired(self):
+        """Delete expired rows from the backing store; returns how many."""
+        if self._conn is None:
+            return 0
+        with self._lock:
+            return self._conn.execute(
+                "DELETE FROM classification_cache WHERE expires_at <= ?", (time.time(),)
+            ).rowcount
+
+    # ---------------------------
+    # Public API
+    # ---------------------------
+
+    def get(self, key):
+        label = self._memory.get(key)
+        if label is not None:
+            self.hits += 1
+            return label
+        if self._conn is not None:
+            label = self._disk_get(key)
+            if label is not None:
+                self.hits += 1
+                self.disk_hits += 1
+                self._memory.set(key, label)
+                return label
+        self.misses += 1
+        return None
+
+    def set(self, key, label):
+        if not label or label in UNCACHED_LABELS:
+            return
+        self._memory.set(key, label)
+        if self._conn is not None:
+            self._disk_set(key, label)
+
+    def clear(self):
+        self._memory.clear()
+        if self._conn is not None:
+            with self._lock:
+                self._conn.execute("DELETE FROM classification_cache")
+
+    def close(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "size": len(self._memory),
+        }
+
+
+_shared_cache = None
+
+
+def get_classification_cache():
+    """Process-wide cache, configured from fraud_ai.config on first use."""
+    global _shared_cache
+    if _shared_cache is None:
+        from fraud_ai.config import CLASSIFICATION_CACHE_PATH, CLASSIFICATION_CACHE_TTL
+        _shared_cache = ClassificationCache(ttl=CLASSIFICATION_CACHE_TTL, path=CLASSIFICATION_CACHE_PATH or None)
+    return _shared_cache
+
+
+def set_classification_cache(cache):
+    """Swap the shared cache (e.g. an isolated or disabled one in scripts). None resets it."""
+    global _shared_cache
+    _shared_cache = cache
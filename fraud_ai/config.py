@@ -1,7 +1,33 @@
+import os
 import streamlit as st
 
-# statica → resta invariata
-DATABASE_URL = "sqlite:///fraud_ai.db"
+# statica → resta invariata (sovrascrivibile da env per i worker di produzione)
+DATABASE_URL = os.getenv("FRAUD_AI_DATABASE_URL", "sqlite:///fraud_ai.db")
+# "development" (echo SQL, default SQLite) oppure "production" (vedi fraud_ai/engine.py)
+DATABASE_PROFILE = os.getenv("FRAUD_AI_DB_PROFILE", "development")
+# soglia del classificatore rapido a regole (fraud_ai/fast_classifier.py); > 1 lo disattiva
+FAST_PATH_THRESHOLD = float(os.getenv("FRAUD_AI_FAST_PATH_THRESHOLD", "0.85"))
+# cache delle classificazioni LLM (fraud_ai/classification_cache.py):
+# file SQLite condiviso tra i worker (vuoto = solo in memoria), TTL in secondi,
+# e se includere nella chiave l'ultima battuta dell'assistente
+CLASSIFICATION_CACHE_PATH = os.getenv("FRAUD_AI_CLASSIFICATION_CACHE", "")
+CLASSIFICATION_CACHE_TTL = float(os.getenv("FRAUD_AI_CLASSIFICATION_CACHE_TTL", "86400"))
+CLASSIFICATION_CACHE_CONTEXT = os.getenv("FRAUD_AI_CLASSIFICATION_CACHE_CONTEXT", "0") == "1"
+# budget in token della cronologia inviata al modello (fraud_ai/history_window.py);
+# oltre, i turni più vecchi vengono riassunti
+HISTORY_MAX_TOKENS = int(os.getenv("FRAUD_AI_HISTORY_MAX_TOKENS", "2000"))
+HISTORY_RECENT_MESSAGES = int(os.getenv("FRAUD_AI_HISTORY_RECENT_MESSAGES", "6"))
+# cache dell'audio sintetizzato (fraud_ai/tts_cache.py): cartella dei file PCM
+# (vuoto = solo in memoria), limite della cache in memoria e su disco in MB
+TTS_CACHE_DIR = os.getenv("FRAUD_AI_TTS_CACHE_DIR", ".tts_cache")
+TTS_CACHE_MEMORY_MB = float(os.getenv("FRAUD_AI_TTS_CACHE_MEMORY_MB", "64"))
+TTS_CACHE_MAX_MB = float(os.getenv("FRAUD_AI_TTS_CACHE_MAX_MB", "512"))
+# scadenza di whitelist, blocchi carta e reset password (fraud_ai/expiry.py):
+# TTL in minuti per tabella (0 = non scade mai) e intervallo del sweeper in secondi
+WHITELIST_TTL_MINUTES = float(os.getenv("FRAUD_AI_WHITELIST_TTL_MINUTES", "30"))
+BLOCKED_TTL_MINUTES = float(os.getenv("FRAUD_AI_BLOCKED_TTL_MINUTES", "0"))
+PASSWORD_RESET_TTL_MINUTES = float(os.getenv("FRAUD_AI_PASSWORD_RESET_TTL_MINUTES", "0"))
+EXPIRY_SWEEP_INTERVAL = float(os.getenv("FRAUD_AI_EXPIRY_SWEEP_INTERVAL", "60"))
 
 class _DynamicKey:
     """Wrapper che legge una chiave dinamica da st.session_state"""
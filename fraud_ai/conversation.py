@@ -1,8 +1,17 @@
 from sqlalchemy.orm import Session
+from .data import with_session
 from .models import AlertConversation
+from .pagination import keyset_paginate
+from .transcript_logger import current_transcript_logger
 from datetime import datetime
 
+@with_session
 def add_message(db: Session, alert_id: int, role: str, content: str):
+    # Inside a call with a write-behind logger the row is only queued
+    transcript = current_transcript_logger()
+    if transcript is not None:
+        return transcript.add_message(alert_id, role, content)
+
     msg = AlertConversation(
         alert_id=alert_id,
         role=role,
@@ -14,5 +23,12 @@ def add_message(db: Session, alert_id: int, role: str, content: str):
     db.refresh(msg)
     return msg
 
+@with_session
 def get_conversation(db: Session, alert_id: int):
-    return db.query(AlertConversation).filter(AlertConversation.alert_id == alert_id).order_by(AlertConversation.timestamp).all()
\ No newline at end of file
+    return db.query(AlertConversation).filter(AlertConversation.alert_id == alert_id).order_by(AlertConversation.timestamp, AlertConversation.id).all()
+
+@with_session
+def get_conversation_page(db: Session, alert_id: int, after=None, limit=100):
+    """Keyset page of one alert's transcript, in order (see pagination.py)."""
+    query = db.query(AlertConversation).filter(AlertConversation.alert_id == alert_id)
+    return keyset_paginate(query, [AlertConversation.timestamp, AlertConversation.id], after, limit)
@@ -1,6 +1,6 @@
 import asyncio
 from openai import AsyncOpenAI
-from nltk.tokenize import sent_tokenize
+from fraud_ai.sentence_splitter import SentenceSplitter
 from fraud_ai.config import OPENAI_API_KEY
 from fraud_ai.conversation import add_message
 from fraud_ai.prompt_builder import build_system_prompt
@@ -49,20 +49,17 @@ async def stream_llm_with_tts(step_prompt, history, system_prompt, tts_backend="
     elif tts_backend == "elevenlabs":
         tts_queue = asyncio.Queue()
         tts_task = asyncio.create_task(tts_worker(tts_queue))
-        buffer = ""
+        splitter = SentenceSplitter()
         async for event in stream:
             delta = event.choices[0].delta
             if delta and delta.content:
                 print(delta.content, end="", flush=True)
-                buffer += delta.content
                 full_text += delta.content
-                sentences = sent_tokenize(buffer)
-                if len(sentences) > 1:
-                    for s in sentences[:-1]:
-                        await tts_queue.put(s.strip())
-                    buffer = sentences[-1]
-        if buffer.strip():
-            await tts_queue.put(buffer.strip())
+                for s in splitter.feed(delta.content):
+                    await tts_queue.put(s)
+        rest = splitter.flush()
+        if rest:
+            await tts_queue.put(rest)
         await tts_queue.put(None)
         await tts_task
         print()
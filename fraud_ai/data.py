@@ -1,15 +1,25 @@
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, Session
-from .config import DATABASE_URL
-from .models import Base, Transaction
+import functools
+from contextlib import contextmanager
+from datetime import timedelta
+from sqlalchemy import insert
+from sqlalchemy.orm import scoped_session, sessionmaker, Session
+from .config import DATABASE_URL, DATABASE_PROFILE
+from .engine import make_engine
+from .migrations import upgrade
+from .models import Transaction
+from .pagination import keyset_paginate
 
 
 
-engine = create_engine(DATABASE_URL, echo=True)
+engine = make_engine(DATABASE_URL, DATABASE_PROFILE)
 SessionLocal = sessionmaker(bind=engine)
+# One session per thread, e.g. per Streamlit script run. A Session is not
+# thread-safe: never cache one and share it between viewers or calls.
+ScopedSession = scoped_session(SessionLocal)
 
 def init_db():
-    Base.metadata.create_all(bind=engine)
+    # create_all + the indexes an existing database is still missing
+    upgrade(engine)
 
 def get_db():
     db = SessionLocal()
@@ -18,11 +28,55 @@ def get_db():
     finally:
         db.close()
 
+# ---------------------------
+# Units of work
+# ---------------------------
+
+@contextmanager
+def session_scope(session_factory=SessionLocal):
+    """
+    A short-lived session for one unit of work: committed on success,
+    rolled back on error, always closed (its connection goes back to the
+    pool). Objects stay readable after the block (no expire on commit).
+    """
+    db = session_factory(expire_on_commit=False)
+    try:
+        yield db
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+def with_session(func):
+    """
+    Makes the `db` argument of a CRUD helper optional: called with db=None
+    (or without it), the helper runs in its own session_scope().
+
+    A positional first argument is taken as `db` only if it is a Session or
+    None, so is_card_whitelisted("1234") reads the card, not the session.
+    """
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        if "db" in kwargs:
+            db = kwargs.pop("db")
+        elif args and (args[0] is None or isinstance(args[0], Session)):
+            db, args = args[0], args[1:]
+        else:
+            db = None
+        if db is not None:
+            return func(db, *args, **kwargs)
+        with session_scope() as db:
+            return func(db, *args, **kwargs)
+    return wrapper
+
 # ---------------------------
 # Transaction CRUD functions
 # ---------------------------
 
 # CREATE
+@with_session
 def create_transaction(db: Session, **kwargs):
     tx = Transaction(**kwargs)
     db.add(tx)
@@ -30,15 +84,63 @@ def create_transaction(db: Session, **kwargs):
     db.refresh(tx)
     return tx
 
+# CREATE (bulk)
+@with_session
+def bulk_create_transactions(db: Session, rows, batch_size=1000):
+    """
+    Insert an iterable (or generator) of transaction dicts.
+
+    Rows are consumed lazily and written `batch_size` at a time, each batch as
+    a single executemany INSERT followed by one commit. Returns the number of
+    rows inserted.
+    """
+    total = 0
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= batch_size:
+            total += _insert_batch(db, batch)
+            batch = []
+    if batch:
+        total += _insert_batch(db, batch)
+    return total
+
+def _insert_batch(db: Session, batch):
+    db.execute(insert(Transaction), batch)
+    db.commit()
+    return len(batch)
+
 # READ (by ID)
+@with_session
 def get_transaction(db: Session, tx_id: int):
     return db.query(Transaction).filter(Transaction.id == tx_id).first()
 
 # READ (all, with optional filters)
+@with_session
 def get_transactions(db: Session, skip=0, limit=100):
     return db.query(Transaction).offset(skip).limit(limit).all()
 
+# READ (keyset page, by time; optionally one card). Cost does not grow with depth, see pagination.py
+@with_session
+def get_transactions_page(db: Session, card_number=None, after=None, limit=100, descending=False):
+    query = db.query(Transaction)
+    if card_number:
+        query = query.filter(Transaction.card_number == card_number)
+    return keyset_paginate(query, [Transaction.timestamp, Transaction.id], after, limit, descending)
+
+# READ (card transactions around a point in time)
+@with_session
+def get_transactions_in_window(db: Session, card_number: str, center_time, window_hours=24):
+    start_time = center_time - timedelta(hours=window_hours)
+    end_time = center_time + timedelta(hours=window_hours)
+    return db.query(Transaction).filter(
+        Transaction.card_number == card_number,
+        Transaction.timestamp >= start_time,
+        Transaction.timestamp <= end_time
+    ).order_by(Transaction.timestamp.asc()).all()
+
 # UPDATE
+@with_session
 def update_transaction(db: Session, tx_id: int, **kwargs):
     tx = get_transaction(db, tx_id)
     if not tx:
@@ -50,6 +152,7 @@ def update_transaction(db: Session, tx_id: int, **kwargs):
     return tx
 
 # DELETE
+@with_session
 def delete_transaction(db: Session, tx_id: int):
     tx = get_transaction(db, tx_id)
     if not tx:
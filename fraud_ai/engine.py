@@ -0,0 +1,86 @@
+# engine.py
+"""
+Engine factory with named tuning profiles.
+
+    development -> SQL echo on, default SQLite settings (the historical behaviour)
+    production  -> no echo, WAL journal, synchronous=NORMAL, mmap, bigger page
+                   cache, busy timeout and a sized connection pool, so the
+                   dashboard reads no longer serialize against call-flow writes
+
+Pick the profile with FRAUD_AI_DB_PROFILE and the database with
+FRAUD_AI_DATABASE_URL (see config.py).
+"""
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
+
+ENGINE_PROFILES = {
+    "development": {
+        "echo": True,
+        "sqlite_pragmas": {},
+        "pool": {},
+    },
+    "production": {
+        "echo": False,
+        "sqlite_pragmas": {
+            "journal_mode": "WAL",
+            "synchronous": "NORMAL",
+            "mmap_size": 256 * 1024 * 1024,   # 256 MB
+            "cache_size": -64 * 1024,         # negative = KiB, i.e. 64 MB
+            "busy_timeout": 5000,             # ms
+            "temp_store": "MEMORY",
+        },
+        "pool": {
+            "pool_size": 10,
+            "max_overflow": 20,
+            "pool_timeout": 30,
+            "pool_recycle": 3600,
+            "pool_pre_ping": True,
+        },
+    },
+}
+
+
+def _is_sqlite_memory(url):
+    return url.get_backend_name() == "sqlite" and url.database in (None, "", ":memory:")
+
+
+def _install_sqlite_pragmas(engine, pragmas):
+    @event.listens_for(engine, "connect")
+    def _set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in pragmas.items():
+                cursor.execute(f"PRAGMA {name}={value}")
+        finally:
+            cursor.close()
+
+
+def make_engine(url, profile="development", **overrides):
+    """
+    Create an Engine for `url` tuned according to `profile`.
+
+    Extra keyword arguments are passed to create_engine and win over the
+    profile (e.g. make_engine(url, "production", echo=True)).
+    """
+    if profile not in ENGINE_PROFILES:
+        raise ValueError(f"Unknown database profile '{profile}'. Choose from: {', '.join(ENGINE_PROFILES)}")
+    settings = ENGINE_PROFILES[profile]
+    url = make_url(url)
+    is_sqlite = url.get_backend_name() == "sqlite"
+
+    kwargs = {"echo": settings["echo"]}
+    if not (is_sqlite and _is_sqlite_memory(url)):
+        # in-memory SQLite keeps SQLAlchemy's default single-connection pool
+        kwargs.update(settings["pool"])
+    kwargs.update(overrides)
+
+    engine = create_engine(url, **kwargs)
+
+    if is_sqlite and settings["sqlite_pragmas"]:
+        pragmas = dict(settings["sqlite_pragmas"])
+        if _is_sqlite_memory(url):
+            pragmas.pop("journal_mode", None)  # WAL is not available in memory
+            pragmas.pop("mmap_size", None)
+        _install_sqlite_pragmas(engine, pragmas)
+
+    return engine
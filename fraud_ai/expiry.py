@@ -0,0 +1,181 @@
+# expiry.py
+"""
+Expiry of time-limited card flags: whitelist entries, card blocks and
+password resets.
+
+Each table has an ExpiryPolicy (timestamp column + TTL). A sweep removes
+every expired row of a table with one set-based statement, served by the
+index on the timestamp column:
+
+    DELETE FROM whitelist WHERE whitelisted_at < :cutoff
+
+Nothing is loaded into Python, whatever the number of rows. Timestamps are
+naive UTC (the models default to datetime.utcnow), so the cutoff is too.
+
+ExpirySweeper runs the sweeps on a schedule inside the orchestrator's event
+loop, through the async session layer. Every sweep is logged and kept in
+`recent_sweeps` with the rows removed per table and how long it took.
+
+    sweeper = ExpirySweeper(AsyncSessionLocal, interval=60)
+    sweeper.start()
+    ...
+    await sweeper.stop()
+"""
+import asyncio
+import logging
+import time
+from collections import deque
+from datetime import datetime, timedelta
+from typing import NamedTuple, Optional
+from sqlalchemy import delete
+from sqlalchemy.orm import Session
+from . import card_status
+from .config import EXPIRY_SWEEP_INTERVAL, WHITELIST_TTL_MINUTES, BLOCKED_TTL_MINUTES, PASSWORD_RESET_TTL_MINUTES
+from .data import with_session
+from .models import BlockedCard, PasswordReset, Whitelist
+
+logger = logging.getLogger(__name__)
+
+# Last N sweeps, for dashboards / ad-hoc inspection
+recent_sweeps = deque(maxlen=200)
+
+
+class ExpiryPolicy(NamedTuple):
+    model: type
+    column: str                 # naive UTC timestamp attribute of `model`
+    ttl: timedelta
+
+    @property
+    def table(self):
+        return self.model.__tablename__
+
+    def statement(self, now=None):
+        cutoff = (now or datetime.utcnow()) - self.ttl
+        return (
+            delete(self.model)
+            .where(getattr(self.model, self.column) < cutoff)
+            .execution_options(synchronize_session=False)
+        )
+
+
+class SweepResult(NamedTuple):
+    finished_at: datetime
+    deleted: dict               # {table: rows removed}
+    seconds: float
+
+    @property
+    def total(self):
+        return sum(self.deleted.values())
+
+
+def whitelist_policy(minutes=WHITELIST_TTL_MINUTES):
+    return ExpiryPolicy(Whitelist, "whitelisted_at", timedelta(minutes=minutes))
+
+
+def default_policies():
+    """Policies from the config; a TTL of 0 minutes means the table never expires."""
+    policies = [
+        whitelist_policy(WHITELIST_TTL_MINUTES),
+        ExpiryPolicy(BlockedCard, "blocked_at", timedelta(minutes=BLOCKED_TTL_MINUTES)),
+        ExpiryPolicy(PasswordReset, "timestamp", timedelta(minutes=PASSWORD_RESET_TTL_MINUTES)),
+    ]
+    return [p for p in policies if p.ttl > timedelta(0)]
+
+
+def _finish(deleted, started):
+    result = SweepResult(datetime.utcnow(), deleted, time.perf_counter() - started)
+    recent_sweeps.append(result)
+    if result.total:
+        # the flags of unknown cards changed: drop the whole card status cache
+        card_status.invalidate()
+        logger.info("expiry sweep removed %s in %.1fms",
+                    ", ".join(f"{n} from {t}" for t, n in deleted.items() if n), result.seconds * 1000)
+    return result
+
+
+# ---------------------------
+# Sweeps
+# ---------------------------
+
+@with_session
+def sweep(db: Session, policies=None, now=None):
+    """Delete the expired rows of every policy in one transaction; returns a SweepResult."""
+    started = time.perf_counter()
+    deleted = {}
+    for policy in default_policies() if policies is None else policies:
+        deleted[policy.table] = db.execute(policy.statement(now)).rowcount
+    db.commit()
+    return _finish(deleted, started)
+
+
+async def sweep_async(db, policies=None, now=None):
+    """sweep() on an AsyncSession."""
+    started = time.perf_counter()
+    deleted = {}
+    for policy in default_policies() if policies is None else policies:
+        deleted[policy.table] = (await db.execute(policy.statement(now))).rowcount
+    await db.commit()
+    return _finish(deleted, started)
+
+
+# ---------------------------
+# Scheduler
+# ---------------------------
+
+class ExpirySweeper:
+    """Runs sweep_async every `interval` seconds on its own AsyncSession.
+
+    A failed sweep is logged and retried at the next interval; it never
+    stops the worker it runs in.
+    """
+
+    def __init__(self, session_factory, interval=EXPIRY_SWEEP_INTERVAL, policies=None):
+        self._session_factory = session_factory
+        self.interval = interval
+        self.policies = default_policies() if policies is None else policies
+        self._task = None
+        self.sweeps = 0
+        self.failures = 0
+        self.deleted = {}           # {table: rows removed since start}
+        self.last: Optional[SweepResult] = None
+
+    def start(self):
+        if self._task is None and self.policies:
+            self._task = asyncio.create_task(self._run(), name="expiry-sweeper")
+        return self._task
+
+    async def stop(self):
+        if self._task is None:
+            return
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+
+    async def run_once(self):
+        async with self._session_factory() as db:
+            result = await sweep_async(db, self.policies)
+        self.sweeps += 1
+        self.last = result
+        for table, n in result.deleted.items():
+            self.deleted[table] = self.deleted.get(table, 0) + n
+        return result
+
+    async def _run(self):
+        while True:
+            try:
+                await self.run_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                self.failures += 1
+                logger.exception("Expiry sweep failed")
+            await asyncio.sleep(self.interval)
+
+    def stats(self):
+        return {
+            "sweeps": self.sweeps,
+            "failures": self.failures,
+            "deleted": dict(self.deleted),
+            "last_seconds": self.last.seconds if self.last else None,
+            "last_deleted": dict(self.last.deleted) if self.last else None,
+        }
@@ -0,0 +1,244 @@
+# fast_classifier.py
+"""
+Rule-based fast path ahead of the LLM classifiers.
+
+Short, clear-cut replies ("yes", "sì, sono io", "no", "goodbye", "I can't
+talk now") are labelled locally from keyword/regex lexicons (English,
+Italian, plus basic Spanish/French/German), in microseconds. Anything
+ambiguous, long, a question, or matching two different labels gets a low
+confidence and goes to the LLM as before.
+
+    result = fast_classify("user_verification", "Sì, sono io")
+    # FastResult(label='YES', confidence=0.97, rule='YES:full')
+
+Confidence:
+- 0.97  the whole normalized utterance is a known phrase for the label;
+- 0.90  a bare yes/no, which only maps to a label for some classifiers
+        (politeness is not dropped here: "no thanks" is not a bare no);
+- 0.90  a key phrase occurs inside a short utterance (<= SHORT_UTTERANCE words);
+- 0.60  same, in a longer utterance, or for a HIGH_STAKES_LABELS label
+        (below the default threshold);
+- 0.0   no rule, or rules for different labels both match.
+
+A key phrase alone has no negation or scope guard ("it is not me who should
+answer that" contains "is not me"), so FRAUD, NOT FRAUD and CALL_BACK_LATER,
+which block cards, whitelist them or end the call, are only answered locally
+on a full match.
+
+Labels are the ones in llm_agent (USER_VERIFICATION_LABELS, ...).
+"""
+import re
+import unicodedata
+from collections import Counter
+from typing import NamedTuple
+
+FAST_PATH_THRESHOLD = 0.85
+SHORT_UTTERANCE = 10
+
+FULL_CONFIDENCE = 0.97
+BARE_CONFIDENCE = 0.90
+CONTAINS_CONFIDENCE = 0.90
+LONG_CONTAINS_CONFIDENCE = 0.60
+
+# only trusted on a full match (see the module docstring)
+HIGH_STAKES_LABELS = frozenset({"FRAUD", "NOT FRAUD", "CALL_BACK_LATER"})
+
+# hits / misses per classifier, for dashboards and bench_fast_classifier.py
+stats = Counter()
+
+
+class FastResult(NamedTuple):
+    label: str
+    confidence: float
+    rule: str
+
+
+def normalize(text):
+    """Lowercase, strip accents and punctuation (apostrophes kept), collapse spaces."""
+    text = unicodedata.normalize("NFKD", text.lower().replace("’", "'"))
+    text = "".join(c for c in text if not unicodedata.combining(c))
+    text = re.sub(r"[^\w\s']", " ", text)
+    return " ".join(text.split())
+
+
+# ---------------------------
+# Lexicons
+# ---------------------------
+
+YES = r"(yes|yeah|yep|yup|sure|correct|(that'?s )?right|exactly|of course|si|certo|certamente|esatto|esattamente|giusto|sicuro|claro|oui|ja|jawohl)"
+NO = r"(no|nope|nah|nein|non)"
+END_PHRASES = (
+    r"(ok(ay)? )?(good ?bye|bye( bye)?|see you|have a (good|nice) day|all clear|no (more )?questions|"
+    r"that'?s all i needed|ciao|arrivederci|arrivederla|buona giornata|buona serata|tutto chiaro|"
+    r"nessuna domanda|adios|hasta luego|au revoir|tschuss|auf wiedersehen)"
+)
+# Dropped before matching; an utterance made only of these is POLITE_ONLY
+POLITENESS = re.compile(
+    r"\b(thank you( very much| so much)?|thanks( a lot)?|please|grazie( mille)?|per favore|"
+    r"gracias|merci( beaucoup)?|danke( schon)?)\b"
+)
+FILLERS = re.compile(r"^((um+|uh+|uhm|ehm|eh|well|allora|beh|mah|oh|ok|okay|va bene) )+")
+POLITE_ONLY = "__polite__"
+
+_CANT_TALK = (
+    r"\b(i )?(can'?t|cannot|can not) (talk|speak)\b|\b(i'?m|i am) (busy|driving|in a meeting|at work)\b|"
+    r"\bnot a good time\b|\bnon posso (parlare|rispondere)\b|\bsono (occupat[oa]|in riunione|alla guida|al lavoro)\b|"
+    r"\bno puedo hablar\b|\bje ne peux pas parler\b|\bich kann (gerade )?nicht (sprechen|reden)\b"
+)
+_NO_CALL_BACK = (
+    r"\b(don'?t|do not) (call|ring|contact) (me )?(back|again)\b|\bno need to call (me )?back\b|"
+    r"\bnon (mi )?(richiamate|richiamare|richiami|chiamate piu|chiamare piu)\b|\bno me (llame|llames) mas\b"
+)
+_CALL_BACK_LATER = (
+    r"(?<!don't )(?<!dont )(?<!do not )\b(call|ring) me (back )?(later|tomorrow|in an hour|this (afternoon|evening))\b|"
+    r"(?<!don't )(?<!dont )(?<!do not )\bcall me back\b|"
+    r"(?<!non )(?<!non mi )\b(richiamami|richiamatemi|richiamate|mi richiami|mi richiamate)( (piu tardi|dopo|domani))?\b|"
+    r"\bllamame (mas tarde|luego)\b|\brappelez moi\b"
+)
+_FRAUD = (
+    r"\b(it )?(wasn'?t|was not|isn'?t|is not) me\b|\bi (didn'?t|did not|never) (make|authori[sz]e|do|buy|pay|purchase)\b|"
+    r"\bnot mine\b|\bnon (l'?ho|ho) (fatt[ao]|autorizzat[ao]|effettuat[ao])\b|\bnon sono stat[oa] io\b|"
+    r"\bnon e (mi[ao]|stato io)\b|\bnon la riconosco\b|\bi don'?t recogni[sz]e\b|\bno (la )?he hecho\b|\bce n'?est pas moi\b"
+)
+_NOT_FRAUD = (
+    r"\bit (was|is) me\b|\bthat was me\b|\bi (did|made|authori[sz]ed|bought|paid)( (it|that|this|the payment|that payment))?$|"
+    r"(?<!non )\bl'?ho (fatt[ao]|autorizzat[ao]|effettuat[ao])( (io|proprio io))?\b|(?<!non )\bsono stat[oa] io\b|"
+    r"(?<!non )\bla riconosco\b|\bi recogni[sz]e (it|that|this)\b|\bsoy yo\b|\bc'est moi\b"
+)
+# Whole-utterance forms of the above, optionally after a yes/no ("no, it wasn't me")
+_FRAUD_FULL = (
+    rf"({NO} )*((it )?(wasn'?t|was not) me|i (didn'?t|did not|never) (make|authori[sz]e|do|buy|pay|purchase)"
+    r"( (it|that|this|(that|this|the) (payment|transaction|purchase)))?|(it'?s |that'?s )?not mine|"
+    r"non (l'?ho|ho) (fatt[ao]|autorizzat[ao]|effettuat[ao])( io)?|non sono stat[oa] io|non e (mi[ao]|stato io)|"
+    r"non la riconosco|i don'?t recogni[sz]e (it|that|this)( (payment|transaction))?|no (la )?he hecho|ce n'?est pas moi)"
+)
+_NOT_FRAUD_FULL = (
+    rf"({YES} )*((it|that) was me|i (did|made|authori[sz]ed|bought|paid)"
+    r"( (it|that|this|(that|this|the) (payment|transaction|purchase)))?|"
+    r"l'?ho (fatt[ao]|autorizzat[ao]|effettuat[ao])( (io|proprio io))?|sono stat[oa] io|la riconosco|"
+    r"i recogni[sz]e (it|that|this)|soy yo|c'est moi)"
+)
+_CALL_BACK_LATER_FULL = (
+    rf"({YES} )*((call|ring) me (back )?(later|tomorrow|in an hour|this (afternoon|evening))|call me back|"
+    r"(richiamami|richiamatemi|mi richiami|mi richiamate)( (piu tardi|dopo|domani))?|llamame (mas tarde|luego)|"
+    r"rappelez moi( plus tard)?)"
+)
+_INFO_COMPLETE = (
+    r"\b(that'?s|that is) (all|it|everything)\b|\bnothing (else|more)\b|\bi don'?t know (anything )?(else|more)\b|"
+    r"\bi have nothing (else|more) to add\b|\be tutto\b|\bnient'?altro\b|\bnon (so|ho) (altro|nient'?altro|nulla)\b|"
+    r"\bbasta cosi\b|\beso es todo\b|\bc'est tout\b"
+)
+
+# Per classifier: (label, kind, pattern). kind is
+#   "full"     -> pattern must match the whole normalized utterance;
+#   "bare"     -> same, but lower confidence (context-dependent bare yes/no);
+#   "contains" -> pattern may occur anywhere.
+_RULES = {
+    "user_verification": [
+        ("YES", "full", rf"{YES}( {YES})*( (it'?s|it is|this is|that'?s) (me|him|her|right)| sono (io|proprio io|lui|lei)| speaking| soy yo| c'est moi)?"),
+        ("YES", "full", r"(it'?s me|this is (he|she|me)|speaking|sono io|sono proprio io|in persona|soy yo|c'est moi|am apparat)"),
+        ("NO", "full", rf"{NO}( {NO})*( (i'?m|i am) (his|her) \w+| sono (sua|suo) \w+| non sono (io|lui|lei)| wrong number| numero sbagliato)?"),
+        ("NO", "contains", r"\bwrong number\b|\bnumero sbagliato\b|\bnon sono (lui|lei)\b|\bi'?m not (him|her)\b|\bthis is not (him|her)\b|\b(he|she) is not (here|home|available)\b|\bnon (c'?e|e in casa)\b"),
+        ("CLARIFY", "contains", r"\bwho (are you|is (this|calling|speaking))\b|\bwhy are you calling\b|\bwhat is this about\b|\bchi (e|parla|sei|siete)\b|\bperche mi (chiama|chiamate)\b|\bdi cosa si tratta\b|\bquien (es|habla)\b|\bqui (est|parle)\b"),
+    ],
+    "user_reply": [
+        # every user_reply question is "did you authorise <transaction>?"
+        ("NOT FRAUD", "bare", rf"{YES}( {YES})*"),
+        ("FRAUD", "bare", rf"{NO}( {NO})*"),
+        ("FRAUD", "full", _FRAUD_FULL),
+        ("NOT FRAUD", "full", _NOT_FRAUD_FULL),
+        ("CALL_BACK_LATER", "full", _CALL_BACK_LATER_FULL),
+        # high-stakes labels: below the threshold, but still able to flag a conflict
+        ("FRAUD", "contains", _FRAUD),
+        ("NOT FRAUD", "contains", _NOT_FRAUD),
+        ("CALL_BACK_LATER", "contains", _CALL_BACK_LATER),
+        ("CANT_TALK", "contains", _CANT_TALK),
+        ("NO_CALL_BACK", "contains", _NO_CALL_BACK),
+        ("END", "full", END_PHRASES),
+        ("END", "full", POLITE_ONLY),
+    ],
+    "investigation": [
+        ("INFO_COMPLETE", "contains", _INFO_COMPLETE),
+        ("INFO_COMPLETE", "full", rf"{NO}( {NO})*( nothing| niente| nulla)?"),
+        ("END", "full", END_PHRASES),
+    ],
+    "help": [
+        ("YES", "full", rf"{YES}( {YES})*( i (do|have (another|one more) (question|request)))?"),
+        ("YES", "contains", r"\b(i have|ho) (another|one more|un'?altra) (question|request|domanda|richiesta)\b"),
+        ("NO", "full", rf"{NO}( {NO})*( (i'?m|i am) (good|fine|ok|okay|all set)| (that'?s|it'?s) (all|fine|ok)| nothing else| non (mi )?serve (altro|nulla|niente)| (sono )?a posto| tutto (ok|bene|a posto))?"),
+        ("NO", "contains", r"\b(nothing else|non (mi )?serve (altro|nulla|niente)|sono a posto|i'?m (all )?(good|set|fine))\b"),
+        ("END", "full", END_PHRASES),
+        ("END", "full", POLITE_ONLY),
+    ],
+}
+
+_KIND_CONFIDENCE = {"full": FULL_CONFIDENCE, "bare": BARE_CONFIDENCE, "contains": CONTAINS_CONFIDENCE}
+
+
+def _compile(rules):
+    compiled = []
+    for label, kind, pattern in rules:
+        if kind in ("full", "bare"):
+            regex = re.compile(rf"(?:{pattern})\Z")
+        else:
+            regex = re.compile(pattern)
+        compiled.append((label, kind, regex))
+    return compiled
+
+
+COMPILED_RULES = {name: _compile(rules) for name, rules in _RULES.items()}
+CLASSIFIERS = tuple(COMPILED_RULES)
+
+
+# ---------------------------
+# Classification
+# ---------------------------
+
+def fast_classify(classifier, text):
+    """
+    Best local guess for `text`, or None if no rule applies.
+    Callers compare result.confidence with their threshold.
+    """
+    rules = COMPILED_RULES[classifier]
+    if "?" in text:
+        # questions ("was it me?", "chi parla?") are only trusted for CLARIFY
+        rules = [r for r in rules if r[0] == "CLARIFY"]
+    norm = FILLERS.sub("", normalize(text))
+    stripped = " ".join(POLITENESS.sub(" ", norm).split())
+    if not stripped:
+        if not norm:
+            return None
+        stripped = POLITE_ONLY
+
+    n_words = len(stripped.split())
+    matches = {}
+    for label, kind, regex in rules:
+        if kind == "contains":
+            hit = regex.search(stripped)
+            short = n_words <= SHORT_UTTERANCE and label not in HIGH_STAKES_LABELS
+            confidence = CONTAINS_CONFIDENCE if short else LONG_CONTAINS_CONFIDENCE
+        elif kind == "bare":
+            hit = regex.match(norm)
+            confidence = BARE_CONFIDENCE
+        else:
+            hit = regex.match(stripped)
+            confidence = _KIND_CONFIDENCE[kind]
+        if hit and confidence > matches.get(label, (0,))[0]:
+            matches[label] = (confidence, f"{label}:{kind}")
+
+    if not matches:
+        return None
+    if len(matches) > 1:
+        return FastResult(None, 0.0, "conflict:" + ",".join(sorted(matches)))
+    label, (confidence, rule) = matches.popitem()
+    return FastResult(label, confidence, rule)
+
+
+def fast_label(classifier, text, threshold=FAST_PATH_THRESHOLD):
+    """Label if the fast path is confident enough, else None (use the LLM)."""
+    result = fast_classify(classifier, text)
+    if result is not None and result.label and result.confidence >= threshold:
+        stats[f"{classifier}.hit"] += 1
+        return result.label
+    stats[f"{classifier}.miss"] += 1
+    return None
@@ -1,21 +1,32 @@
 import asyncio
+import inspect
 import logging
-from nltk.tokenize import sent_tokenize
-from openai import AsyncOpenAI
-from fraud_ai.config import OPENAI_API_KEY
+from fraud_ai.sentence_splitter import SentenceSplitter
 from fraud_ai.prompt_builder import build_system_prompt
 from fraud_ai.llm_agent import (
-    llm_user_verification,
-    llm_classify_user_reply,
-    llm_classify_investigation_reply,
-    llm_classify_help_reply,
-    finalize_call_summary
+    async_client,
+    llm_user_verification_async as llm_user_verification,
+    llm_classify_user_reply_async as llm_classify_user_reply,
+    llm_classify_investigation_reply_async as llm_classify_investigation_reply,
+    llm_classify_help_reply_async as llm_classify_help_reply,
+    llm_classify_and_reply_async,
+    finalize_call_summary_async,
+    CLASSIFIER_NAMES
 )
 from fraud_ai.conversation import add_message
+from fraud_ai.transcript_logger import TranscriptLogger, use_transcript_logger
+from fraud_ai.classification_cache import use_flow_state
 from fraud_ai.STT import listen_and_transcribe
+from fraud_ai.streaming_stt import StablePartial, normalize_transcript, current_transcript_stream, use_transcript_stream
+from sqlalchemy.ext.asyncio import AsyncSession
+from fraud_ai import aio
 from fraud_ai.data import update_transaction
-from fraud_ai.voice import speak_stream_text
+from fraud_ai.voice import openai_tts_worker
 from fraud_ai.voice_2 import tts_worker
+from fraud_ai.tts_metrics import TTSMetrics
+from fraud_ai.speculation import Speculator, current_speculator, use_speculator
+from fraud_ai.history_window import HistoryWindow, current_history_window, make_llm_summarizer, use_history_window
+from fraud_ai.config import HISTORY_MAX_TOKENS, HISTORY_RECENT_MESSAGES
 
 # === SUPPRESS SQLALCHEMY LOGGING ===
 for noisy in ("sqlalchemy", "sqlalchemy.engine", "sqlalchemy.pool", "sqlalchemy.dialects"):
@@ -26,90 +37,369 @@ RESET = "\033[0m"
 BRIGHT_CYAN = "\033[96m"
 BRIGHT_YELLOW = "\033[93m"
 
-client = AsyncOpenAI(api_key=OPENAI_API_KEY)
+# Shared with the async classifiers in llm_agent
+client = async_client
 
+FRAUD_INVESTIGATION_PROMPT = """Thank the customer for confirming the transaction was fraudulent. 
+                Reassure them protective steps will be taken: block the card, monitor suspicious activity, and perform an investigation. 
+                Ask if they've noticed any suspicious emails, SMS, or calls from people pretending to be bank staff, 
+                and whether they have entered their card data on unfamiliar websites"""
+HELP_OFFER_PROMPT = "Summarise outcome and ask if they need any other assistance."
+
+# Combined mode: label -> next turn spoken in the same LLM call
+TX_BRANCHES = {"FRAUD": FRAUD_INVESTIGATION_PROMPT, "NOT FRAUD": HELP_OFFER_PROMPT}
+INVESTIGATION_BRANCHES = {label: FRAUD_INVESTIGATION_PROMPT for label in ("REPEAT", "OFFTOPIC", "INFO_INCOMPLETE")}
+
+# Next-turn branches worth pre-generating after the transaction question:
+# label -> (step prompt of the next turn, stand-in customer answer)
+TX_SPECULATION = {
+    "FRAUD": (FRAUD_INVESTIGATION_PROMPT, "No, I did not make that transaction."),
+    "NOT FRAUD": (HELP_OFFER_PROMPT, "Yes, I made that transaction myself."),
+}
+
+
+RETRY_LABELS = ("REPEAT", "OFFTOPIC", "CLARIFY")
+
+
+class Branches(dict):
+    """
+    Combined mode: label -> step prompt of the next turn. After
+    ask_and_classify, `spoken` is the label whose next turn the combined
+    call already spoke (None if it did not).
+    """
+    spoken = None
+
+
+def _branches(combined, mapping):
+    return Branches(mapping) if combined else None
+
+
+async def _windowed(history):
+    """History as sent to the model: the call's token-budgeted window, if any."""
+    window = current_history_window()
+    if window is None:
+        return history
+    return await window.messages(history)
+
+
+async def _update_transaction(db, tx_id, **values):
+    """The flow runs on a Session or, under the orchestrator, an AsyncSession (fraud_ai.aio)."""
+    if isinstance(db, AsyncSession):
+        return await aio.update_transaction(db, tx_id, **values)
+    return update_transaction(db, tx_id, **values)
+
+
+async def _add_message(db, alert_id, role, content):
+    if isinstance(db, AsyncSession):
+        return await aio.add_message(db, alert_id, role, content)
+    return add_message(db, alert_id, role, content)
 
-async def stream_llm_with_tts(step_prompt, history, system_prompt, tts_backend="openai"):
-    full_text = ""
-    messages = (
-        [{"role": "system", "content": system_prompt}]
-        + history
-        + [{"role": "user", "content": step_prompt}]
-    )
 
-    stream = await client.chat.completions.create(
+async def finalize_call_summary(db, alert, alerted_tx, history):
+    """Final summary over the rolling summary + recent turns, not the whole call."""
+    window = current_history_window()
+    if window is None:
+        return await finalize_call_summary_async(db, alert, alerted_tx, history)
+    recent = await window.fit(history)
+    return await finalize_call_summary_async(db, alert, alerted_tx, recent, earlier_summary=window.summary)
+
+
+async def _llm_deltas(stream):
+    async for event in stream:
+        delta = event.choices[0].delta
+        if delta and delta.content:
+            yield delta.content
+
+
+async def _text_deltas(text):
+    yield text
+
+
+async def speculative_generate(step_prompt, history, system_prompt, max_tokens):
+    """
+    Non-streamed reply for a speculative branch: (text, completion tokens).
+    text is None if the reply was cut off at `max_tokens`: it would be
+    spoken mid-sentence, so the caller generates the reply normally.
+    """
+    response = await client.chat.completions.create(
         model="gpt-4o-mini",
-        messages=messages,
-        stream=True
+        messages=(
+            [{"role": "system", "content": system_prompt}]
+            + await _windowed(history)
+            + [{"role": "user", "content": step_prompt}]
+        ),
+        max_tokens=max_tokens
     )
+    usage = response.usage.completion_tokens if response.usage else 0
+    choice = response.choices[0]
+    if choice.finish_reason == "length":
+        return None, usage
+    return choice.message.content or "", usage
+
+
+async def commit_speculation(label):
+    """Pre-generated reply for `label` from the call's speculator, if any."""
+    speculator = current_speculator()
+    if speculator is None:
+        return None
+    text = await speculator.commit(label)
+    if text:
+        print(f"[DEBUG] Using speculative reply for {label}")
+    return text
+
+
+async def stream_llm_with_tts(step_prompt, history, system_prompt, tts_backend="openai", prefetched_text=None):
+    """
+    Generate the next assistant turn and speak it. With `prefetched_text`
+    (a committed speculative reply) the LLM call is skipped.
+    """
+    metrics = TTSMetrics(tts_backend)
+    if prefetched_text:
+        deltas = _text_deltas(prefetched_text)
+    else:
+        messages = (
+            [{"role": "system", "content": system_prompt}]
+            + await _windowed(history)
+            + [{"role": "user", "content": step_prompt}]
+        )
+        stream = await client.chat.completions.create(
+            model="gpt-4o-mini",
+            messages=messages,
+            stream=True
+        )
+        deltas = _llm_deltas(stream)
+    return await speak_deltas(deltas, tts_backend, metrics)
+
+
+async def speak_deltas(deltas, tts_backend="openai", metrics=None):
+    """Print and speak an async iterator of reply text; returns the full text."""
+    full_text = ""
+    metrics = metrics or TTSMetrics(tts_backend)
 
     if tts_backend == "text":
-        async for event in stream:
-            delta = event.choices[0].delta
-            if delta and delta.content:
-                print(f"{BRIGHT_CYAN}{delta.content}{RESET}", end="", flush=True)
-                full_text += delta.content
-        print()
-    elif tts_backend == "openai":
-        buffer = ""
-        async for event in stream:
-            delta = event.choices[0].delta
-            if delta and delta.content:
-                print(f"{BRIGHT_CYAN}{delta.content}{RESET}", end="", flush=True)
-                buffer += delta.content
-                full_text += delta.content
+        async for content in deltas:
+            print(f"{BRIGHT_CYAN}{content}{RESET}", end="", flush=True)
+            full_text += content
         print()
-        await speak_stream_text(buffer.strip())
+        return full_text.strip()
+
+    if tts_backend == "openai":
+        worker = openai_tts_worker
     elif tts_backend == "elevenlabs":
-        tts_queue = asyncio.Queue()
-        tts_task = asyncio.create_task(tts_worker(tts_queue))
-        buffer = ""
-        async for event in stream:
-            delta = event.choices[0].delta
-            if delta and delta.content:
-                print(f"{BRIGHT_CYAN}{delta.content}{RESET}", end="", flush=True)
-                buffer += delta.content
-                full_text += delta.content
-                sentences = sent_tokenize(buffer)
-                if len(sentences) > 1:
-                    for s in sentences[:-1]:
-                        await tts_queue.put(s.strip())
-                    buffer = sentences[-1]
-        if buffer.strip():
-            await tts_queue.put(buffer.strip())
-        await tts_queue.put(None)
-        await tts_task
-        print()
+        worker = tts_worker
+    else:
+        raise ValueError("tts_backend must be 'text', 'openai' or 'elevenlabs'.")
+
+    # LLM generation, synthesis and playback overlap sentence by sentence
+    tts_queue = asyncio.Queue()
+    tts_task = asyncio.create_task(worker(tts_queue, metrics=metrics))
+    splitter = SentenceSplitter()
+    try:
+        async for content in deltas:
+            print(f"{BRIGHT_CYAN}{content}{RESET}", end="", flush=True)
+            full_text += content
+            for s in splitter.feed(content):
+                await tts_queue.put(s)
+    except BaseException:
+        # failed stream or cancelled call: stop the worker so its sink is closed now
+        tts_task.cancel()
+        await asyncio.gather(tts_task, return_exceptions=True)
+        raise
+    rest = splitter.flush()
+    if rest:
+        await tts_queue.put(rest)
+    await tts_queue.put(None)
+    await tts_task
+    print()
+
+    metrics.finish()
+    if metrics.time_to_first_audio is not None:
+        print(f"[DEBUG] time-to-first-audio ({tts_backend}): {metrics.time_to_first_audio * 1000:.0f} ms")
 
     return full_text.strip()
 
 
+async def read_customer_reply(stt_enabled=False, stt_provider="openai", transcript_stream=None):
+    """
+    One customer turn as text: the final streamed transcript, live STT or the
+    keyboard. The blocking reads run in a worker thread, so the loop keeps
+    serving the other calls and the speculative branches while the customer
+    answers.
+    """
+    transcript_stream = transcript_stream or current_transcript_stream()
+    if transcript_stream is not None:
+        user_text = ""
+        async for event in transcript_stream():
+            if event.is_final:
+                user_text = event.text.strip()
+                break
+    elif stt_enabled:
+        user_text = (await asyncio.to_thread(
+            listen_and_transcribe, stt_enabled=stt_enabled, stt_provider=stt_provider
+        )).strip()
+    else:
+        return (await asyncio.to_thread(input, f"{BRIGHT_YELLOW}Customer says:{RESET} ")).strip()
+    print(f"{BRIGHT_YELLOW}{user_text}{RESET}")
+    return user_text
+
+
+async def _run_classifier(classifier_func, user_text, history, system_prompt):
+    result = classifier_func(user_text, history, system_prompt)
+    if inspect.isawaitable(result):
+        result = await result
+    return result
+
+
+async def classify_streaming_turn(events, classifier_func, history, system_prompt, min_repeats=2):
+    """
+    Consume one turn of TranscriptEvents and classify it.
+
+    Once a partial is stable the classifier is started on it in the
+    background. If the final transcript matches that partial the early result
+    is used, so classification latency overlaps the end of the utterance;
+    otherwise it is discarded and the final transcript is classified.
+    Returns (final_text, classification); history is not modified.
+    """
+    stable = StablePartial(min_repeats=min_repeats)
+    early_text, early_task = None, None
+    final_text = ""
+    try:
+        async for event in events:
+            if event.is_final:
+                final_text = event.text.strip()
+                break
+            text = stable.update(event.text)
+            if text and early_task is None:
+                early_text = text
+                early_task = asyncio.create_task(_run_classifier(
+                    classifier_func, text, history + [{"role": "user", "content": text}], system_prompt
+                ))
+        if not final_text:
+            return "", None
+        if early_task is not None and normalize_transcript(early_text) == normalize_transcript(final_text):
+            print("[DEBUG] Classification started on stable partial transcript")
+            return final_text, await early_task
+        return final_text, await _run_classifier(
+            classifier_func, final_text, history + [{"role": "user", "content": final_text}], system_prompt
+        )
+    finally:
+        if early_task is not None and not early_task.done():
+            early_task.cancel()
+
+
+async def classify_and_reply(db, alert_id, history, user_text, system_prompt, classifier_func,
+                             branches, tts_backend="text"):
+    """
+    Combined mode: one streamed LLM call returns the label first and then,
+    if the label has a branch, the next assistant turn. The reply streams
+    straight into TTS and is added to the transcript.
+    Returns (label, spoken).
+
+    If the fast path or the cache already knows the label, the branch's
+    reply is generated the usual way instead (still one LLM call).
+    """
+    metrics = TTSMetrics(tts_backend)
+    label, deltas = await llm_classify_and_reply_async(
+        CLASSIFIER_NAMES[classifier_func], user_text, await _windowed(history), system_prompt, branches
+    )
+    if deltas is None:
+        if label not in branches:
+            return label, False
+        text = await stream_llm_with_tts(branches[label], history, system_prompt, tts_backend)
+    else:
+        print(f"[DEBUG] Combined call label: {label}")
+        text = await speak_deltas(deltas, tts_backend, metrics)
+    await _add_message(db, alert_id, "assistant", text)
+    history.append({"role": "assistant", "content": text})
+    return label, True
+
+
 async def ask_and_classify(db, alert_id, history, step_prompt, system_prompt, classifier_func,
                            tts_backend="text", stt_enabled=False, stt_provider="openai",
-                           retry_limit=0):
+                           retry_limit=0, transcript_stream=None, speculate=None, prefetched_text=None,
+                           branches=None, reply_spoken=False, state=""):
+    """
+    `state` names the step of the flow (e.g. "transaction"). It becomes part
+    of the classification cache key, because one classifier serves several
+    steps: user_reply answers the transaction question, the re-ask and the
+    secondary-transaction checks.
+
+    `transcript_stream`, if given, is a zero-argument callable returning an
+    async iterator of streaming_stt.TranscriptEvent for one customer turn
+    (e.g. `lambda: provider.stream(mic_chunks())`). It takes precedence over
+    stt_enabled / keyboard input, and classification starts as soon as the
+    partial transcript is stable.
+
+    `speculate` ({label: (next step prompt, stand-in answer)}) starts
+    pre-generating the next turn while the customer answers, if the call has
+    a speculator (see speculation.py); the caller collects it with
+    commit_speculation(label). `prefetched_text` replaces the LLM call for
+    this step's first assistant turn.
+
+    `branches` (a Branches, combined mode) classifies the reply and speaks
+    the next turn in one streamed LLM call; see classify_and_reply. While
+    retries are left, retry labels get the step prompt again as their branch.
+    `reply_spoken` skips this step's first assistant turn because the
+    previous combined call already spoke it. Combined mode does not apply to
+    transcript_stream turns.
+
+    Without `transcript_stream` the call's current one (full_fraud_flow's
+    `transcript_stream`) is used, if any.
+    """
+    transcript_stream = transcript_stream or current_transcript_stream()
     attempts = 0
     while True:
-        if step_prompt.strip():
-            assistant_text = await stream_llm_with_tts(step_prompt, history, system_prompt, tts_backend)
-            add_message(db, alert_id, "assistant", assistant_text)
+        if reply_spoken:
+            reply_spoken = False
+        elif step_prompt.strip():
+            assistant_text = await stream_llm_with_tts(step_prompt, history, system_prompt, tts_backend,
+                                                       prefetched_text=prefetched_text)
+            prefetched_text = None      # retries generate a fresh turn
+            await _add_message(db, alert_id, "assistant", assistant_text)
             history.append({"role": "assistant", "content": assistant_text})
 
-        if stt_enabled:
-            user_text = listen_and_transcribe(
-                stt_enabled=stt_enabled, stt_provider=stt_provider
-            ).strip()
+        if branches is not None:
+            branches.spoken = None
+        speculator = current_speculator()
+        if speculate and speculator is not None and branches is None:
+            speculator.start(speculate, history, system_prompt)
+
+        if transcript_stream is not None:
+            with use_flow_state(state):
+                user_text, classification = await classify_streaming_turn(
+                    transcript_stream(), classifier_func, history, system_prompt
+                )
             print(f"{BRIGHT_YELLOW}{user_text}{RESET}")
+            if user_text:
+                await _add_message(db, alert_id, "user", user_text)
+                history.append({"role": "user", "content": user_text})
+                print(f"[DEBUG] Classification result: {classification}")
         else:
-            user_text = input(f"{BRIGHT_YELLOW}Customer says:{RESET} ").strip()
+            user_text = await read_customer_reply(stt_enabled, stt_provider)
 
-        if not user_text:
-            classification = "REPEAT"
-        else:
-            add_message(db, alert_id, "user", user_text)
-            history.append({"role": "user", "content": user_text})
-            print(f"\n[DEBUG] Using classifier: {classifier_func.__name__}")
-            classification = classifier_func(user_text, history, system_prompt)
-            print(f"[DEBUG] Classification result: {classification}")
+            if not user_text:
+                classification = "REPEAT"
+            else:
+                await _add_message(db, alert_id, "user", user_text)
+                history.append({"role": "user", "content": user_text})
+                print(f"\n[DEBUG] Using classifier: {classifier_func.__name__}")
+                if branches is not None:
+                    turn_branches = dict(branches)
+                    if retry_limit and attempts + 1 < retry_limit:
+                        for label in RETRY_LABELS:
+                            turn_branches.setdefault(label, step_prompt)
+                    with use_flow_state(state):
+                        classification, spoken = await classify_and_reply(
+                            db, alert_id, history, user_text, system_prompt, classifier_func,
+                            turn_branches, tts_backend
+                        )
+                    if spoken:
+                        branches.spoken = classification
+                        reply_spoken = classification in RETRY_LABELS
+                else:
+                    with use_flow_state(state):
+                        classification = await _run_classifier(classifier_func, user_text, history, system_prompt)
+                print(f"[DEBUG] Classification result: {classification}")
 
         classification = classification.upper() if classification else "REPEAT"
 
@@ -150,12 +440,49 @@ async def handle_end_classification(classification, history, system_prompt, tts_
     # ✅ Always store assistant goodbye message
     if text:
         if db and alert_id:
-            add_message(db, alert_id, "assistant", text)
+            await _add_message(db, alert_id, "assistant", text)
         history.append({"role": "assistant", "content": text})
 
 
 async def full_fraud_flow(db, alert, alerted_tx, recent_txs,
-                          tts_backend="text", stt_enabled=False, stt_provider="openai"):
+                          tts_backend="text", stt_enabled=False, stt_provider="openai",
+                          speculative=False, combined=False, transcript_stream=None):
+    """
+    Run one call. Transcript rows are written behind the conversation by a
+    TranscriptLogger and flushed when the call ends, however it ends. The
+    model sees the history through a token-budgeted HistoryWindow.
+
+    speculative=True pre-generates the likely next turns while the customer
+    is answering (see speculation.py); costs up to a few extra short LLM
+    calls per call.
+
+    combined=True classifies the customer's reply and generates the next
+    turn in a single streamed LLM call where the flow allows it (see
+    classify_and_reply).
+
+    transcript_stream (see ask_and_classify) reads every customer turn from
+    a streaming STT provider instead of listen_and_transcribe / the keyboard.
+    """
+    transcript = TranscriptLogger()
+    speculator = Speculator(speculative_generate) if speculative else None
+    window = HistoryWindow(make_llm_summarizer(client), max_tokens=HISTORY_MAX_TOKENS,
+                           recent_messages=HISTORY_RECENT_MESSAGES)
+    with use_transcript_logger(transcript), use_history_window(window), use_transcript_stream(transcript_stream):
+        try:
+            if speculator is None:
+                return await _run_fraud_flow(db, alert, alerted_tx, recent_txs,
+                                             tts_backend, stt_enabled, stt_provider, combined)
+            with use_speculator(speculator):
+                result = await _run_fraud_flow(db, alert, alerted_tx, recent_txs,
+                                               tts_backend, stt_enabled, stt_provider, combined)
+            print(f"[DEBUG] Speculation: {speculator.stats}")
+            return result
+        finally:
+            await asyncio.to_thread(transcript.close)
+
+
+async def _run_fraud_flow(db, alert, alerted_tx, recent_txs,
+                          tts_backend="text", stt_enabled=False, stt_provider="openai", combined=False):
     history = []
 
     # === GREETING ===
@@ -166,6 +493,7 @@ async def full_fraud_flow(db, alert, alerted_tx, recent_txs,
         greet_system_prompt,
         llm_user_verification,
         tts_backend, stt_enabled, stt_provider,
+        state="greeting",
         retry_limit=2
     )
     classification = classification.upper() if classification else "REPEAT"
@@ -178,10 +506,10 @@ async def full_fraud_flow(db, alert, alerted_tx, recent_txs,
             history, greet_system_prompt, tts_backend
         )
         if db and alert.id:
-            add_message(db, alert.id, "assistant", text)
+            await _add_message(db, alert.id, "assistant", text)
         history.append({"role": "assistant", "content": text})
 
-        final_result = finalize_call_summary(db, alert, alerted_tx, history)
+        final_result = await finalize_call_summary(db, alert, alerted_tx, history)
         print("\n===== FINAL CALL SUMMARY =====")
         print(final_result["summary"])
         print("Actions decided:", final_result["actions"])
@@ -190,7 +518,7 @@ async def full_fraud_flow(db, alert, alerted_tx, recent_txs,
 
     if classification in ("END", "CALL_BACK_LATER", "NO_CALL_BACK", "CANT_TALK"):
         await handle_end_classification(classification, history, greet_system_prompt, tts_backend, db, alert.id)
-        final_result = finalize_call_summary(db, alert, alerted_tx, history)
+        final_result = await finalize_call_summary(db, alert, alerted_tx, history)
         print("\n===== FINAL CALL SUMMARY =====")
         print(final_result["summary"])
         print("Actions decided:", final_result["actions"])
@@ -205,10 +533,10 @@ async def full_fraud_flow(db, alert, alerted_tx, recent_txs,
             history, greet_system_prompt, tts_backend
         )
         if db and alert.id:
-            add_message(db, alert.id, "assistant", text)
+            await _add_message(db, alert.id, "assistant", text)
         history.append({"role": "assistant", "content": text})
 
-        final_result = finalize_call_summary(db, alert, alerted_tx, history)
+        final_result = await finalize_call_summary(db, alert, alerted_tx, history)
         print("\n===== FINAL CALL SUMMARY =====")
         print(final_result["summary"])
         print("Actions decided:", final_result["actions"])
@@ -217,6 +545,7 @@ async def full_fraud_flow(db, alert, alerted_tx, recent_txs,
 
     # === TRANSACTION VERIFICATION ===
     tx_system_prompt = build_system_prompt(alerted_tx, recent_txs, greeting_mode=False)
+    tx_branches = _branches(combined, TX_BRANCHES)
     _, tx_result, _ = await ask_and_classify(
         db, alert.id, history,
         f"Tell the customer you’re calling because the fraud prevention system declined a transaction considered at risk. "
@@ -224,12 +553,16 @@ async def full_fraud_flow(db, alert, alerted_tx, recent_txs,
         tx_system_prompt,
         llm_classify_user_reply,
         tts_backend, stt_enabled, stt_provider,
-        retry_limit=3
+        state="transaction",
+        retry_limit=3,
+        speculate=TX_SPECULATION,
+        branches=tx_branches
     )
     tx_result = tx_result.upper() if tx_result else "REPEAT"
+    prefetched = await commit_speculation(tx_result)
     if tx_result in ("END", "CALL_BACK_LATER", "NO_CALL_BACK", "CANT_TALK"):
         await handle_end_classification(tx_result, history, tx_system_prompt, tts_backend, db, alert.id)
-        final_result = finalize_call_summary(db, alert, alerted_tx, history)
+        final_result = await finalize_call_summary(db, alert, alerted_tx, history)
         print("\n===== FINAL CALL SUMMARY =====")
         print(final_result["summary"])
         print("Actions decided:", final_result["actions"])
@@ -242,18 +575,23 @@ async def full_fraud_flow(db, alert, alerted_tx, recent_txs,
             "Answer the customer's clarification directly and completely. DO NOT ask if they authorised the transaction here.",
             history, tx_system_prompt, tts_backend
         )
+        tx_branches = _branches(combined, TX_BRANCHES)
         _, tx_result, _ = await ask_and_classify(
             db, alert.id, history,
             "Please now confirm if you authorised that transaction.",
             tx_system_prompt,
             llm_classify_user_reply,
             tts_backend, stt_enabled, stt_provider,
-            retry_limit=2
+            state="transaction_reask",
+            retry_limit=2,
+            speculate=TX_SPECULATION,
+            branches=tx_branches
         )
         tx_result = tx_result.upper() if tx_result else "REPEAT"
+        prefetched = await commit_speculation(tx_result)
         if tx_result in ("END", "CALL_BACK_LATER", "NO_CALL_BACK", "CANT_TALK"):
             await handle_end_classification(tx_result, history, tx_system_prompt, tts_backend, db, alert.id)
-            final_result = finalize_call_summary(db, alert, alerted_tx, history)
+            final_result = await finalize_call_summary(db, alert, alerted_tx, history)
             print("\n===== FINAL CALL SUMMARY =====")
             print(final_result["summary"])
             print("Actions decided:", final_result["actions"])
@@ -261,23 +599,30 @@ async def full_fraud_flow(db, alert, alerted_tx, recent_txs,
             return False
         print(f"[DEBUG] Verification-after-OK classification: {tx_result}")
 
+    # next turn already spoken by the combined call?
+    replied = tx_branches is not None and tx_branches.spoken == tx_result
+
     # === FRAUD path ===
     if tx_result == "FRAUD":
-        update_transaction(db, alerted_tx.id, is_fraud=True)
+        await _update_transaction(db, alerted_tx.id, is_fraud=True)
 
         # Investigation loop
         while True:
+            inv_branches = _branches(combined, INVESTIGATION_BRANCHES)
             _, inv_class, _ = await ask_and_classify(
                 db, alert.id, history,
-                """Thank the customer for confirming the transaction was fraudulent. 
-                Reassure them protective steps will be taken: block the card, monitor suspicious activity, and perform an investigation. 
-                Ask if they've noticed any suspicious emails, SMS, or calls from people pretending to be bank staff, 
-                and whether they have entered their card data on unfamiliar websites""",
+                FRAUD_INVESTIGATION_PROMPT,
                 tx_system_prompt,
                 llm_classify_investigation_reply,
-                tts_backend, stt_enabled, stt_provider
+                tts_backend, stt_enabled, stt_provider,
+                state="investigation",
+                prefetched_text=prefetched,
+                branches=inv_branches,
+                reply_spoken=replied
             )
+            prefetched = None
             inv_class = inv_class.upper() if inv_class else "REPEAT"
+            replied = inv_branches is not None and inv_branches.spoken == inv_class
             if inv_class in ("END", "CALL_BACK_LATER", "NO_CALL_BACK", "CANT_TALK"):
                 await handle_end_classification(inv_class, history, tx_system_prompt, tts_backend, db, alert.id)
                 break
@@ -298,6 +643,7 @@ async def full_fraud_flow(db, alert, alerted_tx, recent_txs,
                 tx_system_prompt,
                 llm_classify_user_reply,
                 tts_backend, stt_enabled, stt_provider,
+                state="secondary_transaction",
                 retry_limit=1
             )
             other_result = other_result.upper() if other_result else "REPEAT"
@@ -305,18 +651,18 @@ async def full_fraud_flow(db, alert, alerted_tx, recent_txs,
                 await handle_end_classification(other_result, history, tx_system_prompt, tts_backend, db, alert.id)
                 break
             if other_result == "FRAUD":
-                update_transaction(db, tx.id, is_fraud=True)
+                await _update_transaction(db, tx.id, is_fraud=True)
             elif other_result == "NOT FRAUD":
-                update_transaction(db, tx.id, is_fraud=False)
+                await _update_transaction(db, tx.id, is_fraud=False)
 
     elif tx_result == "NOT FRAUD":
-        update_transaction(db, alerted_tx.id, is_fraud=False)
+        await _update_transaction(db, alerted_tx.id, is_fraud=False)
 
     # === HELP-OFFER LOOP ===
     help_attempts = 0
     while True:
         prompt_to_use = (
-            "Summarise outcome and ask if they need any other assistance."
+            HELP_OFFER_PROMPT
             if help_attempts == 0
             else "Do they need any more assistance before ending?"
         )
@@ -325,8 +671,13 @@ async def full_fraud_flow(db, alert, alerted_tx, recent_txs,
             prompt_to_use,
             tx_system_prompt,
             llm_classify_help_reply,
-            tts_backend, stt_enabled, stt_provider
+            tts_backend, stt_enabled, stt_provider,
+            state="help_offer",
+            prefetched_text=prefetched,
+            reply_spoken=replied
         )
+        prefetched = None
+        replied = False
         help_class = help_class.upper() if help_class else "REPEAT"
         print(f"[DEBUG] Help-offer classification: {help_class}")
 
@@ -340,18 +691,13 @@ async def full_fraud_flow(db, alert, alerted_tx, recent_txs,
                 history, tx_system_prompt, tts_backend
             )
 
-            if stt_enabled:
-                user_text = listen_and_transcribe(
-                    stt_enabled=stt_enabled, stt_provider=stt_provider
-                ).strip()
-                print(f"{BRIGHT_YELLOW}{user_text}{RESET}")
-            else:
-                user_text = input(f"{BRIGHT_YELLOW}Customer says:{RESET} ").strip()
+            user_text = await read_customer_reply(stt_enabled, stt_provider)
 
-            add_message(db, alert.id, "user", user_text)
+            await _add_message(db, alert.id, "user", user_text)
             history.append({"role": "user", "content": user_text})
 
-            follow_up = llm_classify_help_reply(user_text, history, tx_system_prompt)
+            with use_flow_state("help_follow_up"):
+                follow_up = await llm_classify_help_reply(user_text, history, tx_system_prompt)
             follow_up = follow_up.upper() if follow_up else "REPEAT"
             print(f"[DEBUG] Follow-up after YES classification: {follow_up}")
 
@@ -385,7 +731,7 @@ async def full_fraud_flow(db, alert, alerted_tx, recent_txs,
         help_attempts = 1
 
     # === FINAL SUMMARY & ACTIONS ===
-    final_result = finalize_call_summary(db, alert, alerted_tx, history)
+    final_result = await finalize_call_summary(db, alert, alerted_tx, history)
     print("\n===== FINAL CALL SUMMARY =====")
     print(final_result["summary"])
     print("Actions decided:", final_result["actions"])
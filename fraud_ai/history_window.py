@@ -0,0 +1,132 @@
+# history_window.py
+"""
+Token-budgeted conversation history.
+
+Without it, every turn sends the whole call history, so prompt size and
+latency grow with the length of the call. HistoryWindow keeps at least the
+last `recent_messages` messages verbatim. When the history goes over
+`max_tokens`, it folds the older messages into a rolling summary, sent as
+one extra system message, until the rest is under `low_water` of the
+budget. Folding is incremental: only the newly folded messages and the
+previous summary are sent to the summarizer, never the whole call.
+
+    window = HistoryWindow(make_llm_summarizer(async_client))
+    messages = [system] + await window.messages(history) + [step]
+
+Token counts use tiktoken when it is installed, else ~4 characters per
+token, which is close enough for a budget.
+"""
+import asyncio
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+try:
+    import tiktoken
+    try:
+        _encoding = tiktoken.get_encoding("o200k_base")      # gpt-4o family
+    except ValueError:
+        _encoding = tiktoken.get_encoding("cl100k_base")
+except ImportError:
+    _encoding = None
+
+# per-message overhead of the chat format (role, separators)
+MESSAGE_OVERHEAD = 4
+
+_current_window = ContextVar("history_window", default=None)
+
+
+def current_history_window():
+    """The history window active for the running call (or None)."""
+    return _current_window.get()
+
+
+@contextmanager
+def use_history_window(window):
+    token = _current_window.set(window)
+    try:
+        yield window
+    finally:
+        _current_window.reset(token)
+
+
+def count_tokens(text):
+    if not text:
+        return 0
+    if _encoding is not None:
+        return len(_encoding.encode(text))
+    return (len(text) + 3) // 4
+
+
+def message_tokens(messages):
+    return sum(count_tokens(m["content"]) + MESSAGE_OVERHEAD for m in messages)
+
+
+def format_turns(messages):
+    return "\n".join(f"{m['role'].upper()}: {m['content']}" for m in messages)
+
+
+def make_llm_summarizer(client, model="gpt-4o-mini", max_words=150):
+    """Async summarizer(previous_summary, new_messages) -> summary, backed by a chat model."""
+
+    async def summarize(previous_summary, new_messages):
+        response = await client.chat.completions.create(
+            model=model,
+            messages=[{"role": "user", "content": (
+                "You maintain the running summary of a phone call between a bank's fraud analyst "
+                "assistant and a customer. Update the summary with the new turns. Keep every fact "
+                "that matters later: whether identity was verified, which transactions the customer "
+                "confirmed or denied, phishing or data-sharing details, requests, the customer's "
+                f"language. At most {max_words} words, plain text.\n\n"
+                f"Current summary:\n{previous_summary or '(none)'}\n\n"
+                f"New turns:\n{format_turns(new_messages)}"
+            )}]
+        )
+        return response.choices[0].message.content.strip()
+
+    return summarize
+
+
+class HistoryWindow:
+    def __init__(self, summarize, max_tokens=2000, recent_messages=6, low_water=0.5):
+        self.summarize = summarize
+        self.max_tokens = max_tokens
+        self.recent_messages = recent_messages
+        self.low_water = low_water
+        self.summary = ""
+        self.folded = 0             # history[:folded] is represented by self.summary
+        self.folds = 0
+        self._lock = asyncio.Lock()
+
+    def summary_message(self):
+        return {"role": "system", "content": f"Summary of the call so far:\n{self.summary}"}
+
+    def with_summary(self, messages):
+        return ([self.summary_message()] if self.summary else []) + list(messages)
+
+    async def fit(self, history):
+        """
+        Fold old messages until the rest of `history` fits the budget;
+        returns the messages still kept verbatim.
+        """
+        async with self._lock:
+            if self.folded > len(history):
+                # a different (shorter) history: start over
+                self.summary, self.folded = "", 0
+            tail = history[self.folded:]
+            budget = self.max_tokens - (count_tokens(self.summary) + MESSAGE_OVERHEAD if self.summary else 0)
+            if message_tokens(tail) > budget and len(tail) > self.recent_messages:
+                # fold down to `low_water` of the budget, so a fold (one extra
+                # LLM call) happens every few turns rather than on every turn
+                n = 0
+                while (len(tail) - n > self.recent_messages
+                       and message_tokens(tail[n:]) > budget * self.low_water):
+                    n += 1
+                to_fold = tail[:n]
+                self.summary = await self.summarize(self.summary, to_fold)
+                self.folded += len(to_fold)
+                self.folds += 1
+            return history[self.folded:]
+
+    async def messages(self, history):
+        """History to send to the model: rolling summary (if any) + recent turns."""
+        return self.with_summary(await self.fit(history))
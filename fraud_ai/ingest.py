@@ -0,0 +1,73 @@
+# ingest.py
+"""
+Streaming loaders for transaction files (JSONL or CSV).
+
+Files are read one line at a time and fed to data.bulk_create_transactions,
+so memory stays flat no matter how large the input is.
+"""
+import csv
+import json
+from datetime import datetime
+from sqlalchemy.orm import Session
+from .models import Transaction
+from .data import bulk_create_transactions
+
+_COLUMNS = {c.name: c for c in Transaction.__table__.columns}
+_TRUE_VALUES = {"1", "true", "t", "yes", "y"}
+
+
+def _coerce_value(column, value):
+    if value is None or (isinstance(value, str) and value.strip() == ""):
+        return None
+    python_type = column.type.python_type
+    if isinstance(value, python_type):
+        return value
+    if python_type is bool:
+        return str(value).strip().lower() in _TRUE_VALUES
+    if python_type is datetime:
+        return datetime.fromisoformat(str(value).strip())
+    return python_type(value)
+
+
+def coerce_transaction_row(raw):
+    """Keep only Transaction columns and convert their values to the column types."""
+    row = {}
+    for key, value in raw.items():
+        column = _COLUMNS.get(key)
+        if column is None:
+            continue
+        value = _coerce_value(column, value)
+        if value is None and column.default is not None:
+            continue  # let the column default apply
+        row[key] = value
+    return row
+
+
+def _detect_format(path):
+    lower = str(path).lower()
+    if lower.endswith((".jsonl", ".ndjson")):
+        return "jsonl"
+    if lower.endswith(".csv"):
+        return "csv"
+    raise ValueError(f"Cannot infer file format from '{path}', pass fmt='jsonl' or fmt='csv'.")
+
+
+def iter_transactions_file(path, fmt=None):
+    """Yield transaction dicts from a JSONL or CSV file, one row at a time."""
+    fmt = fmt or _detect_format(path)
+    with open(path, newline="", encoding="utf-8") as f:
+        if fmt == "jsonl":
+            for line in f:
+                line = line.strip()
+                if line:
+                    yield coerce_transaction_row(json.loads(line))
+        elif fmt == "csv":
+            for raw in csv.DictReader(f):
+                yield coerce_transaction_row(raw)
+        else:
+            raise ValueError("fmt must be 'jsonl' or 'csv'.")
+
+
+def load_transactions_file(db: Session, path, fmt=None, batch_size=1000):
+    """Stream a JSONL/CSV file into the transactions table. Returns the row count."""
+    return bulk_create_transactions(db, iter_transactions_file(path, fmt), batch_size=batch_size)
@@ -1,12 +1,29 @@
-from openai import OpenAI
-from fraud_ai.config import OPENAI_API_KEY
+import json
+import re
+from openai import OpenAI, AsyncOpenAI
+from fraud_ai.config import OPENAI_API_KEY, FAST_PATH_THRESHOLD, CLASSIFICATION_CACHE_CONTEXT
+from fraud_ai.fast_classifier import fast_label
+from fraud_ai.classification_cache import get_classification_cache, current_flow_state, last_assistant_turn, make_key
+from sqlalchemy.ext.asyncio import AsyncSession
+from fraud_ai import blocked, whitelist, reset_password, alerts, aio
+
+CLASSIFIER_MODEL = "gpt-4o-mini"
 
+# Sync client: used only by the legacy (non-async) callers.
 client = OpenAI(api_key=OPENAI_API_KEY)
+# Async client: shared by the call flow so classifications never block the event loop.
+async_client = AsyncOpenAI(api_key=OPENAI_API_KEY)
+
+USER_VERIFICATION_LABELS = ["YES", "NO", "REPEAT", "OFFTOPIC", "CLARIFY"]
+USER_REPLY_LABELS = ["OK", "FRAUD", "NOT FRAUD", "REPEAT", "OFFTOPIC", "END", "CANT_TALK", "CALL_BACK_LATER", "NO_CALL_BACK"]
+INVESTIGATION_LABELS = ["INFO_COMPLETE", "INFO_INCOMPLETE", "REPEAT", "OFFTOPIC", "END"]
+HELP_LABELS = ["YES", "NO", "REPEAT", "OFFTOPIC", "END"]
+
 
 def chatgpt_response(history, user_input):
     history.append({"role": "user", "content": user_input})
     response = client.chat.completions.create(
-        model="gpt-4o-mini",
+        model=CLASSIFIER_MODEL,
         messages=history
     )
     reply = response.choices[0].message.content
@@ -14,68 +31,181 @@ def chatgpt_response(history, user_input):
     return reply
 
 
-def llm_user_verification(user_text, conversation_history, system_prompt):
-    last_msgs = conversation_history[-4:] if len(conversation_history) > 4 else conversation_history
-    context = "\n".join([f"{m['role']}: {m['content']}" for m in last_msgs])
-    prompt = (
-        f"System context:\n{system_prompt}\n\n"
-        f"Recent conversation:\n{context}\n"
-        f"Customer just said (in their language): '{user_text}'\n\n"
-        "Classify the customer's reply as one of the following categories:\n"
-        "YES: Customer confirmed their identity (e.g., 'Yes, it's me', 'That's correct')\n"
-        "NO: The person answering is NOT the customer (e.g., 'No, I'm his wife', 'This is not him')\n"
-        "REPEAT: The customer's answer is unclear or unintelligible; ask to repeat\n"
-        "OFFTOPIC: The customer is talking about something unrelated to identity verification\n"
-        "CLARIFY: The customer is asking for clarification or to repeat (e.g., 'Who are you?', 'Why are you calling me?')\n\n"
-        "Reply with only ONE word from: YES, NO, REPEAT, OFFTOPIC, CLARIFY.\n"
-        "Example of valid reply: YES"
-    )
-    resp = client.chat.completions.create(
-        model="gpt-4o-mini",
+# ---------------------------
+# Shared helpers (sync + async)
+# ---------------------------
+
+def _recent_context(conversation_history, n):
+    last_msgs = conversation_history[-n:] if len(conversation_history) > n else conversation_history
+    return "\n".join([f"{m['role']}: {m['content']}" for m in last_msgs])
+
+
+def _parse_label(content, valid_labels, default="REPEAT"):
+    resp = (content or "").strip().upper()
+    return resp if resp in valid_labels else default
+
+
+def _classify(prompt, valid_labels):
+    content = client.chat.completions.create(
+        model=CLASSIFIER_MODEL,
         messages=[{"role": "user", "content": prompt}]
-    ).choices[0].message.content.strip().upper()
-    
-    valid_responses = ["YES", "NO", "REPEAT", "OFFTOPIC", "CLARIFY"]
-    if resp not in valid_responses:
-        resp = "REPEAT"
-    return resp
+    ).choices[0].message.content
+    return _parse_label(content, valid_labels)
 
 
+def _fast_path(classifier, user_text):
+    """Local rule-based label for clear-cut replies, or None to ask the LLM."""
+    label = fast_label(classifier, user_text, FAST_PATH_THRESHOLD)
+    if label is not None:
+        print(f"[DEBUG] Fast-path classification ({classifier}): {label}")
+    return label
 
 
-def llm_classify_user_reply(user_text, conversation_history, system_prompt):
-    last_msgs = conversation_history[-5:] if len(conversation_history) > 5 else conversation_history
-    context = "\n".join([f"{m['role']}: {m['content']}" for m in last_msgs])
-    prompt = (
+async def _classify_async(prompt, valid_labels):
+    response = await async_client.chat.completions.create(
+        model=CLASSIFIER_MODEL,
+        messages=[{"role": "user", "content": prompt}]
+    )
+    return _parse_label(response.choices[0].message.content, valid_labels)
+
+
+# ---------------------------
+# Prompts
+# ---------------------------
+
+_USER_VERIFICATION_GUIDE = (
+    "Classify the customer's reply as one of the following categories:\n"
+    "YES: Customer confirmed their identity (e.g., 'Yes, it's me', 'That's correct')\n"
+    "NO: The person answering is NOT the customer (e.g., 'No, I'm his wife', 'This is not him')\n"
+    "REPEAT: The customer's answer is unclear or unintelligible; ask to repeat\n"
+    "OFFTOPIC: The customer is talking about something unrelated to identity verification\n"
+    "CLARIFY: The customer is asking for clarification or to repeat (e.g., 'Who are you?', 'Why are you calling me?')\n\n"
+    "Reply with only ONE word from: YES, NO, REPEAT, OFFTOPIC, CLARIFY.\n"
+    "Example of valid reply: YES"
+)
+
+_USER_REPLY_GUIDE = (
+    "Classify the customer's reply as one of the following:\n"
+    "- OK: The reply is clear and relevant to the transaction verification."
+    "Also, if the customer asks for clarification about security, phishing, fraud, or similar terms, classify as OK.\n"
+    "- FRAUD: Customer explicitly indicates the transaction was NOT made by them and is cleary fraudulent.\n"
+    "- NOT FRAUD: Customer explicitly indicates the transaction was made by them.\n"
+    "- REPEAT: The reply is unclear or ambiguous.\n"
+    "- OFFTOPIC: The reply is off-topic meaning is not relevant to the conversation.\n"
+    "- END: The customer is closing the conversation (e.g., says 'all clear', 'no questions', 'thank you', 'tutto chiaro', etc.)\n"
+    "- CANT_TALK: customer says they cannot talk right now."
+    "- CALL_BACK_LATER: customer agrees to be called later."
+    "- NO_CALL_BACK: customer says they do not want to be called later."
+
+    "Reply with only one word: OK, FRAUD, NOT FRAUD, REPEAT, OFFTOPIC, END, CANT_TALK, CALL_BACK_LATER, NO_CALL_BACK.\n"
+    "Example of valid reply: OK"
+)
+
+_INVESTIGATION_GUIDE = (
+    "Classify as one word:\n"
+    "- INFO_COMPLETE: Customer has given all necessary info OR has said they don't know anything else.\n"
+    "- INFO_INCOMPLETE: Customer is giving relevant info but missing key details like data inserted in phishing form.\n"
+    "- REPEAT: Reply is unclear, they ask to repeat.\n"
+    "- OFFTOPIC: Reply not related to fraud investigation.\n"
+    "- END: Customer wants to stop talking / end call."
+)
+
+_HELP_GUIDE = (
+    "Classify as one word:\n"
+    "- YES: They want further help or have another request.\n"
+    "- NO: They do not need further help.\n"
+    "- REPEAT: They ask to repeat the question.\n"
+    "- OFFTOPIC: Answer is unrelated.\n"
+    "- END: They want to close the conversation."
+)
+
+
+def _classification_prompt(guide, user_text, conversation_history, system_prompt, n, blank_line=True):
+    context = _recent_context(conversation_history, n)
+    return (
         f"System context:\n{system_prompt}\n\n"
         f"Recent conversation:\n{context}\n"
         f"Customer just said (in their language): '{user_text}'\n"
-        "Classify the customer's reply as one of the following:\n"
-        "- OK: The reply is clear and relevant to the transaction verification."
-        "Also, if the customer asks for clarification about security, phishing, fraud, or similar terms, classify as OK.\n"
-        "- FRAUD: Customer explicitly indicates the transaction was NOT made by them and is cleary fraudulent.\n"
-        "- NOT FRAUD: Customer explicitly indicates the transaction was made by them.\n"
-        "- REPEAT: The reply is unclear or ambiguous.\n"
-        "- OFFTOPIC: The reply is off-topic meaning is not relevant to the conversation.\n"
-        "- END: The customer is closing the conversation (e.g., says 'all clear', 'no questions', 'thank you', 'tutto chiaro', etc.)\n"
-        "- CANT_TALK: customer says they cannot talk right now."
-        "- CALL_BACK_LATER: customer agrees to be called later."
-        "- NO_CALL_BACK: customer says they do not want to be called later."
-    
-        "Reply with only one word: OK, FRAUD, NOT FRAUD, REPEAT, OFFTOPIC, END, CANT_TALK, CALL_BACK_LATER, NO_CALL_BACK.\n"
-        "Example of valid reply: OK"
+        + ("\n" if blank_line else "")
+        + guide
     )
-    resp = client.chat.completions.create(
-        model="gpt-4o-mini",
-        messages=[{"role": "user", "content": prompt}]
-    ).choices[0].message.content.strip().upper()
-    if resp not in ["OK", "FRAUD", "NOT FRAUD", "REPEAT", "OFFTOPIC", "END", "CANT_TALK", "CALL_BACK_LATER", "NO_CALL_BACK"]:
-        resp = "REPEAT"
-    return resp
 
 
+def _user_verification_prompt(user_text, conversation_history, system_prompt):
+    return _classification_prompt(_USER_VERIFICATION_GUIDE, user_text, conversation_history, system_prompt, 4)
 
-def llm_classify_investigation_reply(user_text, conversation_history, system_prompt):
+
+def _user_reply_prompt(user_text, conversation_history, system_prompt):
+    return _classification_prompt(_USER_REPLY_GUIDE, user_text, conversation_history, system_prompt, 5,
+                                  blank_line=False)
+
+
+def _investigation_prompt(user_text, conversation_history, system_prompt):
+    return _classification_prompt(_INVESTIGATION_GUIDE, user_text, conversation_history, system_prompt, 5)
+
+
+def _help_prompt(user_text, conversation_history, system_prompt):
+    return _classification_prompt(_HELP_GUIDE, user_text, conversation_history, system_prompt, 5)
+
+
+# ---------------------------
+# Fast path + cache in front of the LLM
+# ---------------------------
+
+_CLASSIFIERS = {
+    "user_verification": (_user_verification_prompt, USER_VERIFICATION_LABELS),
+    "user_reply": (_user_reply_prompt, USER_REPLY_LABELS),
+    "investigation": (_investigation_prompt, INVESTIGATION_LABELS),
+    "help": (_help_prompt, HELP_LABELS),
+}
+
+
+def _precheck(classifier, user_text, conversation_history):
+    """Fast-path label, else cached label. Returns (label or None, cache key)."""
+    fast = _fast_path(classifier, user_text)
+    if fast:
+        return fast, None
+    context = last_assistant_turn(conversation_history) if CLASSIFICATION_CACHE_CONTEXT else None
+    key = make_key(classifier, user_text, state=current_flow_state(), last_assistant=context)
+    cached = get_classification_cache().get(key)
+    if cached is not None:
+        print(f"[DEBUG] Cached classification ({classifier}): {cached}")
+    return cached, key
+
+
+async def _run_classifier_async(classifier, user_text, conversation_history, system_prompt):
+    label, key = _precheck(classifier, user_text, conversation_history)
+    if label:
+        return label
+    build_prompt, labels = _CLASSIFIERS[classifier]
+    label = await _classify_async(build_prompt(user_text, conversation_history, system_prompt), labels)
+    get_classification_cache().set(key, label)
+    return label
+
+
+def _run_classifier(classifier, user_text, conversation_history, system_prompt):
+    label, key = _precheck(classifier, user_text, conversation_history)
+    if label:
+        return label
+    build_prompt, labels = _CLASSIFIERS[classifier]
+    label = _classify(build_prompt(user_text, conversation_history, system_prompt), labels)
+    get_classification_cache().set(key, label)
+    return label
+
+
+# ---------------------------
+# Async classifiers (call flow)
+# ---------------------------
+
+async def llm_user_verification_async(user_text, conversation_history, system_prompt):
+    return await _run_classifier_async("user_verification", user_text, conversation_history, system_prompt)
+
+
+async def llm_classify_user_reply_async(user_text, conversation_history, system_prompt):
+    return await _run_classifier_async("user_reply", user_text, conversation_history, system_prompt)
+
+
+async def llm_classify_investigation_reply_async(user_text, conversation_history, system_prompt):
     """
     Classifies a customer's response during the fraud investigation phase.
 
@@ -85,78 +215,168 @@ def llm_classify_investigation_reply(user_text, conversation_history, system_pro
     OFFTOPIC = Unrelated to fraud investigation.
     END = Wants to end the conversation.
     """
-    last_msgs = conversation_history[-5:] if len(conversation_history) > 5 else conversation_history
-    context = "\n".join([f"{m['role']}: {m['content']}" for m in last_msgs])
-    prompt = (
-        f"System context:\n{system_prompt}\n\n"
-        f"Recent conversation:\n{context}\n"
-        f"Customer just said (in their language): '{user_text}'\n\n"
-        "Classify as one word:\n"
-        "- INFO_COMPLETE: Customer has given all necessary info OR has said they don't know anything else.\n"
-        "- INFO_INCOMPLETE: Customer is giving relevant info but missing key details like data inserted in phishing form.\n"
-        "- REPEAT: Reply is unclear, they ask to repeat.\n"
-        "- OFFTOPIC: Reply not related to fraud investigation.\n"
-        "- END: Customer wants to stop talking / end call."
-    )
+    return await _run_classifier_async("investigation", user_text, conversation_history, system_prompt)
 
-    resp = client.chat.completions.create(
-        model="gpt-4o-mini",
-        messages=[{"role": "user", "content": prompt}]
-    ).choices[0].message.content.strip().upper()
 
-    valid = ["INFO_COMPLETE", "INFO_INCOMPLETE", "REPEAT", "OFFTOPIC", "END"]
-    if resp not in valid:
-        resp = "REPEAT"
-    return resp
-
-def llm_classify_help_reply(user_text, conversation_history, system_prompt):
+async def llm_classify_help_reply_async(user_text, conversation_history, system_prompt):
     """
     Classify at the final help-offer step.
     """
-    last_msgs = conversation_history[-5:] if len(conversation_history) > 5 else conversation_history
-    context = "\n".join([f"{m['role']}: {m['content']}" for m in last_msgs])
-    prompt = (
-        f"System context:\n{system_prompt}\n\n"
-        f"Recent conversation:\n{context}\n"
-        f"Customer just said (in their language): '{user_text}'\n\n"
-        "Classify as one word:\n"
-        "- YES: They want further help or have another request.\n"
-        "- NO: They do not need further help.\n"
-        "- REPEAT: They ask to repeat the question.\n"
-        "- OFFTOPIC: Answer is unrelated.\n"
-        "- END: They want to close the conversation."
-    )
+    return await _run_classifier_async("help", user_text, conversation_history, system_prompt)
 
-    resp = client.chat.completions.create(
-        model="gpt-4o-mini",
-        messages=[{"role": "user", "content": prompt}]
-    ).choices[0].message.content.strip().upper()
 
-    if resp not in ["YES", "NO", "REPEAT", "OFFTOPIC", "END"]:
-        resp = "REPEAT"
-    return resp
+# ---------------------------
+# Sync wrappers (legacy callers)
+# ---------------------------
 
+def llm_user_verification(user_text, conversation_history, system_prompt):
+    return _run_classifier("user_verification", user_text, conversation_history, system_prompt)
 
-import json
-from fraud_ai import blocked, whitelist, reset_password, alerts
 
+def llm_classify_user_reply(user_text, conversation_history, system_prompt):
+    return _run_classifier("user_reply", user_text, conversation_history, system_prompt)
+
+
+def llm_classify_investigation_reply(user_text, conversation_history, system_prompt):
+    """Sync version of llm_classify_investigation_reply_async."""
+    return _run_classifier("investigation", user_text, conversation_history, system_prompt)
+
+
+def llm_classify_help_reply(user_text, conversation_history, system_prompt):
+    """Sync version of llm_classify_help_reply_async."""
+    return _run_classifier("help", user_text, conversation_history, system_prompt)
+
+
+# ---------------------------
+# Combined classification + reply (one streamed call)
+# ---------------------------
+
+_GUIDES = {
+    "user_verification": _USER_VERIFICATION_GUIDE,
+    "user_reply": _USER_REPLY_GUIDE,
+    "investigation": _INVESTIGATION_GUIDE,
+    "help": _HELP_GUIDE,
+}
+
+CLASSIFIER_NAMES = {
+    llm_user_verification_async: "user_verification",
+    llm_classify_user_reply_async: "user_reply",
+    llm_classify_investigation_reply_async: "investigation",
+    llm_classify_help_reply_async: "help",
+}
 
-def finalize_call_summary(db, alert, alerted_tx, history):
+_LABEL_LINE = re.compile(r"\{[^{}]*\}")
+
+
+def _combined_turn_prompt(classifier, branches):
+    instructions = "\n".join(f"- {label}: {' '.join(prompt.split())}" for label, prompt in branches.items())
+    return (
+        "The customer has just replied (last user message). Do two things in a single answer.\n\n"
+        "1. Classify the customer's reply.\n"
+        f"{_GUIDES[classifier]}\n\n"
+        "2. Continue the call as the assistant.\n\n"
+        "Output format (this replaces any 'reply with one word' instruction above):\n"
+        '- First line: only a JSON object with the label, e.g. {"label": "' + _CLASSIFIERS[classifier][1][0] + '"}\n'
+        "- If the label is listed below: on the next lines, what you say to the customer next, following the "
+        "instruction for that label. Spoken text only, no labels or markup.\n"
+        "- For any other label, stop after the first line.\n\n"
+        f"Next-turn instructions by label:\n{instructions}"
+    )
+
+
+async def _split_label(deltas, valid_labels):
     """
-    Generate a final summary of the conversation and decide on security actions
-    (whitelist, block card, reset password) based on the history.
+    Read deltas until the JSON label line is complete.
+    Returns (label or None, remainder of the reply text already received).
     """
+    buffer = ""
+    async for content in deltas:
+        buffer += content
+        match = _LABEL_LINE.search(buffer)
+        if match:
+            try:
+                label = str(json.loads(match.group(0)).get("label", "")).strip().upper()
+            except (ValueError, AttributeError):
+                label = ""
+            return (label if label in valid_labels else None), buffer[match.end():].lstrip()
+    return None, buffer
+
+
+async def llm_classify_and_reply_async(classifier, user_text, conversation_history, system_prompt, branches,
+                                       model=CLASSIFIER_MODEL):
+    """
+    Classify the customer's last reply and, when the label has a branch,
+    stream the next assistant turn in the same call.
+
+    `conversation_history` must already end with the customer's reply.
+    `branches` maps label -> step prompt for the next turn. Returns
+    (label, reply_deltas): reply_deltas is an async iterator of reply text,
+    or None if no reply was generated. That happens when the label came from
+    the fast path or the cache, or has no branch; the caller then generates
+    the reply as usual.
+    """
+    label, key = _precheck(classifier, user_text, conversation_history)
+    if label:
+        return label, None
+
+    labels = _CLASSIFIERS[classifier][1]
+    stream = await async_client.chat.completions.create(
+        model=model,
+        messages=(
+            [{"role": "system", "content": system_prompt}]
+            + conversation_history
+            + [{"role": "user", "content": _combined_turn_prompt(classifier, branches)}]
+        ),
+        stream=True
+    )
+
+    async def deltas():
+        try:
+            async for event in stream:
+                delta = event.choices[0].delta if event.choices else None
+                if delta and delta.content:
+                    yield delta.content
+        finally:
+            await stream.close()
 
+    source = deltas()
+    label, head = await _split_label(source, labels)
+    if label is None:
+        # no usable label line: same fallback as the one-word classifiers
+        await source.aclose()
+        return _parse_label(head, labels), None
+    get_classification_cache().set(key, label)
+    if label not in branches:
+        await source.aclose()
+        return label, None
+
+    async def reply():
+        if head:
+            yield head
+        async for content in source:
+            yield content
+
+    return label, reply()
+
+
+# ---------------------------
+# Final summary
+# ---------------------------
+
+def _summary_prompt(history, earlier_summary=""):
     context = "\n".join([f"{m['role'].upper()}: {m['content']}" for m in history])
+    if earlier_summary:
+        # long call: older turns arrive pre-summarised by the history window
+        context = f"(Summary of the earlier part of the call)\n{earlier_summary}\n\n(Most recent turns)\n{context}"
 
-    prompt = f"""
-You are a fraud prevention analyst assistant. 
+    return f"""
+You are a fraud prevention analyst assistant.
 Analyze the following conversation history between assistant and customer:
 
 {context}
 
 Tasks:
-1. Provide a clear, concise summary of the discussion and the outcome. 
+1. Provide a clear, concise summary of the discussion and the outcome.
 2. Decide which actions must be taken, from this list:
    - WHITELIST: The customer confirmed the alerted transaction as legitimate (no fraudulent transactions).
    - BLOCK_CARD: Fraudulent transactions and card data are compromised. (only if customer confirmed fraud)
@@ -169,24 +389,23 @@ Tasks:
    }}
 """
 
-    resp = client.chat.completions.create(
-        model="gpt-4o-mini",
-        messages=[{"role": "user", "content": prompt}]
-    )
-
-    content = resp.choices[0].message.content.strip()
 
+def _parse_call_summary(content):
     try:
-        result = json.loads(content)
+        return json.loads(content)
     except json.JSONDecodeError:
         # fallback: wrap into JSON if model gave plain text
-        result = {"summary": content, "actions": []}
+        return {"summary": content, "actions": []}
+
+
+def _apply_call_summary(db, alert, alerted_tx, content):
+    result = _parse_call_summary(content)
 
     # --- Save summary to alert ---
     alerts.update_alert(db, alert.id, analyst_notes=result["summary"])
 
     # --- Apply security actions ---
-    for action in result.get("actions", []):
+    for action in result.get("actions") or []:
         if action == "BLOCK_CARD":
             blocked.add_to_blocked(db, alerted_tx.card_number)
         elif action == "WHITELIST":
@@ -195,3 +414,42 @@ Tasks:
             reset_password.add_password_reset(db, alerted_tx.card_number, reason="compromised credentials")
 
     return result
+
+
+async def _apply_call_summary_async(db, alert, alerted_tx, content):
+    """_apply_call_summary through fraud_ai.aio, for an AsyncSession."""
+    result = _parse_call_summary(content)
+    await aio.update_alert(db, alert.id, analyst_notes=result["summary"])
+    for action in result.get("actions") or []:
+        if action == "BLOCK_CARD":
+            await aio.add_to_blocked(db, alerted_tx.card_number)
+        elif action == "WHITELIST":
+            await aio.add_to_whitelist(db, alerted_tx.card_number)
+        elif action == "RESET_PASSWORD":
+            await aio.add_password_reset(db, alerted_tx.card_number, reason="compromised credentials")
+    return result
+
+
+async def finalize_call_summary_async(db, alert, alerted_tx, history, earlier_summary=""):
+    """
+    Generate a final summary of the conversation and decide on security actions
+    (whitelist, block card, reset password) based on the history.
+    `earlier_summary` stands in for turns already folded out of `history`.
+    """
+    resp = await async_client.chat.completions.create(
+        model=CLASSIFIER_MODEL,
+        messages=[{"role": "user", "content": _summary_prompt(history, earlier_summary)}]
+    )
+    content = resp.choices[0].message.content.strip()
+    if isinstance(db, AsyncSession):
+        return await _apply_call_summary_async(db, alert, alerted_tx, content)
+    return _apply_call_summary(db, alert, alerted_tx, content)
+
+
+def finalize_call_summary(db, alert, alerted_tx, history, earlier_summary=""):
+    """Sync version of finalize_call_summary_async."""
+    resp = client.chat.completions.create(
+        model=CLASSIFIER_MODEL,
+        messages=[{"role": "user", "content": _summary_prompt(history, earlier_summary)}]
+    )
+    return _apply_call_summary(db, alert, alerted_tx, resp.choices[0].message.content.strip())
@@ -0,0 +1,47 @@
+# migrations.py
+"""
+Schema upgrades for databases created before a model change.
+
+Base.metadata.create_all only creates missing tables: an index added to a
+model never reaches a table that already exists. upgrade() also creates
+every index declared in the models that the database does not have yet, so
+an existing fraud_ai.db picks up new indexes on the next init_db(). It is
+idempotent and only ever adds objects.
+
+    python -m fraud_ai.migrations      # upgrade the configured database
+"""
+import logging
+from sqlalchemy import inspect
+from .models import Base
+
+logger = logging.getLogger(__name__)
+
+
+def missing_indexes(engine):
+    """Indexes declared in the models but absent from the database."""
+    inspector = inspect(engine)
+    existing_tables = set(inspector.get_table_names())
+    missing = []
+    for table in Base.metadata.tables.values():
+        if table.name not in existing_tables:
+            continue            # create_all builds it with its indexes
+        existing = {ix["name"] for ix in inspector.get_indexes(table.name)}
+        missing += [ix for ix in table.indexes if ix.name not in existing]
+    return missing
+
+
+def upgrade(engine):
+    """Create missing tables and indexes; returns the names of the indexes added."""
+    to_add = missing_indexes(engine)
+    Base.metadata.create_all(bind=engine)
+    for index in to_add:
+        logger.info("Creating index %s on %s", index.name, index.table.name)
+        index.create(bind=engine, checkfirst=True)
+    return [index.name for index in to_add]
+
+
+if __name__ == "__main__":
+    from .data import engine
+    logging.basicConfig(level=logging.INFO)
+    added = upgrade(engine)
+    print(f"{len(added)} index(es) added" + (f": {', '.join(added)}" if added else ""))
@@ -1,5 +1,6 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Boolean, Text
+from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Boolean, Text, Index
 from sqlalchemy.ext.declarative import declarative_base
+from sqlalchemy.orm import relationship
 from datetime import datetime
 
 Base = declarative_base()
@@ -9,7 +10,7 @@ class Transaction(Base):
     id = Column(Integer, primary_key=True)
     card_number = Column(String, index=True)
     amount = Column(Float)
-    timestamp = Column(DateTime, default=datetime.now())
+    timestamp = Column(DateTime, default=datetime.now)
     status = Column(String, default="pending")
     fraud_score = Column(Float)
     is_fraud = Column(Boolean, default=False)
@@ -23,25 +24,58 @@ class Transaction(Base):
     customer_first_name = Column(String, nullable=False)
     customer_last_name = Column(String, nullable=False)
 
+    __table_args__ = (
+        # card history around a point in time (get_transactions_in_window) and card pages
+        Index("ix_transactions_card_number_timestamp", "card_number", "timestamp"),
+        Index("ix_transactions_timestamp", "timestamp"),
+        Index("ix_transactions_alert_id", "alert_id"),
+    )
+
 class Alert(Base):
     __tablename__ = 'alerts'
     id = Column(Integer, primary_key=True)
     transaction_id = Column(Integer, ForeignKey('transactions.id'))
-    created_at = Column(DateTime, default=datetime.now())
+    created_at = Column(DateTime, default=datetime.now)
     status = Column(String, default="open")
     analyst_notes = Column(String)
 
+    # read-only navigation for eager loading (see alert_detail.py). transactions and
+    # alerts reference each other, so the foreign key to follow is explicit.
+    transaction = relationship("Transaction", foreign_keys=[transaction_id], viewonly=True)
+    messages = relationship(
+        "AlertConversation",
+        primaryjoin="Alert.id == AlertConversation.alert_id",
+        order_by="(AlertConversation.timestamp, AlertConversation.id)",
+        viewonly=True,
+    )
+
+    __table_args__ = (
+        # open-alert polling and alert pages, with or without a status filter
+        Index("ix_alerts_status_created_at", "status", "created_at"),
+        Index("ix_alerts_created_at", "created_at"),
+    )
+
 class Whitelist(Base):
     __tablename__ = 'whitelist'
     id = Column(Integer, primary_key=True)
     card_number = Column(String, unique=True)
-    whitelisted_at = Column(DateTime, default=datetime.now())
+    whitelisted_at = Column(DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        # expiry sweep (expiry.py)
+        Index("ix_whitelist_whitelisted_at", "whitelisted_at"),
+    )
 
 class BlockedCard(Base):
     __tablename__ = 'blocked_cards'
     id = Column(Integer, primary_key=True)
     card_number = Column(String, unique=True)
-    blocked_at = Column(DateTime, default=datetime.now())
+    blocked_at = Column(DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        # expiry sweep (expiry.py)
+        Index("ix_blocked_cards_blocked_at", "blocked_at"),
+    )
 
 class AlertConversation(Base):
     __tablename__ = 'alert_conversations'
@@ -49,7 +83,12 @@ class AlertConversation(Base):
     alert_id = Column(Integer, ForeignKey('alerts.id'), index=True)
     role = Column(String, nullable=False)  # 'assistant' or 'user'
     content = Column(Text, nullable=False)
-    timestamp = Column(DateTime, default=datetime.now())
+    timestamp = Column(DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        # transcript of one alert in order
+        Index("ix_alert_conversations_alert_id_timestamp", "alert_id", "timestamp"),
+    )
 
 
 class PasswordReset(Base):
@@ -58,4 +97,9 @@ class PasswordReset(Base):
     id = Column(Integer, primary_key=True, index=True)
     card_number = Column(String, index=True)
     reason = Column(String)
-    timestamp = Column(DateTime, default=datetime.now())
+    timestamp = Column(DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        # expiry sweep (expiry.py)
+        Index("ix_password_resets_timestamp", "timestamp"),
+    )
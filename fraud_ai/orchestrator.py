@@ -0,0 +1,218 @@
+# orchestrator.py
+"""
+Runs many fraud calls at once on a single asyncio loop.
+
+Open alerts are polled with alerts.get_alerts(status="open"), claimed
+atomically (so several workers can share the same database) and dispatched
+to full_fraud_flow, up to `max_concurrent_calls` at a time.
+
+All database work goes through the async layer (fraud_ai.aio), so polling,
+claiming and closing alerts never block the calls sharing the loop. Each
+call gets its own AsyncSession, which the flow also uses for its writes.
+
+While it runs, an ExpirySweeper (fraud_ai.expiry) removes expired whitelist
+entries, blocks and password resets every `expiry_interval` seconds.
+"""
+import asyncio
+import logging
+import signal
+
+from fraud_ai.aio import (
+    AsyncSessionLocal, session_scope, get_transaction, get_transactions_in_window,
+    get_alert, get_alerts, claim_alert, update_alert,
+)
+from fraud_ai.config import EXPIRY_SWEEP_INTERVAL
+from fraud_ai.expiry import ExpirySweeper
+from fraud_ai.fraud_flow import full_fraud_flow
+from fraud_ai.tts_client import close_tts_client
+from fraud_ai.tts_cache import prewarm_backend
+
+logger = logging.getLogger(__name__)
+
+# Alert lifecycle handled by the orchestrator
+STATUS_OPEN = "open"
+STATUS_IN_PROGRESS = "in_progress"
+STATUS_CLOSED = "closed"              # flow reached the end of the script
+STATUS_CALLBACK = "callback"          # flow ended early (not the cardholder, can't talk...)
+STATUS_FAILED = "failed"              # error or per-call timeout
+
+
+class CallOrchestrator:
+    """Pulls open alerts and runs their calls concurrently.
+
+    `max_concurrent_calls` should match the number of outbound lines,
+    `call_timeout` caps a single call (seconds) and `drain_timeout` is how
+    long in-flight calls may keep running after stop() before being cancelled.
+    `expiry_interval` is the period of the expiry sweeps (0 disables them).
+    `transcript_streams`, if given, is called with each alert and returns
+    the call's transcript_stream (streaming STT, see full_fraud_flow).
+    """
+
+    def __init__(self, max_concurrent_calls=10, call_timeout=600, poll_interval=5,
+                 batch_size=100, drain_timeout=60, expiry_interval=EXPIRY_SWEEP_INTERVAL,
+                 tts_backend="text", stt_enabled=False, stt_provider="openai",
+                 transcript_streams=None, flow=full_fraud_flow, session_factory=AsyncSessionLocal):
+        self.max_concurrent_calls = max_concurrent_calls
+        self.call_timeout = call_timeout
+        self.poll_interval = poll_interval
+        self.batch_size = batch_size
+        self.drain_timeout = drain_timeout
+        self.tts_backend = tts_backend
+        self.stt_enabled = stt_enabled
+        self.stt_provider = stt_provider
+        self.transcript_streams = transcript_streams
+        self._flow = flow
+        self._session_factory = session_factory
+        self.sweeper = ExpirySweeper(session_factory, expiry_interval) if expiry_interval else None
+        self._tasks = {}            # alert_id -> task of the call in flight
+        self._semaphore = None
+        self._stopping = None
+        self.stats = {"started": 0, "completed": 0, "callback": 0, "failed": 0, "timed_out": 0}
+
+    # ---------------------------
+    # Lifecycle
+    # ---------------------------
+
+    def stop(self):
+        """Stop dialling new alerts; in-flight calls are drained by run()."""
+        if self._stopping is not None:
+            self._stopping.set()
+
+    def install_signal_handlers(self):
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            try:
+                loop.add_signal_handler(sig, self.stop)
+            except (NotImplementedError, RuntimeError):
+                # Windows / non-main thread: caller has to invoke stop() itself
+                pass
+
+    async def run(self, until_idle=False):
+        """Poll and dispatch until stop() is called (or, with `until_idle`,
+        until no open alerts are left), then drain the running calls."""
+        self._semaphore = asyncio.Semaphore(self.max_concurrent_calls)
+        self._stopping = asyncio.Event()
+        await self._prewarm_tts()
+        if self.sweeper:
+            self.sweeper.start()
+
+        try:
+            while not self._stopping.is_set():
+                dispatched = await self._dispatch_open_alerts()
+                if not dispatched:
+                    if until_idle and not self._tasks:
+                        break
+                    try:
+                        await asyncio.wait_for(self._stopping.wait(), timeout=self.poll_interval)
+                    except asyncio.TimeoutError:
+                        pass
+        finally:
+            await self._drain()
+            if self.sweeper:
+                await self.sweeper.stop()
+            await close_tts_client()
+        return self.stats
+
+    async def _prewarm_tts(self):
+        """Pre-synthesize the fixed phrases, so the first calls already play them from the cache."""
+        try:
+            warmed = await prewarm_backend(self.tts_backend)
+        except Exception:
+            logger.exception("TTS cache prewarm failed")
+            return
+        if warmed:
+            logger.info("Pre-synthesized %d fixed sentence(s) for %s", warmed, self.tts_backend)
+
+    async def _drain(self):
+        if not self._tasks:
+            return
+        logger.info("Draining %d in-flight call(s)", len(self._tasks))
+        _, pending = await asyncio.wait(set(self._tasks.values()), timeout=self.drain_timeout)
+        for task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+
+    # ---------------------------
+    # Dispatch
+    # ---------------------------
+
+    async def _dispatch_open_alerts(self):
+        async with session_scope(self._session_factory) as db:
+            alert_ids = [a.id for a in await get_alerts(db, status=STATUS_OPEN, limit=self.batch_size)]
+        # a dispatched alert stays open until its task claims it: don't dispatch it twice
+        alert_ids = [i for i in alert_ids if i not in self._tasks]
+
+        dispatched = 0
+        for alert_id in alert_ids:
+            await self._semaphore.acquire()
+            if self._stopping.is_set():
+                self._semaphore.release()
+                break
+            task = asyncio.create_task(self._run_call(alert_id))
+            self._tasks[alert_id] = task
+            task.add_done_callback(lambda _, alert_id=alert_id: self._tasks.pop(alert_id, None))
+            dispatched += 1
+        return dispatched
+
+    async def _run_call(self, alert_id):
+        db = self._session_factory()
+        try:
+            if not await claim_alert(db, alert_id, from_status=STATUS_OPEN, to_status=STATUS_IN_PROGRESS):
+                return  # another worker got there first
+
+            alert = await get_alert(db, alert_id)
+            alerted_tx = await get_transaction(db, alert.transaction_id)
+            if alerted_tx is None:
+                logger.warning("Alert %s has no transaction, marking as failed", alert_id)
+                await update_alert(db, alert_id, status=STATUS_FAILED)
+                self.stats["failed"] += 1
+                return
+            recent_txs = await get_transactions_in_window(db, alerted_tx.card_number, alerted_tx.timestamp)
+
+            transcript_stream = self.transcript_streams(alert) if self.transcript_streams else None
+            self.stats["started"] += 1
+            try:
+                completed = await asyncio.wait_for(
+                    self._flow(db, alert, alerted_tx, recent_txs,
+                               self.tts_backend, self.stt_enabled, self.stt_provider,
+                               transcript_stream=transcript_stream),
+                    timeout=self.call_timeout,
+                )
+            except asyncio.TimeoutError:
+                logger.warning("Call for alert %s timed out after %ss", alert_id, self.call_timeout)
+                self.stats["timed_out"] += 1
+                await update_alert(db, alert_id, status=STATUS_FAILED)
+                return
+            except asyncio.CancelledError:
+                # Cancelled during drain: hand the alert back for the next worker
+                await db.rollback()
+                await update_alert(db, alert_id, status=STATUS_OPEN)
+                raise
+            except Exception:
+                logger.exception("Call for alert %s failed", alert_id)
+                await db.rollback()
+                self.stats["failed"] += 1
+                await update_alert(db, alert_id, status=STATUS_FAILED)
+                return
+
+            if completed:
+                self.stats["completed"] += 1
+                await update_alert(db, alert_id, status=STATUS_CLOSED)
+            else:
+                self.stats["callback"] += 1
+                await update_alert(db, alert_id, status=STATUS_CALLBACK)
+        finally:
+            await db.close()
+            self._semaphore.release()
+
+
+async def run_orchestrator(**kwargs):
+    orchestrator = CallOrchestrator(**kwargs)
+    orchestrator.install_signal_handlers()
+    return await orchestrator.run()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(run_orchestrator(tts_backend="elevenlabs", stt_enabled=True))
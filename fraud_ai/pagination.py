@@ -0,0 +1,58 @@
+# pagination.py
+"""
+Keyset (seek) pagination.
+
+offset(skip).limit(n) makes the database walk and throw away `skip` rows,
+so every page is slower than the one before. A keyset page instead starts
+right after the last row of the previous page:
+
+    WHERE (created_at, id) > (:last_created_at, :last_id)
+    ORDER BY created_at, id LIMIT :n
+
+With an index whose columns match the ORDER BY, that is one index seek per
+page, however deep. `id` is always the last sort column, so the order is
+total even when timestamps tie.
+
+    page = get_alerts_page(db, status="open", limit=50)
+    while page.items:
+        ...
+        page = get_alerts_page(db, status="open", after=page.next_cursor, limit=50)
+"""
+from typing import NamedTuple, Optional
+from sqlalchemy import tuple_
+
+
+class Page(NamedTuple):
+    items: list
+    next_cursor: Optional[tuple]     # pass as `after` for the next page; None on the last page
+
+
+def keyset_query(query, order_columns, after=None, limit=100, descending=False):
+    """
+    Add the seek condition, ordering and limit to a Query or a select().
+    One extra row is fetched to tell whether there is a next page.
+    """
+    if after is not None:
+        key = tuple_(*order_columns)
+        query = query.filter(key < tuple_(*after) if descending else key > tuple_(*after))
+    ordering = [c.desc() if descending else c.asc() for c in order_columns]
+    return query.order_by(*ordering).limit(limit + 1)
+
+
+def make_page(rows, order_columns, limit):
+    """Page from the rows of a keyset_query."""
+    items = list(rows[:limit])
+    next_cursor = None
+    if len(rows) > limit:
+        last = items[-1]
+        next_cursor = tuple(getattr(last, c.key) for c in order_columns)
+    return Page(items, next_cursor)
+
+
+def keyset_paginate(query, order_columns, after=None, limit=100, descending=False):
+    """
+    One page of `query` ordered by `order_columns` (the last one must be
+    unique, e.g. the primary key). `after` is the cursor of the previous page.
+    """
+    rows = keyset_query(query, order_columns, after, limit, descending).all()
+    return make_page(rows, order_columns, limit)
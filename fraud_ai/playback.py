@@ -0,0 +1,295 @@
+# playback.py
+"""
+Audio playback off the event loop, behind a bounded jitter buffer.
+
+Writing each network chunk to a blocking sounddevice stream from the TTS
+coroutine stalls the event loop for as long as the audio takes to play.
+Playback also stutters as soon as a chunk is late. PlaybackEngine decouples
+the two sides:
+
+- the coroutine hands PCM to write(), which only copies it into the buffer.
+  When the buffer is full, write() waits until the audio thread has made
+  room. That is the backpressure on the network reader: it stops pulling
+  chunks instead of letting memory grow;
+- a dedicated audio thread plays fixed-size blocks from the buffer. It
+  starts (and restarts after an underrun) only once `prebuffer_ms` of audio
+  is buffered, so small network jitter is absorbed instead of heard;
+- drain() marks the end of a reply. The tail is played even if it is
+  shorter than the prebuffer, and the buffer running empty after that is
+  not an underrun.
+
+Sinks are plain objects with blocking write(samples) and close(), called
+from the audio thread only: SoundDeviceSink (sound card), NullSink (drops
+the audio, optionally at real-time pace) and WavFileSink. The last two make
+the engine testable without a sound card.
+
+    async with PlaybackEngine(SoundDeviceSink(22050), samplerate=22050) as engine:
+        async for pcm in stream:
+            await engine.write(pcm)
+        await engine.drain()
+    print(engine.stats())
+"""
+import asyncio
+import threading
+import time
+import numpy as np
+
+CHANNELS = 1
+SAMPLE_BYTES = 2        # int16
+
+
+# ---------------------------
+# Sinks
+# ---------------------------
+
+class SoundDeviceSink:
+    """Local sound card through a blocking sounddevice output stream."""
+
+    def __init__(self, samplerate, channels=CHANNELS, device=None):
+        self.samplerate = samplerate
+        self.channels = channels
+        self.device = device
+        self._stream = None
+
+    def write(self, samples):
+        if self._stream is None:
+            import sounddevice as sd   # only needed for local playback
+            self._stream = sd.OutputStream(samplerate=self.samplerate, channels=self.channels,
+                                           dtype="int16", device=self.device)
+            self._stream.start()
+        self._stream.write(samples)
+
+    def close(self):
+        if self._stream is not None:
+            self._stream.stop()
+            self._stream.close()
+            self._stream = None
+
+
+class NullSink:
+    """Drops the audio. With `realtime`, takes as long as playing it would."""
+
+    def __init__(self, samplerate, realtime=True):
+        self.samplerate = samplerate
+        self.realtime = realtime
+        self.frames = 0
+
+    def write(self, samples):
+        self.frames += len(samples)
+        if self.realtime:
+            time.sleep(len(samples) / self.samplerate)
+
+    def close(self):
+        pass
+
+
+class WavFileSink:
+    """Writes the audio to a 16-bit WAV file."""
+
+    def __init__(self, path, samplerate, channels=CHANNELS, realtime=False):
+        import soundfile as sf
+        self.samplerate = samplerate
+        self.realtime = realtime
+        self._file = sf.SoundFile(path, mode="w", samplerate=samplerate, channels=channels,
+                                  subtype="PCM_16", format="WAV")
+
+    def write(self, samples):
+        self._file.write(samples)
+        if self.realtime:
+            time.sleep(len(samples) / self.samplerate)
+
+    def close(self):
+        self._file.close()
+
+
+# ---------------------------
+# Engine
+# ---------------------------
+
+class PlaybackEngine:
+    def __init__(self, sink, samplerate, buffer_ms=2000, prebuffer_ms=150, block_ms=20, channels=CHANNELS):
+        self.sink = sink
+        self.samplerate = samplerate
+        self.channels = channels
+        self.frame_bytes = SAMPLE_BYTES * channels
+        self.capacity = self._bytes(buffer_ms)
+        self.prebuffer = min(self._bytes(prebuffer_ms), self.capacity)
+        self.block = max(self._bytes(block_ms), self.frame_bytes)
+
+        self._buffer = bytearray()
+        self._cond = threading.Condition()
+        self._draining = False
+        self._closed = False
+        self._thread = None
+        self._loop = None
+        self._space = None          # asyncio.Event: room was made in the buffer
+        self._drained = None        # asyncio.Event: everything written has been played
+        self.error = None
+
+        self.underruns = 0
+        self.backpressure_waits = 0
+        self.frames_played = 0
+        self._depth_sum = 0
+        self._depth_samples = 0
+        self._depth_max = 0
+
+    def _bytes(self, ms):
+        frames = int(self.samplerate * ms / 1000)
+        return frames * self.frame_bytes
+
+    def _ms(self, n_bytes):
+        return n_bytes / self.frame_bytes / self.samplerate * 1000
+
+    @property
+    def depth_ms(self):
+        """Audio currently buffered, in milliseconds."""
+        return self._ms(len(self._buffer))
+
+    # ---------------------------
+    # Lifecycle
+    # ---------------------------
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._space = asyncio.Event()
+        self._drained = asyncio.Event()
+        self._thread = threading.Thread(target=self._run, name="audio-playback", daemon=True)
+        self._thread.start()
+
+    async def close(self):
+        """Play what is left, stop the audio thread and close the sink."""
+        if self._thread is None:
+            return
+        try:
+            await self.drain()
+        finally:
+            with self._cond:
+                self._buffer.clear()        # only left over when the drain was cancelled
+                self._closed = True
+                self._cond.notify()
+            await asyncio.to_thread(self._thread.join)
+            self._thread = None
+
+    async def __aenter__(self):
+        self.start()
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    # ---------------------------
+    # Event loop side
+    # ---------------------------
+
+    async def write(self, pcm):
+        """Queue PCM for playback; waits while the jitter buffer is full."""
+        self.start()
+        view = memoryview(pcm)
+        view = view[:len(view) - len(view) % self.frame_bytes]
+        while view:
+            self._raise_error()
+            with self._cond:
+                free = self.capacity - len(self._buffer)
+                n = min(free - free % self.frame_bytes, len(view))
+                if n > 0:
+                    self._buffer += view[:n]
+                    self._draining = False
+                    self._cond.notify()
+                else:
+                    self._space.clear()
+            if n > 0:
+                view = view[n:]
+            else:
+                self.backpressure_waits += 1
+                await self._space.wait()
+
+    async def drain(self):
+        """Wait until everything written so far has been played."""
+        if self._thread is None:
+            return
+        self._raise_error()
+        with self._cond:
+            self._drained.clear()
+            self._draining = True
+            self._cond.notify()
+        await self._drained.wait()
+        self._raise_error()
+
+    def _raise_error(self):
+        if self.error is not None:
+            raise RuntimeError("audio playback failed") from self.error
+
+    def _signal(self, event):
+        self._loop.call_soon_threadsafe(event.set)
+
+    # ---------------------------
+    # Audio thread
+    # ---------------------------
+
+    def _next_block(self, playing):
+        """Wait for the next block to play (None once closed)."""
+        with self._cond:
+            while True:
+                depth = len(self._buffer)
+                if depth and (playing or depth >= self.prebuffer or self._draining):
+                    break
+                if playing:
+                    # ran dry: an underrun, unless it is the end of the reply
+                    playing = False
+                    if not self._draining:
+                        self.underruns += 1
+                if self._draining and not depth:
+                    self._draining = False
+                    self._signal(self._drained)
+                elif self._closed:
+                    return None
+                self._cond.wait()
+            n = min(depth, self.block)
+            block = bytes(self._buffer[:n])
+            del self._buffer[:n]
+            self._depth_sum += depth
+            self._depth_samples += 1
+            self._depth_max = max(self._depth_max, depth)
+        self._signal(self._space)
+        return block
+
+    def _run(self):
+        playing = False
+        try:
+            while True:
+                block = self._next_block(playing)
+                if block is None:
+                    break
+                playing = True
+                self._play(block)
+        except Exception as e:
+            self.error = e
+            with self._cond:
+                self._buffer.clear()
+            self._signal(self._space)
+            self._signal(self._drained)
+        finally:
+            self.sink.close()
+
+    def _play(self, block):
+        samples = np.frombuffer(block, dtype=np.int16)
+        if self.channels > 1:
+            samples = samples.reshape(-1, self.channels)
+        self.sink.write(samples)
+        self.frames_played += len(block) // self.frame_bytes
+
+    # ---------------------------
+    # Metrics
+    # ---------------------------
+
+    def stats(self):
+        return {
+            "underruns": self.underruns,
+            "backpressure_waits": self.backpressure_waits,
+            "played_seconds": self.frames_played / self.samplerate,
+            "buffer_mean_ms": self._ms(self._depth_sum / self._depth_samples) if self._depth_samples else 0.0,
+            "buffer_max_ms": self._ms(self._depth_max),
+            "buffer_capacity_ms": self._ms(self.capacity),
+        }
@@ -1,41 +1,58 @@
-def build_system_prompt(alerted_tx, recent_txs, greeting_mode=False):
-    # === Greeting mode: no transaction details ===
-    if greeting_mode:
-        customer_name = f"{alerted_tx.customer_first_name} {alerted_tx.customer_last_name}" if alerted_tx else "the cardholder"
-        return f"""
+# prompt_builder.py
+"""
+System prompts for the call flow.
+
+Each prompt is a PromptTemplate. Its static instruction block is built once
+at import. All per-customer data (name, transaction, recent transactions)
+goes in a trailing "Call data" section, so every call sends a byte-identical
+prefix and provider-side prompt caching can reuse it. Rendering only
+formats the call data and appends it to the precompiled prefix, so prompts
+are built fresh on every call and never keyed on row ids (the demos reseed
+fraud_ai.db in the same process, reusing ids for another customer).
+"""
+
+DATA_HEADER = "## Call data\n"
+
+
+class PromptTemplate:
+    """Static instructions followed by a `- Label: value` data section."""
+
+    def __init__(self, name, instructions, fields):
+        self.name = name
+        self.fields = fields                                   # [(label, key), ...]
+        self.prefix = instructions.strip() + "\n\n" + DATA_HEADER
+
+    def render(self, **values):
+        lines = []
+        for label, key in self.fields:
+            value = str(values[key])
+            sep = "" if value.startswith("\n") else " "      # lists go below their label
+            lines.append(f"- {label}:{sep}{value}")
+        return self.prefix + "\n".join(lines) + "\n"
+
+
+# ---------------------------
+# Templates
+# ---------------------------
+
+GREETING_TEMPLATE = PromptTemplate("greeting", """
 You are Agata, an AI fraud analyst for SAS BANK.
 
 - Always introduce yourself as Agata, the bank's fraud analyst AI.
-- Politely greet the customer by their full name: {customer_name}.
+- Politely greet the customer by their full name (Customer name, in the call data below).
 - Politely ask if you are speaking with them.
 - Do not mention any transaction details yet.
 - Detect the customer's language from their response and immediately switch to it for the rest of the conversation (if the answer is short and doesn't permit language detection keep using english).
 - Stay strictly in your role as a fraud analyst AI and do not answer unrelated questions.
 - When providing lists of steps or advice, speak naturally using phrases like "First…", "Then…" and "Finally…" — do not use numbered lists or bullet points.
-"""
-
-    # === Transaction verification stage ===
-    alerted_tx_str = (
-        f"a transaction of amount ${alerted_tx.amount:.2f} at merchant '{alerted_tx.merchant_name}' "
-        f"on {alerted_tx.timestamp.strftime('%B %d, %Y %H:%M')}"
-    )
-    customer_name = f"{alerted_tx.customer_first_name} {alerted_tx.customer_last_name}"
-
-    recent_strs = [
-        f"- transaction of amount ${tx.amount:.2f} at merchant '{tx.merchant_name}' "
-        f"on {tx.timestamp.strftime('%Y-%m-%d %H:%M')}"
-        for tx in recent_txs if tx.id != alerted_tx.id
-    ]
-    recent_txs_str = "\n".join(recent_strs) if recent_strs else "No recent transactions."
+""", [("Customer name", "customer_name")])
 
-    return f"""
+VERIFICATION_TEMPLATE = PromptTemplate("verification", """
 You are Agata, an AI fraud analyst for SAS BANK.
 
 - Always detect the customer's language from their input and switch to that language automatically without waiting for a request. (if the answer is short and doesn't permit language detection keep using english).
 - Present yourself only when needed.
-- Customer Name: {customer_name}
-- The transaction to verify is: {alerted_tx_str}
-- Recent transactions before this one: {recent_txs_str}
+- The customer's name, the transaction to verify and the recent transactions before it are in the call data below.
 
 - If the customer confirms the transaction was legit, apologise for the inconvenience, explain it was declined for security reasons, and advise retrying shortly.
 - If the customer denies the transaction, ask about recent suspicious emails, SMS, or calls from people pretending to be bank staff.
@@ -45,4 +62,44 @@ You are Agata, an AI fraud analyst for SAS BANK.
 - If card data are compromised or card has been stolen inform that the card will be blocked
 - if the password of the account has been compromised inform that the password will be reset
 Stay strictly in your role as a fraud analyst AI and do not answer unrelated questions.
-"""
\ No newline at end of file
+""", [
+    ("Customer name", "customer_name"),
+    ("Transaction to verify", "alerted_tx"),
+    ("Recent transactions before this one", "recent_txs"),
+])
+
+
+# ---------------------------
+# Rendering
+# ---------------------------
+
+def _customer_name(alerted_tx):
+    return f"{alerted_tx.customer_first_name} {alerted_tx.customer_last_name}"
+
+
+def _call_data(alerted_tx, recent_txs, greeting_mode):
+    """(template, field values) of the prompt."""
+    if greeting_mode:
+        customer_name = _customer_name(alerted_tx) if alerted_tx else "the cardholder"
+        return GREETING_TEMPLATE, {"customer_name": customer_name}
+
+    alerted_tx_str = (
+        f"a transaction of amount ${alerted_tx.amount:.2f} at merchant '{alerted_tx.merchant_name}' "
+        f"on {alerted_tx.timestamp.strftime('%B %d, %Y %H:%M')}"
+    )
+    recent_strs = [
+        f"  - transaction of amount ${tx.amount:.2f} at merchant '{tx.merchant_name}' "
+        f"on {tx.timestamp.strftime('%Y-%m-%d %H:%M')}"
+        for tx in recent_txs if tx.id != alerted_tx.id
+    ]
+    recent_txs_str = ("\n" + "\n".join(recent_strs)) if recent_strs else "No recent transactions."
+    return VERIFICATION_TEMPLATE, {
+        "customer_name": _customer_name(alerted_tx),
+        "alerted_tx": alerted_tx_str,
+        "recent_txs": recent_txs_str,
+    }
+
+
+def build_system_prompt(alerted_tx, recent_txs, greeting_mode=False):
+    template, values = _call_data(alerted_tx, recent_txs, greeting_mode)
+    return template.render(**values)
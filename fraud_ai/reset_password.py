@@ -1,7 +1,10 @@
 from sqlalchemy.orm import Session
+from fraud_ai.data import with_session
 from fraud_ai.models import PasswordReset
+from fraud_ai import card_status
 from datetime import datetime
 
+@with_session
 def add_password_reset(db: Session, card_number: str, reason: str = "compromised credentials"):
     reset = PasswordReset(
         card_number=card_number,
@@ -10,16 +13,20 @@ def add_password_reset(db: Session, card_number: str, reason: str = "compromised
     )
     db.add(reset)
     db.commit()
+    card_status.invalidate(card_number)
     db.refresh(reset)
     return reset
 
+@with_session
 def has_password_reset(db: Session, card_number: str):
     return db.query(PasswordReset).filter(
         PasswordReset.card_number == card_number
     ).order_by(PasswordReset.timestamp.desc()).first()
 
+@with_session
 def remove_password_reset(db: Session, card_number: str):
     reset = has_password_reset(db, card_number)
     if reset:
         db.delete(reset)
         db.commit()
+        card_status.invalidate(card_number)
@@ -0,0 +1,133 @@
+# sentence_splitter.py
+"""
+Incremental sentence boundary detection for streaming TTS.
+
+Re-running nltk's sent_tokenize over the whole buffer on every token is
+quadratic in the reply length. SentenceSplitter only looks at the characters
+that arrived since the last call. It emits a sentence as soon as its end is
+certain, so the TTS queue can start on it while the LLM keeps generating.
+
+A boundary is a '.', '!', '?' or '…' (plus any closing quotes or brackets)
+followed by whitespace, or a newline. For '.' there are extra checks:
+- the word before it must not be a known abbreviation ("Mr.", "e.g.", "Sig.")
+  or a single capital initial ("J.");
+- the next word must not start in lowercase.
+Decimal amounts such as "$150.00" never split, because the '.' is followed by
+a digit and not by whitespace.
+"""
+
+TERMINATORS = ".!?…"
+CLOSERS = "\"')]}»”’"
+
+DEFAULT_ABBREVIATIONS = frozenset({
+    # English
+    "mr", "mrs", "ms", "dr", "st", "jr", "sr", "vs", "etc", "e.g", "i.e",
+    "approx", "inc", "ltd", "co", "corp", "dept", "est", "u.s", "a.m", "p.m",
+    # Italian
+    "sig", "sig.ra", "sigg", "dott", "dott.ssa", "prof", "ing", "avv", "ecc",
+    "pag", "tel", "c.a", "n",
+    # Spanish / French / German
+    "sra", "srta", "mme", "mlle", "bzw", "z.b", "usw",
+})
+
+
+class SentenceSplitter:
+    def __init__(self, abbreviations=DEFAULT_ABBREVIATIONS):
+        self.abbreviations = abbreviations
+        self._buffer = ""
+        self._scan = 0      # index in _buffer up to which boundaries were ruled out
+
+    def feed(self, text):
+        """Add streamed text and return the sentences completed by it."""
+        if not text:
+            return []
+        self._buffer += text
+        sentences = []
+        buf = self._buffer
+        start = 0
+        i = self._scan
+        n = len(buf)
+
+        while i < n:
+            c = buf[i]
+            if c == "\n":
+                sentence = buf[start:i].strip()
+                if sentence:
+                    sentences.append(sentence)
+                start = i + 1
+                i += 1
+                continue
+
+            if c not in TERMINATORS:
+                i += 1
+                continue
+
+            # swallow runs of terminators ("?!", "...") and closing quotes/brackets
+            end = i + 1
+            while end < n and (buf[end] in TERMINATORS or buf[end] in CLOSERS):
+                end += 1
+            if end >= n:
+                break  # need the next character to decide
+
+            if not buf[end].isspace():
+                i = end
+                continue
+
+            if "." in buf[i:end]:
+                decision = self._period_is_boundary(buf, start, i, end)
+                if decision is None:
+                    break  # need the next word to decide
+                if not decision:
+                    i = end
+                    continue
+
+            sentence = buf[start:end].strip()
+            if sentence:
+                sentences.append(sentence)
+            start = end
+            i = end
+
+        self._buffer = buf[start:]
+        self._scan = max(i - start, 0)
+        return sentences
+
+    def flush(self):
+        """Return whatever is left at the end of the stream (or None)."""
+        rest = self._buffer.strip()
+        self._buffer = ""
+        self._scan = 0
+        return rest or None
+
+    # ---------------------------
+    # Helpers
+    # ---------------------------
+
+    def _period_is_boundary(self, buf, start, dot, end):
+        """True / False, or None while the next word has not arrived yet."""
+        # word right before the terminator
+        w = dot
+        while w > start and not buf[w - 1].isspace():
+            w -= 1
+        word = buf[w:dot].lstrip("\"'([{«“‘").lower()
+        if word in self.abbreviations:
+            return False
+        if len(word) == 1 and word.isalpha() and buf[dot - 1].isupper():
+            return False  # initial, e.g. "J. Doe"
+
+        # first visible character of the next word
+        j = end
+        while j < len(buf) and buf[j].isspace():
+            j += 1
+        if j >= len(buf):
+            return None
+        return not buf[j].islower()
+
+
+def split_stream(chunks, abbreviations=DEFAULT_ABBREVIATIONS):
+    """Convenience generator: sentences from an iterable of text chunks."""
+    splitter = SentenceSplitter(abbreviations)
+    for chunk in chunks:
+        yield from splitter.feed(chunk)
+    rest = splitter.flush()
+    if rest:
+        yield rest
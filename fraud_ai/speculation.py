@@ -0,0 +1,116 @@
+# speculation.py
+"""
+Speculative next-turn generation.
+
+While the customer is answering, the reply for each likely label of the
+current step is generated in the background (e.g. FRAUD and NOT FRAUD after
+the transaction question). When the real label arrives, the matching reply
+is committed and spoken straight away, without another LLM round trip. The
+other branches are cancelled.
+
+The real answer is not known yet, so each branch is generated on the
+history plus a stand-in customer turn (`hypothesis`) saying what the label
+means. Only use branch prompts that do not depend on the exact words.
+
+Spend is capped per call: at most `max_requests` speculative generations,
+each limited to `max_tokens` completion tokens. Branches beyond the cap are
+not started, and commit() then returns None, so the caller generates the
+reply normally.
+
+    speculator = Speculator(generate)
+    with use_speculator(speculator):
+        ...
+        speculator.start({"FRAUD": (prompt, hypothesis), ...}, history, system_prompt)
+        label = await classify(...)
+        text = await speculator.commit(label)     # None -> generate as usual
+"""
+import asyncio
+import logging
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+logger = logging.getLogger(__name__)
+
+_current_speculator = ContextVar("speculator", default=None)
+
+
+def current_speculator():
+    """The speculator active for the running call (or None)."""
+    return _current_speculator.get()
+
+
+@contextmanager
+def use_speculator(speculator):
+    token = _current_speculator.set(speculator)
+    try:
+        yield speculator
+    finally:
+        speculator.cancel_all()
+        _current_speculator.reset(token)
+
+
+class Speculator:
+    """
+    `generate(step_prompt, history, system_prompt, max_tokens)` is a coroutine
+    returning (text, completion_tokens); text is None when the reply is not
+    usable (e.g. cut off at max_tokens).
+    """
+
+    def __init__(self, generate, max_requests=4, max_tokens=200):
+        self.generate = generate
+        self.max_requests = max_requests
+        self.max_tokens = max_tokens
+        self._tasks = {}
+        self.stats = {"started": 0, "committed": 0, "cancelled": 0, "skipped": 0,
+                      "tokens": 0, "wasted_tokens": 0}
+
+    @property
+    def remaining(self):
+        return self.max_requests - self.stats["started"]
+
+    def start(self, branches, history, system_prompt):
+        """
+        branches: {label: (step_prompt, hypothesis)} for the next turn.
+        Labels already speculating (e.g. on a retry of the same step) are kept.
+        """
+        for label, (step_prompt, hypothesis) in branches.items():
+            if label in self._tasks:
+                continue
+            if self.remaining <= 0:
+                self.stats["skipped"] += 1
+                continue
+            self.stats["started"] += 1
+            branch_history = list(history) + [{"role": "user", "content": hypothesis}]
+            self._tasks[label] = asyncio.create_task(
+                self.generate(step_prompt, branch_history, system_prompt, self.max_tokens)
+            )
+
+    async def commit(self, label):
+        """Text pre-generated for `label` (None if there is none); every other branch is dropped."""
+        task = self._tasks.pop(label, None)
+        self.cancel_all()
+        if task is None:
+            return None
+        try:
+            text, tokens = await task
+        except Exception:
+            logger.exception("speculative generation for %s failed", label)
+            return None
+        self.stats["tokens"] += tokens
+        if not (text or "").strip():
+            self.stats["wasted_tokens"] += tokens
+            return None
+        self.stats["committed"] += 1
+        return text.strip()
+
+    def cancel_all(self):
+        for label, task in self._tasks.items():
+            if task.done() and not task.cancelled() and task.exception() is None:
+                # finished but not used: the tokens were spent for nothing
+                tokens = task.result()[1]
+                self.stats["tokens"] += tokens
+                self.stats["wasted_tokens"] += tokens
+            else:
+                task.cancel()
+            self.stats["cancelled"] += 1
+        self._tasks.clear()
@@ -0,0 +1,246 @@
+# streaming_stt.py
+"""
+Streaming speech-to-text.
+
+A provider consumes mono int16 audio chunks as they arrive (any async
+iterable) and yields TranscriptEvent partials while the customer is still
+talking, followed by exactly one final event:
+
+    provider = get_provider("openai", language="it")
+    async for event in provider.stream(chunks):
+        if event.is_final:
+            ...
+
+Providers:
+- "openai" / "elevenlabs": the batch transcription APIs driven
+  incrementally. Every `partial_interval` seconds of new speech the utterance
+  so far is re-transcribed in the background for a partial, and the VAD
+  endpointer decides when the turn is over and the final is produced.
+- "scripted": local stand-in that reveals a fixed transcript in step with
+  the audio it is fed. No network, deterministic, for tests and benchmarks.
+
+New backends (a native websocket API, a local model) register a factory
+with register_provider().
+
+A call uses streaming STT when full_fraud_flow gets a `transcript_stream`
+(a zero-argument callable returning the events of one customer turn). The
+flow makes it the call's current stream with use_transcript_stream, so
+every step reads the customer through it instead of the batch STT or the
+keyboard.
+"""
+import abc
+import asyncio
+import re
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import NamedTuple
+import numpy as np
+from fraud_ai.audio_buffer import PCMRingBuffer, encode_audio
+
+
+class TranscriptEvent(NamedTuple):
+    text: str
+    is_final: bool
+
+
+def normalize_transcript(text):
+    """Case/punctuation-insensitive form used to compare transcripts."""
+    return " ".join(re.sub(r"[^\w\s']", " ", text.lower()).split())
+
+
+class StablePartial:
+    """
+    Decides when a partial transcript can be acted on: the same text (after
+    normalize_transcript) has been seen `min_repeats` times in a row.
+    """
+
+    def __init__(self, min_repeats=2, min_words=1):
+        self.min_repeats = min_repeats
+        self.min_words = min_words
+        self._last = None
+        self._count = 0
+
+    def update(self, text):
+        """Returns the text once it is stable, else None."""
+        norm = normalize_transcript(text)
+        if len(norm.split()) < self.min_words:
+            self._last, self._count = None, 0
+            return None
+        if norm == self._last:
+            self._count += 1
+        else:
+            self._last, self._count = norm, 1
+        return text if self._count >= self.min_repeats else None
+
+
+async def iter_chunks(samples, samplerate=16000, chunk_ms=100, realtime=False):
+    """Split an int16 array into `chunk_ms` chunks; with realtime=True, pace them like a live mic."""
+    step = samplerate * chunk_ms // 1000
+    for i in range(0, len(samples), step):
+        yield samples[i:i + step]
+        await asyncio.sleep(chunk_ms / 1000 if realtime else 0)
+
+
+# ---------------------------
+# Providers
+# ---------------------------
+
+class StreamingSTTProvider(abc.ABC):
+    samplerate = 16000
+
+    @abc.abstractmethod
+    def stream(self, chunks):
+        """Async generator: partial TranscriptEvents, then one final event."""
+
+
+class ScriptedSTTProvider(StreamingSTTProvider):
+    """
+    Stand-in provider: `transcript` is revealed at `words_per_second` of
+    audio received, one partial per `partial_interval` seconds, and
+    returned whole as the final when the stream ends.
+    """
+
+    def __init__(self, transcript, samplerate=16000, words_per_second=2.5,
+                 partial_interval=0.3):
+        self.words = transcript.split()
+        self.samplerate = samplerate
+        self.words_per_second = words_per_second
+        self.partial_interval = partial_interval
+
+    async def stream(self, chunks):
+        received = 0
+        last_partial_at = 0
+        async for chunk in chunks:
+            received += len(chunk)
+            if received - last_partial_at < self.partial_interval * self.samplerate:
+                continue
+            last_partial_at = received
+            n = int(received / self.samplerate * self.words_per_second)
+            if n:
+                yield TranscriptEvent(" ".join(self.words[:n]), False)
+        yield TranscriptEvent(" ".join(self.words), True)
+
+
+class ChunkedBatchSTTProvider(StreamingSTTProvider):
+    """
+    Streaming on top of a batch transcription function
+    (`transcribe(file_like) -> str`, blocking; run in a worker thread).
+
+    Only one partial request is in flight at a time; if the API is slower
+    than `partial_interval` the intermediate partials are simply skipped.
+    """
+
+    def __init__(self, transcribe, samplerate=16000, partial_interval=1.0,
+                 endpointer=None, max_utterance_s=20):
+        self.transcribe = transcribe
+        self.samplerate = samplerate
+        self.partial_interval = partial_interval
+        self.endpointer = endpointer
+        self.max_utterance_s = max_utterance_s
+
+    async def _run(self, samples):
+        return await asyncio.to_thread(self.transcribe, encode_audio(samples, self.samplerate))
+
+    async def stream(self, chunks):
+        audio = PCMRingBuffer(self.samplerate, self.max_utterance_s)
+        pending = None                      # partial request in flight
+        last_partial_at = 0
+        final_samples = None
+
+        try:
+            async for chunk in chunks:
+                chunk = np.asarray(chunk, dtype=np.int16).reshape(-1)
+                audio.append(chunk)
+
+                if self.endpointer is not None:
+                    done = self.endpointer.feed(chunk)
+                    if done:
+                        final_samples = done[0]
+                        break
+                    if not self.endpointer.speech_started:
+                        continue
+
+                if pending is not None and pending.done():
+                    text = pending.result().strip()
+                    pending = None
+                    if text:
+                        yield TranscriptEvent(text, False)
+                if pending is None and len(audio) - last_partial_at >= self.partial_interval * self.samplerate:
+                    last_partial_at = len(audio)
+                    pending = asyncio.create_task(self._run(audio.samples()))
+        finally:
+            if pending is not None and not pending.done():
+                pending.cancel()
+
+        if final_samples is None:
+            if self.endpointer is not None:
+                final_samples = self.endpointer.flush()
+            else:
+                final_samples = audio.samples()
+        if final_samples is None or not len(final_samples):
+            yield TranscriptEvent("", True)
+            return
+        yield TranscriptEvent((await self._run(final_samples)).strip(), True)
+
+
+# ---------------------------
+# Registry
+# ---------------------------
+
+_PROVIDERS = {}
+
+
+def register_provider(name, factory):
+    """`factory(**kwargs)` must return a StreamingSTTProvider."""
+    _PROVIDERS[name.lower()] = factory
+
+
+def get_provider(name, **kwargs):
+    try:
+        factory = _PROVIDERS[name.lower()]
+    except KeyError:
+        raise ValueError(f"Unknown streaming STT provider {name!r}; available: {sorted(_PROVIDERS)}") from None
+    return factory(**kwargs)
+
+
+def _batch_provider(stt_provider):
+    def factory(language=None, samplerate=16000, vad=True, hangover_ms=700,
+                vad_aggressiveness=2, **kwargs):
+        # imported lazily: STT pulls in streamlit/webrtc and the API clients
+        from fraud_ai.STT import transcribe_audio
+        endpointer = None
+        if vad:
+            from fraud_ai.vad import VADEndpointer
+            endpointer = VADEndpointer(samplerate, aggressiveness=vad_aggressiveness,
+                                       hangover_ms=hangover_ms)
+        return ChunkedBatchSTTProvider(
+            lambda f: transcribe_audio(f, stt_provider, language),
+            samplerate=samplerate, endpointer=endpointer, **kwargs
+        )
+    return factory
+
+
+register_provider("scripted", ScriptedSTTProvider)
+register_provider("openai", _batch_provider("openai"))
+register_provider("elevenlabs", _batch_provider("elevenlabs"))
+
+
+# ---------------------------
+# Per-call transcript stream
+# ---------------------------
+
+_current_transcript_stream = ContextVar("transcript_stream", default=None)
+
+
+def current_transcript_stream():
+    """The transcript_stream of the running call (or None: batch STT / keyboard)."""
+    return _current_transcript_stream.get()
+
+
+@contextmanager
+def use_transcript_stream(transcript_stream):
+    token = _current_transcript_stream.set(transcript_stream)
+    try:
+        yield transcript_stream
+    finally:
+        _current_transcript_stream.reset(token)
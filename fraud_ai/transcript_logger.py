@@ -0,0 +1,142 @@
+# transcript_logger.py
+"""
+Write-behind logger for call transcripts.
+
+conversation.add_message normally commits one AlertConversation row per
+utterance, right in the middle of the turn. While a TranscriptLogger is
+active (see use_transcript_logger) add_message only queues the row in
+memory; a background thread writes the queue in batches every
+`flush_interval` seconds or as soon as `max_batch` rows are waiting.
+close() always writes whatever is left, so nothing is lost at call end.
+
+Timestamps are taken when the message is queued and rows are inserted in
+queue order, so get_conversation returns the same ordering as before.
+"""
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime
+from sqlalchemy import insert
+from .models import AlertConversation
+from .data import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+_current_logger = ContextVar("transcript_logger", default=None)
+
+
+def current_transcript_logger():
+    """The logger active for the running call (or None)."""
+    return _current_logger.get()
+
+
+@contextmanager
+def use_transcript_logger(transcript):
+    token = _current_logger.set(transcript)
+    try:
+        yield transcript
+    finally:
+        _current_logger.reset(token)
+
+
+class TranscriptLogger:
+    def __init__(self, session_factory=SessionLocal, flush_interval=0.5, max_batch=50):
+        self._session_factory = session_factory
+        self.flush_interval = flush_interval
+        self.max_batch = max_batch
+        self._pending = []
+        self._queued = 0       # rows ever queued
+        self._written = 0      # rows written (or given up on)
+        self._flush_requested = False
+        self._closed = False
+        self._cond = threading.Condition()
+        self._thread = threading.Thread(target=self._run, name="transcript-logger", daemon=True)
+        self._thread.start()
+
+    # ---------------------------
+    # Public API
+    # ---------------------------
+
+    def add_message(self, alert_id: int, role: str, content: str):
+        """Queue a message; returns the row dict that will be inserted."""
+        row = {
+            "alert_id": alert_id,
+            "role": role,
+            "content": content,
+            "timestamp": datetime.utcnow(),
+        }
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("TranscriptLogger is closed")
+            self._pending.append(row)
+            self._queued += 1
+            if len(self._pending) >= self.max_batch:
+                self._cond.notify_all()
+        return row
+
+    def flush(self, timeout=None):
+        """Block until every message queued so far is written. Returns False on timeout."""
+        with self._cond:
+            target = self._queued
+            self._flush_requested = True
+            self._cond.notify_all()
+            return self._cond.wait_for(lambda: self._written >= target, timeout=timeout)
+
+    def close(self, timeout=None):
+        """Write the remaining messages and stop the background thread."""
+        with self._cond:
+            if self._closed:
+                return
+            self._closed = True
+            self._cond.notify_all()
+        self._thread.join(timeout)
+
+    @property
+    def pending(self):
+        with self._cond:
+            return len(self._pending)
+
+    # ---------------------------
+    # Background writer
+    # ---------------------------
+
+    def _run(self):
+        while True:
+            with self._cond:
+                self._cond.wait_for(
+                    lambda: self._closed or self._flush_requested or len(self._pending) >= self.max_batch,
+                    timeout=self.flush_interval,
+                )
+                batch, self._pending = self._pending, []
+                self._flush_requested = False
+                closing = self._closed
+
+            if batch and not self._write(batch):
+                if not closing:
+                    # keep ordering: failed rows go back in front of newer ones
+                    with self._cond:
+                        self._pending[:0] = batch
+                    time.sleep(self.flush_interval)
+                    continue
+                logger.error("Dropping %d transcript message(s) after a failed final write", len(batch))
+
+            with self._cond:
+                self._written += len(batch)
+                self._cond.notify_all()
+                if closing and not self._pending:
+                    return
+
+    def _write(self, batch):
+        db = self._session_factory()
+        try:
+            db.execute(insert(AlertConversation), batch)
+            db.commit()
+            return True
+        except Exception:
+            logger.exception("Failed to write %d transcript message(s)", len(batch))
+            db.rollback()
+            return False
+        finally:
+            db.close()
@@ -0,0 +1,321 @@
+# tts_cache.py
+"""
+Content-addressed cache of synthesized speech.
+
+Many of Agata's sentences come back on every call: the opening of the
+greeting, the farewells, the retry prompts, the scam-safety reminder.
+TTSAudioCache keys audio by sha256(provider, voice, model, text), with the
+text whitespace-normalized. A hit is replayed from memory or local disk
+with no network round trip. A miss is streamed from the provider as usual,
+and the audio is stored once the stream completes.
+
+Two tiers:
+- an in-memory LRU, bounded in bytes, for any sentence up to
+  `max_text_chars`;
+- raw PCM files under `directory` (<key[:2]>/<key>.pcm), written atomically
+  so several worker processes can share them. Disk hits are promoted into
+  memory. Only the allow-list goes to disk: the sentences of `persist`
+  (FIXED_PHRASES by default) and of any prewarm() call. Every other
+  sentence is LLM output that can carry customer names, amounts and
+  merchants, so it is kept in memory only and is gone when the process
+  exits. This also keeps the directory bounded.
+
+The TTS workers cache per sentence, since that is the unit they synthesize.
+prewarm() therefore splits each phrase with SentenceSplitter, so the cache
+holds exactly what the workers will ask for.
+
+    cache = get_tts_cache()
+    async for pcm in cache.stream(openai_stream_tts, "openai", "shimmer", "gpt-4o-mini-tts/pcm_24000", text):
+        ...
+"""
+import asyncio
+import hashlib
+import logging
+import os
+import re
+import tempfile
+import threading
+from collections import OrderedDict
+from fraud_ai.sentence_splitter import SentenceSplitter
+
+logger = logging.getLogger(__name__)
+
+# Sentences Agata says on (nearly) every call, pre-synthesized at startup
+FIXED_PHRASES = (
+    "Hello, I'm Agata, the AI Fraud Analyst from SAS Bank.",
+    "I'm sorry, but I must speak directly with the cardholder. "
+    "I will call back later when they are available. Goodbye.",
+    "It seems we cannot confirm your identity at this time. "
+    "Please have the cardholder contact us or we will try again later. Goodbye.",
+    "Sorry, I didn't catch that. Could you please repeat?",
+    "Please remember: never share your PIN, passwords or full card number with anyone, "
+    "and don't trust messages or calls asking for them.",
+    "You will receive a notification in the bank app about the actions taken.",
+    "Thank you for your time. Goodbye.",
+)
+
+# longer sentences are almost always one-off LLM output: not worth storing
+MAX_TEXT_CHARS = 300
+
+
+def normalize_text(text):
+    return re.sub(r"\s+", " ", text).strip()
+
+
+def make_key(provider, voice, model, text):
+    raw = "\x1f".join((provider, str(voice), str(model), normalize_text(text)))
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def split_sentences(phrases):
+    """Sentences of `phrases`, as the TTS workers will receive them."""
+    sentences = []
+    for phrase in phrases:
+        splitter = SentenceSplitter()
+        sentences += splitter.feed(phrase)
+        rest = splitter.flush()
+        if rest:
+            sentences.append(rest)
+    return list(dict.fromkeys(sentences))
+
+
+class TTSAudioCache:
+    def __init__(self, directory=None, memory_bytes=64 * 1024 * 1024, max_text_chars=MAX_TEXT_CHARS,
+                 persist=FIXED_PHRASES):
+        self.directory = directory
+        self.memory_bytes = memory_bytes
+        self.max_text_chars = max_text_chars
+        self._persistent = set()                # normalized sentences allowed on disk
+        self._memory = OrderedDict()            # key -> pcm bytes, LRU order
+        self._memory_size = 0
+        self._lock = threading.Lock()
+        self.allow_persist(persist)
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def cacheable(self, text):
+        text = normalize_text(text)
+        return bool(text) and len(text) <= self.max_text_chars
+
+    def allow_persist(self, phrases):
+        """Add the sentences of `phrases` to the disk allow-list."""
+        with self._lock:
+            self._persistent.update(normalize_text(s) for s in split_sentences(phrases))
+
+    def persistent(self, text):
+        return bool(self.directory) and normalize_text(text) in self._persistent
+
+    # ---------------------------
+    # Memory tier
+    # ---------------------------
+
+    def _memory_get(self, key):
+        with self._lock:
+            pcm = self._memory.get(key)
+            if pcm is not None:
+                self._memory.move_to_end(key)
+            return pcm
+
+    def _memory_set(self, key, pcm):
+        if len(pcm) > self.memory_bytes:
+            return
+        with self._lock:
+            old = self._memory.pop(key, None)
+            if old is not None:
+                self._memory_size -= len(old)
+            self._memory[key] = pcm
+            self._memory_size += len(pcm)
+            while self._memory_size > self.memory_bytes:
+                _, evicted = self._memory.popitem(last=False)
+                self._memory_size -= len(evicted)
+
+    # ---------------------------
+    # Disk tier
+    # ---------------------------
+
+    def _path(self, key):
+        return os.path.join(self.directory, key[:2], key + ".pcm")
+
+    def _disk_get(self, key):
+        try:
+            with open(self._path(key), "rb") as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def _disk_set(self, key, pcm):
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(pcm)
+            os.replace(tmp_path, path)         # readers never see a partial file
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    def prune(self, max_bytes):
+        """Delete the least recently used files until the disk tier fits `max_bytes`; returns how many."""
+        if not self.directory:
+            return 0
+        files = []
+        for root, _, names in os.walk(self.directory):
+            for name in names:
+                if name.endswith(".pcm"):
+                    path = os.path.join(root, name)
+                    st = os.stat(path)
+                    files.append((st.st_atime, st.st_size, path))
+        total = sum(size for _, size, _ in files)
+        removed = 0
+        for _, size, path in sorted(files):
+            if total <= max_bytes:
+                break
+            os.unlink(path)
+            total -= size
+            removed += 1
+        return removed
+
+    # ---------------------------
+    # Public API
+    # ---------------------------
+
+    def _lookup(self, key, persistent=True):
+        """(pcm, from_disk) without touching the counters."""
+        pcm = self._memory_get(key)
+        if pcm is None and persistent and self.directory:
+            pcm = self._disk_get(key)
+            if pcm is not None:
+                self._memory_set(key, pcm)
+                return pcm, True
+        return pcm, False
+
+    def get(self, key, persistent=True):
+        pcm, from_disk = self._lookup(key, persistent)
+        if pcm is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.disk_hits += from_disk
+        return pcm
+
+    def put(self, key, pcm, persistent=True):
+        """Store `pcm`; on disk too only when `persistent` (see persistent())."""
+        if not pcm:
+            return
+        self._memory_set(key, pcm)
+        if persistent and self.directory:
+            self._disk_set(key, pcm)
+
+    async def stream(self, synthesize, provider, voice, model, text, chunk_bytes=4096):
+        """
+        PCM for `text`: replayed from the cache on a hit, else streamed from
+        `synthesize(text)` and stored once the stream has completed.
+        """
+        if not self.cacheable(text):
+            async for pcm in synthesize(text):
+                yield pcm
+            return
+
+        key = make_key(provider, voice, model, text)
+        persistent = self.persistent(text)
+        pcm = self._memory_get(key)
+        if pcm is not None:
+            self.hits += 1
+        elif persistent:
+            pcm = await asyncio.to_thread(self.get, key)
+        else:
+            self.misses += 1
+        if pcm is not None:
+            for start in range(0, len(pcm), chunk_bytes):
+                yield pcm[start:start + chunk_bytes]
+            return
+
+        chunks = []
+        async for pcm in synthesize(text):
+            chunks.append(pcm)
+            yield pcm
+        # only reached when the stream was not interrupted: never store partial audio
+        try:
+            if persistent:
+                await asyncio.to_thread(self.put, key, b"".join(chunks))
+            else:
+                self.put(key, b"".join(chunks), persistent=False)
+        except OSError:
+            logger.exception("could not store TTS audio for %r", text)
+
+    async def prewarm(self, synthesize, provider, voice, model, phrases=FIXED_PHRASES, concurrency=2):
+        """
+        Synthesize the sentences of `phrases` that are not cached yet; returns
+        how many. The phrases join the disk allow-list.
+        """
+        self.allow_persist(phrases)
+        semaphore = asyncio.Semaphore(concurrency)
+        missing = [s for s in split_sentences(phrases)
+                   if self.cacheable(s) and self._lookup(make_key(provider, voice, model, s))[0] is None]
+
+        async def warm(sentence):
+            async with semaphore:
+                async for _ in self.stream(synthesize, provider, voice, model, sentence):
+                    pass
+
+        results = await asyncio.gather(*(warm(s) for s in missing), return_exceptions=True)
+        for sentence, result in zip(missing, results):
+            if isinstance(result, Exception):
+                logger.warning("TTS prewarm failed for %r: %s", sentence, result)
+        return sum(1 for result in results if not isinstance(result, Exception))
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+            self._memory_size = 0
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "entries": len(self._memory),
+            "memory_bytes": self._memory_size,
+        }
+
+
+async def prewarm_backend(tts_backend, phrases=FIXED_PHRASES):
+    """
+    Trim the disk tier to its budget, then pre-synthesize `phrases` for the
+    voice used by `tts_backend` ("openai" / "elevenlabs"); returns how many
+    sentences were synthesized.
+    """
+    from fraud_ai.config import TTS_CACHE_MAX_MB
+    if tts_backend == "openai":
+        from fraud_ai.voice import prewarm_tts_cache
+    elif tts_backend == "elevenlabs":
+        from fraud_ai.voice_2 import prewarm_tts_cache
+    else:
+        return 0
+    await asyncio.to_thread(get_tts_cache().prune, int(TTS_CACHE_MAX_MB * 1024 * 1024))
+    return await prewarm_tts_cache(phrases)
+
+
+_shared_cache = None
+
+
+def get_tts_cache():
+    """Process-wide cache, configured from fraud_ai.config on first use."""
+    global _shared_cache
+    if _shared_cache is None:
+        from fraud_ai.config import TTS_CACHE_DIR, TTS_CACHE_MEMORY_MB
+        _shared_cache = TTSAudioCache(directory=TTS_CACHE_DIR or None,
+                                      memory_bytes=int(TTS_CACHE_MEMORY_MB * 1024 * 1024))
+    return _shared_cache
+
+
+def set_tts_cache(cache):
+    """Swap the shared cache (e.g. a memory-only one in scripts). None resets it."""
+    global _shared_cache
+    _shared_cache = cache
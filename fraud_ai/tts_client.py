@@ -0,0 +1,164 @@
+# tts_client.py
+"""
+Long-lived, pooled HTTP client for ElevenLabs streaming TTS.
+
+Opening a new aiohttp.ClientSession per sentence pays DNS + TCP + TLS setup
+before every first audio byte. ElevenLabsTTSClient keeps one session with a
+keep-alive connection pool that is shared by every sentence of every call
+running on the same event loop.
+
+An aiohttp session belongs to the loop that created it, and the Streamlit
+demos run each call in its own thread with its own loop. The client
+therefore keeps one session per loop, behind a lock. close() closes the
+session of the running loop, so it has to be awaited before that loop ends.
+
+    client = get_tts_client()
+    async for pcm in client.stream("Hello"):
+        ...
+    await close_tts_client()   # on worker shutdown
+"""
+import asyncio
+import logging
+import threading
+import aiohttp
+from fraud_ai.config import ELEVEN_KEY
+
+ELEVENLABS_BASE_URL = "https://api.elevenlabs.io"
+DEFAULT_VOICE_ID = "21m00Tcm4TlvDq8ikWAM"
+DEFAULT_MODEL_ID = "eleven_turbo_v2_5"
+DEFAULT_OUTPUT_FORMAT = "pcm_22050"
+
+logger = logging.getLogger(__name__)
+
+
+class ElevenLabsTTSClient:
+    def __init__(self, api_key=ELEVEN_KEY, voice_id=DEFAULT_VOICE_ID, model_id=DEFAULT_MODEL_ID,
+                 base_url=ELEVENLABS_BASE_URL, output_format=DEFAULT_OUTPUT_FORMAT,
+                 limit=100, limit_per_host=20, keepalive_timeout=75, dns_ttl=300,
+                 chunk_size=4096, voice_settings=None):
+        self.api_key = api_key
+        self.voice_id = voice_id
+        self.model_id = model_id
+        self.base_url = base_url.rstrip("/")
+        self.output_format = output_format
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.keepalive_timeout = keepalive_timeout
+        self.dns_ttl = dns_ttl
+        self.chunk_size = chunk_size
+        self.voice_settings = voice_settings or {"stability": 0.35, "similarity_boost": 0.75}
+        self._sessions = {}         # event loop -> ClientSession
+        self._lock = threading.Lock()
+
+    # ---------------------------
+    # Session lifecycle
+    # ---------------------------
+
+    def _get_session(self):
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            self._forget_closed_loops()
+            session = self._sessions.get(loop)
+            if session is None or session.closed:
+                connector = aiohttp.TCPConnector(
+                    limit=self.limit,
+                    limit_per_host=self.limit_per_host,
+                    keepalive_timeout=self.keepalive_timeout,
+                    ttl_dns_cache=self.dns_ttl,
+                )
+                session = self._sessions[loop] = aiohttp.ClientSession(connector=connector)
+            return session
+
+    def _forget_closed_loops(self):
+        for loop in [l for l in self._sessions if l.is_closed()]:
+            # nothing can be awaited on a closed loop any more: only drop the reference
+            if not self._sessions.pop(loop).closed:
+                logger.warning("TTS client session was not closed before its event loop ended")
+
+    async def warm_up(self):
+        """Open the pool ahead of the first sentence (DNS + TCP + TLS)."""
+        session = self._get_session()
+        async with session.head(self.base_url):
+            pass
+
+    async def close(self):
+        """Close the session of the running loop (the other loops keep theirs)."""
+        with self._lock:
+            session = self._sessions.pop(asyncio.get_running_loop(), None)
+            self._forget_closed_loops()
+        if session is not None and not session.closed:
+            await session.close()
+
+    async def __aenter__(self):
+        self._get_session()
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    # ---------------------------
+    # Streaming
+    # ---------------------------
+
+    async def stream(self, text: str, voice_id=None):
+        """
+        Stream raw PCM (16-bit signed, mono) for `text` and yield chunks
+        aligned to full int16 frames.
+        """
+        url = f"{self.base_url}/v1/text-to-speech/{voice_id or self.voice_id}/stream"
+        payload = {
+            "text": text,
+            "model_id": self.model_id,
+            "voice_settings": self.voice_settings,
+        }
+        headers = {
+            "Accept": "audio/wav",
+            "xi-api-key": str(self.api_key),
+            "Content-Type": "application/json",
+        }
+
+        session = self._get_session()
+        async with session.post(url, params={"output_format": self.output_format},
+                                headers=headers, json=payload) as resp:
+            if resp.status != 200:
+                err_text = await resp.text()
+                raise RuntimeError(f"ElevenLabs TTS failed [{resp.status}]: {err_text}")
+
+            leftover = b""
+            async for net_chunk in resp.content.iter_chunked(self.chunk_size):
+                if not net_chunk:
+                    continue
+
+                data = leftover + net_chunk
+                # Align to full int16 frames (2 bytes each sample)
+                frame_count = len(data) // 2
+                full_bytes = data[:frame_count * 2]
+                leftover = data[frame_count * 2:]
+
+                if full_bytes:
+                    yield full_bytes
+            # a stray odd byte at the very end is dropped
+
+
+_shared_client = None
+_shared_client_lock = threading.Lock()
+
+
+def get_tts_client():
+    """Process-wide client shared by every sentence and every concurrent call."""
+    global _shared_client
+    with _shared_client_lock:
+        if _shared_client is None:
+            _shared_client = ElevenLabsTTSClient()
+        return _shared_client
+
+
+def set_tts_client(client):
+    """Swap the shared client (e.g. to point at a local stand-in server)."""
+    global _shared_client
+    _shared_client = client
+
+
+async def close_tts_client():
+    if _shared_client is not None:
+        await _shared_client.close()
@@ -0,0 +1,62 @@
+# tts_metrics.py
+"""
+Latency metrics for spoken replies.
+
+time_to_first_audio is measured from the moment the reply is requested
+(before the LLM call) to the first PCM chunk handed to the audio sink, i.e.
+what the customer actually waits for.
+"""
+import logging
+import time
+from collections import deque
+
+logger = logging.getLogger(__name__)
+
+# Last N replies, for dashboards / ad-hoc inspection
+recent_tts_metrics = deque(maxlen=200)
+
+
+class TTSMetrics:
+    def __init__(self, backend):
+        self.backend = backend
+        self.started_at = time.perf_counter()
+        self.first_audio_at = None
+        self.finished_at = None
+        self.sentences = 0
+        self.audio_bytes = 0
+        self.playback = None        # PlaybackEngine.stats() when played through one
+
+    def mark_audio(self, n_bytes):
+        if self.first_audio_at is None:
+            self.first_audio_at = time.perf_counter()
+        self.audio_bytes += n_bytes
+
+    def mark_sentence(self):
+        self.sentences += 1
+
+    def finish(self):
+        self.finished_at = time.perf_counter()
+        recent_tts_metrics.append(self)
+        if self.time_to_first_audio is not None:
+            logger.info("tts backend=%s time_to_first_audio=%.0fms sentences=%d",
+                        self.backend, self.time_to_first_audio * 1000, self.sentences)
+        if self.playback and self.playback["underruns"]:
+            logger.info("tts backend=%s playback underruns=%d buffer_mean=%.0fms",
+                        self.backend, self.playback["underruns"], self.playback["buffer_mean_ms"])
+        return self
+
+    @property
+    def time_to_first_audio(self):
+        if self.first_audio_at is None:
+            return None
+        return self.first_audio_at - self.started_at
+
+    def as_dict(self):
+        return {
+            "backend": self.backend,
+            "time_to_first_audio": self.time_to_first_audio,
+            "total_time": (self.finished_at - self.started_at) if self.finished_at else None,
+            "sentences": self.sentences,
+            "audio_bytes": self.audio_bytes,
+            "playback": self.playback,
+        }
@@ -0,0 +1,87 @@
+# tts_standin.py
+"""
+Local stand-in for the ElevenLabs streaming TTS endpoint.
+
+Serves POST /v1/text-to-speech/{voice_id}/stream with a 16-bit mono sine
+tone, streamed in small chunks. Latencies are configurable so
+time-to-first-audio can be measured offline:
+
+- `setup_delay`: extra delay on the first request of every new connection.
+  It stands in for the DNS + TCP + TLS cost that a pooled client avoids.
+- `first_byte_delay`: synthesis latency before the first chunk.
+- `chunk_interval`: pacing between chunks.
+
+    server = TTSStandInServer(setup_delay=0.15)
+    base_url = await server.start()
+    client = ElevenLabsTTSClient(base_url=base_url, api_key="test")
+    ...
+    await server.stop()
+"""
+import asyncio
+import numpy as np
+from aiohttp import web
+
+
+class TTSStandInServer:
+    def __init__(self, host="127.0.0.1", port=0, samplerate=22050,
+                 setup_delay=0.15, first_byte_delay=0.05, chunk_interval=0.01,
+                 chunk_ms=50, seconds_per_char=0.06):
+        self.host = host
+        self.port = port
+        self.samplerate = samplerate
+        self.setup_delay = setup_delay
+        self.first_byte_delay = first_byte_delay
+        self.chunk_interval = chunk_interval
+        self.chunk_ms = chunk_ms
+        self.seconds_per_char = seconds_per_char
+        self.requests = 0
+        self.connections = set()
+        self._runner = None
+
+    async def start(self):
+        app = web.Application()
+        app.router.add_post("/v1/text-to-speech/{voice_id}/stream", self._handle_stream)
+        app.router.add_route("HEAD", "/", self._handle_head)
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, self.host, self.port)
+        await site.start()
+        self.port = site._server.sockets[0].getsockname()[1]
+        return f"http://{self.host}:{self.port}"
+
+    async def stop(self):
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def _new_connection_delay(self, request):
+        peer = request.transport.get_extra_info("peername") if request.transport else None
+        if peer not in self.connections:
+            self.connections.add(peer)
+            await asyncio.sleep(self.setup_delay)
+
+    async def _handle_head(self, request):
+        await self._new_connection_delay(request)
+        return web.Response()
+
+    async def _handle_stream(self, request):
+        await self._new_connection_delay(request)
+        payload = await request.json()
+        self.requests += 1
+
+        pcm = self._tone(len(payload.get("text", "")))
+        chunk_bytes = int(self.samplerate * self.chunk_ms / 1000) * 2
+
+        resp = web.StreamResponse(headers={"Content-Type": "audio/pcm"})
+        await resp.prepare(request)
+        await asyncio.sleep(self.first_byte_delay)
+        for i in range(0, len(pcm), chunk_bytes):
+            await resp.write(pcm[i:i + chunk_bytes])
+            await asyncio.sleep(self.chunk_interval)
+        await resp.write_eof()
+        return resp
+
+    def _tone(self, n_chars):
+        seconds = max(0.2, n_chars * self.seconds_per_char)
+        t = np.arange(int(self.samplerate * seconds)) / self.samplerate
+        return (np.sin(2 * np.pi * 440 * t) * 8000).astype(np.int16).tobytes()
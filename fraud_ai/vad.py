@@ -0,0 +1,120 @@
+# vad.py
+"""
+Voice activity detection and end-of-utterance detection (endpointing) for
+live STT, built on webrtcvad.
+
+Feed mono int16 samples as they arrive. VADEndpointer cuts them into 10/20/30 ms
+frames and classifies each one as voiced or not:
+- speech starts after `start_ms` of consecutive voiced audio. Up to
+  `pre_roll_ms` of audio before that point is kept, so the first syllable is
+  not clipped;
+- the utterance ends after `hangover_ms` of silence. The trailing silence is
+  trimmed, apart from `tail_ms`;
+- an utterance longer than `max_utterance_s` is cut there.
+
+Only the voiced segment is returned, so silence is never uploaded. The caller
+knows the customer has stopped talking `hangover_ms` after the last word,
+instead of waiting on a fixed timeout.
+"""
+from collections import deque
+import numpy as np
+import webrtcvad
+from fraud_ai.audio_buffer import PCMRingBuffer
+
+SUPPORTED_RATES = (8000, 16000, 32000, 48000)
+
+
+class VADEndpointer:
+    def __init__(self, samplerate=16000, aggressiveness=2, frame_ms=30,
+                 start_ms=120, hangover_ms=700, pre_roll_ms=300, tail_ms=150,
+                 max_utterance_s=20):
+        if samplerate not in SUPPORTED_RATES:
+            raise ValueError(f"webrtcvad supports {SUPPORTED_RATES} Hz, got {samplerate}")
+        if frame_ms not in (10, 20, 30):
+            raise ValueError("frame_ms must be 10, 20 or 30")
+        self.samplerate = samplerate
+        self.frame_len = samplerate * frame_ms // 1000
+        self.frame_ms = frame_ms
+        self.start_frames = max(1, start_ms // frame_ms)
+        self.hangover_frames = max(1, hangover_ms // frame_ms)
+        self.tail_frames = tail_ms // frame_ms
+        self._vad = webrtcvad.Vad(aggressiveness)
+        self._pending = np.zeros(0, dtype=np.int16)                  # < one frame of leftovers
+        self._pre_roll = deque(maxlen=max(1, pre_roll_ms // frame_ms))
+        self._utterance = PCMRingBuffer(samplerate, max_utterance_s)
+        self._voiced_run = 0
+        self._silence_run = 0
+        self.triggered = False
+        self.voiced_frames = 0
+        self.total_frames = 0
+
+    # ---------------------------
+    # Public API
+    # ---------------------------
+
+    def feed(self, samples):
+        """Add audio; returns the utterances (int16 arrays) completed by it."""
+        samples = np.asarray(samples, dtype=np.int16).reshape(-1)
+        if len(self._pending):
+            samples = np.concatenate((self._pending, samples))
+        n_frames = len(samples) // self.frame_len
+        self._pending = samples[n_frames * self.frame_len:].copy()
+
+        done = []
+        for i in range(n_frames):
+            frame = samples[i * self.frame_len:(i + 1) * self.frame_len]
+            utterance = self._process_frame(frame)
+            if utterance is not None:
+                done.append(utterance)
+        return done
+
+    def flush(self):
+        """End of stream: return the utterance in progress (or None)."""
+        if not self.triggered:
+            return None
+        return self._finish(trailing_silence=self._silence_run)
+
+    @property
+    def speech_started(self):
+        return self.triggered
+
+    # ---------------------------
+    # State machine
+    # ---------------------------
+
+    def _process_frame(self, frame):
+        self.total_frames += 1
+        voiced = self._vad.is_speech(frame.tobytes(), self.samplerate)
+        if voiced:
+            self.voiced_frames += 1
+
+        if not self.triggered:
+            self._pre_roll.append(frame)
+            self._voiced_run = self._voiced_run + 1 if voiced else 0
+            if self._voiced_run >= self.start_frames:
+                self.triggered = True
+                self._silence_run = 0
+                self._utterance.clear()
+                for f in self._pre_roll:
+                    self._utterance.append(f)
+                self._pre_roll.clear()
+            return None
+
+        self._utterance.append(frame)
+        self._silence_run = 0 if voiced else self._silence_run + 1
+        if self._silence_run >= self.hangover_frames:
+            return self._finish(trailing_silence=self._silence_run)
+        if len(self._utterance) >= self._utterance.capacity:
+            return self._finish(trailing_silence=0)
+        return None
+
+    def _finish(self, trailing_silence):
+        samples = self._utterance.samples()
+        trim = max(0, trailing_silence - self.tail_frames) * self.frame_len
+        if trim:
+            samples = samples[:len(samples) - trim]
+        self._utterance.clear()
+        self.triggered = False
+        self._voiced_run = 0
+        self._silence_run = 0
+        return samples
@@ -5,42 +5,32 @@ import soundfile as sf
 import streamlit as st
 from openai import AsyncOpenAI
 import os
+from fraud_ai.tts_cache import FIXED_PHRASES, get_tts_cache
+from fraud_ai.playback import PlaybackEngine, SoundDeviceSink
 
 # Prende la chiave API dalle secrets di Streamlit
 client = AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"))
 
 SAMPLERATE = 24000
 CHANNELS = 1
+TTS_MODEL = "gpt-4o-mini-tts"
+TTS_VOICE = "shimmer"
 
 
 async def speak_stream_text(text: str):
     """Genera audio TTS da testo e lo riproduce in Streamlit."""
-    leftover = b""
-
-    async with client.audio.speech.with_streaming_response.create(
-        model="gpt-4o-mini-tts",
-        voice="shimmer",
-        input=text,
-        response_format="pcm",
-    ) as response:
+    # Scrive in memoria come WAV (le frasi già sintetizzate arrivano dalla cache)
+    audio_buffer = io.BytesIO()
+    with sf.SoundFile(
+        audio_buffer, mode="w",
+        samplerate=SAMPLERATE, channels=CHANNELS,
+        subtype="PCM_16", format="WAV"
+    ) as f:
+        async for complete_bytes in cached_openai_stream_tts(text):
+            f.write(np.frombuffer(complete_bytes, dtype=np.int16))
 
-        # Scrive in memoria come WAV
-        audio_buffer = io.BytesIO()
-        with sf.SoundFile(
-            audio_buffer, mode="w",
-            samplerate=SAMPLERATE, channels=CHANNELS,
-            subtype="PCM_16", format="WAV"
-        ) as f:
-            async for chunk in response.iter_bytes():
-                chunk = leftover + chunk
-                full_count = len(chunk) // 2
-                complete_bytes = chunk[: full_count * 2]
-                leftover = chunk[full_count * 2:]
-                if complete_bytes:
-                    f.write(np.frombuffer(complete_bytes, dtype=np.int16))
-
-        audio_buffer.seek(0)
-        st.audio(audio_buffer, format="audio/wav")
+    audio_buffer.seek(0)
+    st.audio(audio_buffer, format="audio/wav")
 
 
 async def chat_and_speak(user_input: str):
@@ -63,3 +53,152 @@ async def chat_and_speak(user_input: str):
 
     # Dopo che la risposta è completa → la legge
     await speak_stream_text(full_text.strip())
+
+
+# ===========================
+# Sentence-level pipelined TTS
+# ===========================
+async def openai_stream_tts(text: str):
+    """Stream raw PCM (16-bit, mono, 24kHz) for `text`, aligned to full int16 frames."""
+    leftover = b""
+    async with client.audio.speech.with_streaming_response.create(
+        model=TTS_MODEL,
+        voice=TTS_VOICE,
+        input=text,
+        response_format="pcm",
+    ) as response:
+        async for chunk in response.iter_bytes():
+            chunk = leftover + chunk
+            full_count = len(chunk) // 2
+            complete_bytes = chunk[: full_count * 2]
+            leftover = chunk[full_count * 2:]
+            if complete_bytes:
+                yield complete_bytes
+
+
+# cache key part identifying the audio format, besides provider and voice
+TTS_CACHE_MODEL = f"{TTS_MODEL}/pcm_{SAMPLERATE}"
+
+
+async def cached_openai_stream_tts(text: str):
+    """openai_stream_tts through the shared TTS audio cache."""
+    async for pcm in get_tts_cache().stream(openai_stream_tts, "openai", TTS_VOICE, TTS_CACHE_MODEL, text):
+        yield pcm
+
+
+async def prewarm_tts_cache(phrases=FIXED_PHRASES):
+    return await get_tts_cache().prewarm(openai_stream_tts, "openai", TTS_VOICE, TTS_CACHE_MODEL, phrases)
+
+
+class StreamlitSentenceSink:
+    """Plays each finished sentence with st.audio (the browser cannot start on a partial WAV)."""
+
+    def __init__(self, samplerate=SAMPLERATE):
+        self.samplerate = samplerate
+        self._chunks = []
+
+    async def write(self, pcm: bytes):
+        self._chunks.append(pcm)
+
+    async def end_sentence(self):
+        if not self._chunks:
+            return
+        audio_buffer = io.BytesIO()
+        sf.write(audio_buffer, np.frombuffer(b"".join(self._chunks), dtype=np.int16),
+                 self.samplerate, subtype="PCM_16", format="WAV")
+        self._chunks = []
+        audio_buffer.seek(0)
+        st.audio(audio_buffer, format="audio/wav")
+
+    async def close(self):
+        await self.end_sentence()
+
+
+class DeviceSink:
+    """Plays PCM on the local sound card as soon as each chunk arrives (audio thread + jitter buffer)."""
+
+    def __init__(self, samplerate=SAMPLERATE):
+        self._engine = PlaybackEngine(SoundDeviceSink(samplerate, CHANNELS), samplerate=samplerate, channels=CHANNELS)
+
+    async def write(self, pcm: bytes):
+        await self._engine.write(pcm)
+
+    async def end_sentence(self):
+        pass
+
+    async def close(self):
+        await self._engine.close()
+
+    def stats(self):
+        return self._engine.stats()
+
+
+def default_sink():
+    """Browser playback inside a Streamlit app, the local sound card otherwise."""
+    try:
+        from streamlit.runtime import exists as streamlit_running
+        if streamlit_running():
+            return StreamlitSentenceSink()
+    except ImportError:
+        pass
+    return DeviceSink()
+
+
+async def openai_tts_worker(tts_queue: asyncio.Queue, sink=None, metrics=None, lookahead=2, synthesize=cached_openai_stream_tts):
+    """
+    Take sentences from `tts_queue` (None ends the reply), synthesize them with
+    up to `lookahead` requests in flight and play them in order.
+
+    Playback of a sentence starts on its first PCM chunk while the next
+    sentences are already being synthesized and the LLM keeps generating.
+    """
+    sink = sink or default_sink()
+    pending = asyncio.Queue()                 # per-sentence chunk queues, in order
+    in_flight = asyncio.Semaphore(lookahead)
+
+    async def synth_one(text, chunks):
+        try:
+            async for pcm in synthesize(text):
+                await chunks.put(pcm)
+        finally:
+            await chunks.put(None)
+            in_flight.release()
+
+    async def producer():
+        tasks = []
+        try:
+            while True:
+                text = await tts_queue.get()
+                if text is None:
+                    break
+                await in_flight.acquire()
+                chunks = asyncio.Queue()
+                tasks.append(asyncio.create_task(synth_one(text, chunks)))
+                await pending.put(chunks)
+        finally:
+            await pending.put(None)
+        await asyncio.gather(*tasks)
+
+    producer_task = asyncio.create_task(producer())
+    try:
+        while True:
+            chunks = await pending.get()
+            if chunks is None:
+                break
+            while True:
+                pcm = await chunks.get()
+                if pcm is None:
+                    break
+                if metrics is not None:
+                    metrics.mark_audio(len(pcm))
+                await sink.write(pcm)
+            await sink.end_sentence()
+            if metrics is not None:
+                metrics.mark_sentence()
+        await producer_task
+    finally:
+        if not producer_task.done():
+            producer_task.cancel()
+        await sink.close()
+        if metrics is not None and hasattr(sink, "stats"):
+            metrics.playback = sink.stats()
@@ -1,20 +1,17 @@
 import asyncio
-import nltk
-import aiohttp
-import numpy as np
-import sounddevice as sd
-from nltk.tokenize import sent_tokenize
+from fraud_ai.sentence_splitter import SentenceSplitter
 from openai import AsyncOpenAI
 from fraud_ai.config import OPENAI_API_KEY, ELEVEN_KEY
+from fraud_ai.tts_client import DEFAULT_VOICE_ID, get_tts_client, close_tts_client
+from fraud_ai.tts_cache import FIXED_PHRASES, get_tts_cache
+from fraud_ai.playback import PlaybackEngine, SoundDeviceSink
 
 # ===========================
 # CONFIG
 # ===========================
-nltk.download("punkt", quiet=True)
-
 ELEVENLABS_API_KEY = ELEVEN_KEY
 OPENAI_KEY = OPENAI_API_KEY
-VOICE_ID = "21m00Tcm4TlvDq8ikWAM"  # Replace with your ElevenLabs voice ID
+VOICE_ID = DEFAULT_VOICE_ID  # Replace with your ElevenLabs voice ID (see tts_client.py)
 
 SAMPLERATE = 22050
 CHANNELS = 1
@@ -29,67 +26,55 @@ async def elevenlabs_stream_tts(text: str):
     """
     Stream raw PCM (16-bit signed, mono, 22050Hz) from ElevenLabs
     and yield chunks aligned to full int16 frames.
+
+    Goes through the shared pooled client, so consecutive sentences reuse
+    the same keep-alive connection instead of opening a new session each.
     """
-    url = f"https://api.elevenlabs.io/v1/text-to-speech/{VOICE_ID}/stream?output_format=pcm_22050"
-
-    payload = {
-        "text": text,
-        "model_id": "eleven_turbo_v2_5",
-        "voice_settings": {
-            "stability": 0.35,
-            "similarity_boost": 0.75
-        }
-    }
-
-    headers = {
-        "Accept": "audio/wav",
-        "xi-api-key": ELEVENLABS_API_KEY,
-        "Content-Type": "application/json"
-    }
-
-    async with aiohttp.ClientSession() as session:
-        async with session.post(url, headers=headers, json=payload) as resp:
-            if resp.status != 200:
-                err_text = await resp.text()
-                raise RuntimeError(f"ElevenLabs TTS failed [{resp.status}]: {err_text}")
-
-            leftover = b""
-            async for net_chunk in resp.content.iter_chunked(4096):
-                if not net_chunk:
-                    continue
-
-                data = leftover + net_chunk
-                # Align to full int16 frames (2 bytes each sample)
-                frame_count = len(data) // 2
-                full_bytes = data[:frame_count * 2]
-                leftover = data[frame_count * 2:]
-
-                if full_bytes:
-                    yield full_bytes
-
-            # Flush any leftover full frames at the end
-            if leftover:
-                if len(leftover) % 2 != 0:
-                    leftover = leftover[:-1]  # drop stray byte
-                if leftover:
-                    yield leftover
+    async for pcm_chunk in get_tts_client().stream(text, voice_id=VOICE_ID):
+        yield pcm_chunk
+
+
+def _cache_model():
+    # model and output format of the shared client: both change the audio
+    client = get_tts_client()
+    return f"{client.model_id}/{client.output_format}"
+
+
+async def cached_elevenlabs_stream_tts(text: str):
+    """elevenlabs_stream_tts through the shared TTS audio cache (fixed phrases play with no round trip)."""
+    async for pcm_chunk in get_tts_cache().stream(elevenlabs_stream_tts, "elevenlabs", VOICE_ID, _cache_model(), text):
+        yield pcm_chunk
+
+
+async def prewarm_tts_cache(phrases=FIXED_PHRASES):
+    return await get_tts_cache().prewarm(elevenlabs_stream_tts, "elevenlabs", VOICE_ID, _cache_model(), phrases)
 
 # ===========================
 # TTS Playback Worker
 # ===========================
-async def tts_worker(tts_queue: asyncio.Queue):
-    """Continuously takes text from queue, streams from ElevenLabs, and plays it."""
-    with sd.OutputStream(samplerate=SAMPLERATE, channels=CHANNELS, dtype=DTYPE) as stream:
+async def tts_worker(tts_queue: asyncio.Queue, metrics=None, sink=None):
+    """
+    Continuously takes text from queue, streams from ElevenLabs, and plays it.
+
+    Playback runs on the PlaybackEngine's audio thread (sound card by
+    default, any playback sink otherwise); when its jitter buffer is full,
+    reading from the network waits instead of blocking the event loop.
+    """
+    engine = PlaybackEngine(sink or SoundDeviceSink(SAMPLERATE, CHANNELS), samplerate=SAMPLERATE, channels=CHANNELS)
+    async with engine:
         while True:
             text = await tts_queue.get()
             if text is None:
                 break
-            async for pcm_chunk in elevenlabs_stream_tts(text):
-                # Safety trim in case of unexpected odd-length chunk
-                if len(pcm_chunk) % 2 != 0:
-                    pcm_chunk = pcm_chunk[:-1]
-                audio_data = np.frombuffer(pcm_chunk, dtype=np.int16)
-                stream.write(audio_data)
+            async for pcm_chunk in cached_elevenlabs_stream_tts(text):
+                if metrics is not None:
+                    metrics.mark_audio(len(pcm_chunk))
+                await engine.write(pcm_chunk)
+            if metrics is not None:
+                metrics.mark_sentence()
+        await engine.drain()
+    if metrics is not None:
+        metrics.playback = engine.stats()
 
 # ===========================
 # GPT Chat + Sentence TTS
@@ -101,7 +86,7 @@ async def chat_and_speak_live(user_input):
     tts_queue = asyncio.Queue()
     tts_task = asyncio.create_task(tts_worker(tts_queue))
 
-    buffer = ""
+    splitter = SentenceSplitter()
     stream = await client.chat.completions.create(
         model="gpt-4o-mini",
         messages=[{"role": "user", "content": user_input}],
@@ -113,17 +98,14 @@ async def chat_and_speak_live(user_input):
         if delta and delta.content:
             token = delta.content
             print(token, end="", flush=True)
-            buffer += token
 
             # Sentence splitting
-            sentences = sent_tokenize(buffer)
-            if len(sentences) > 1:
-                for s in sentences[:-1]:
-                    await tts_queue.put(s.strip())
-                buffer = sentences[-1]
+            for s in splitter.feed(token):
+                await tts_queue.put(s)
 
-    if buffer.strip():
-        await tts_queue.put(buffer.strip())
+    rest = splitter.flush()
+    if rest:
+        await tts_queue.put(rest)
 
     await tts_queue.put(None)
     await tts_task
@@ -134,15 +116,18 @@ async def chat_and_speak_live(user_input):
 # ===========================
 async def main():
     print("💬 Type 'quit' to exit.\n")
-    while True:
-        user_input = input("You: ").strip()
-        if user_input.lower() in {"quit", "exit"}:
-            print("👋 Goodbye!")
-            break
-        try:
-            await chat_and_speak_live(user_input)
-        except Exception as e:
-            print(f"\n❌ Error: {e}\n")
+    try:
+        while True:
+            user_input = input("You: ").strip()
+            if user_input.lower() in {"quit", "exit"}:
+                print("👋 Goodbye!")
+                break
+            try:
+                await chat_and_speak_live(user_input)
+            except Exception as e:
+                print(f"\n❌ Error: {e}\n")
+    finally:
+        await close_tts_client()
 
 if __name__ == "__main__":
     asyncio.run(main())
\ No newline at end of file
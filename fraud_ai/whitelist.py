@@ -1,37 +1,41 @@
 from sqlalchemy.orm import Session
+from .data import with_session
 from .models import Whitelist
-from datetime import datetime, timedelta
+from . import card_status, expiry
 
 # CREATE
+@with_session
 def add_to_whitelist(db: Session, card_number: str):
     entry = Whitelist(card_number=card_number)
     db.add(entry)
     db.commit()
+    card_status.invalidate(card_number)
     db.refresh(entry)
     return entry
 
 # READ (by card number)
+@with_session
 def is_card_whitelisted(db: Session, card_number: str):
     return db.query(Whitelist).filter(Whitelist.card_number == card_number).first()
 
 # READ (all)
+@with_session
 def get_whitelist(db: Session):
     return db.query(Whitelist).all()
 
 # DELETE (by card number)
+@with_session
 def remove_from_whitelist(db: Session, card_number: str):
     entry = is_card_whitelisted(db, card_number)
     if entry:
         db.delete(entry)
         db.commit()
+        card_status.invalidate(card_number)
         return True
     return False
 
-# CLEANUP: Remove expired whitelist entries (older than 30 min)
+# CLEANUP: Remove expired whitelist entries (older than 30 min), in one DELETE (see expiry.py)
+@with_session
 def cleanup_expired_whitelist(db: Session, expiry_minutes=30):
-    expiry_time = datetime.utcnow() - timedelta(minutes=expiry_minutes)
-    expired = db.query(Whitelist).filter(Whitelist.whitelisted_at < expiry_time).all()
-    for entry in expired:
-        db.delete(entry)
-    db.commit()
-    return len(expired)
\ No newline at end of file
+    policy = expiry.whitelist_policy(expiry_minutes)
+    return expiry.sweep(db, [policy]).deleted[policy.table]
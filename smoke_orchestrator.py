@@ -0,0 +1,180 @@
+# smoke_orchestrator.py
+"""
+End-to-end smoke run of fraud_ai.orchestrator.CallOrchestrator with the real
+full_fraud_flow, on a throwaway SQLite database and without network access.
+
+Every call gets the same scripted customer (identity confirmed, transactions
+not recognised, nothing else to add, no further help) and a scripted
+stand-in for the OpenAI client. The run fails unless every alert is closed
+exactly once, the transactions are flagged as fraud, the cards are blocked
+and the transcripts are written.
+
+With --streaming the customer is heard through the streaming STT path
+(a ScriptedSTTProvider per turn) instead of the keyboard.
+
+    python smoke_orchestrator.py --alerts 8 --concurrency 4 [--streaming]
+
+Exits non-zero on failure.
+"""
+import argparse
+import asyncio
+import builtins
+import contextlib
+import io
+import json
+import os
+import sys
+import tempfile
+from contextvars import ContextVar
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+import numpy as np
+
+DB_PATH = os.path.join(tempfile.mkdtemp(prefix="fraud_ai_smoke_"), "smoke.db")
+os.environ["FRAUD_AI_DATABASE_URL"] = f"sqlite:///{DB_PATH}"
+os.environ["FRAUD_AI_DB_PROFILE"] = "production"
+
+from fraud_ai import aio, fraud_flow, llm_agent                    # noqa: E402  (after the env)
+from fraud_ai.conversation import get_conversation                 # noqa: E402
+from fraud_ai.orchestrator import CallOrchestrator, STATUS_CLOSED  # noqa: E402
+from fraud_ai.streaming_stt import get_provider, iter_chunks        # noqa: E402
+
+# greeting, alerted transaction, investigation, second transaction, help offer
+CUSTOMER_SCRIPT = ["yes it's me", "no", "nothing else", "no", "no"]
+
+_answers = ContextVar("answers")
+
+
+def scripted_input(prompt=""):
+    return next(_answers.get(), "goodbye")
+
+
+def scripted_transcript_streams(alert):
+    """transcript_stream of one call: each turn speaks the next scripted answer."""
+    answers = iter(CUSTOMER_SCRIPT)
+    silence = np.zeros(16000 * 3, dtype=np.int16)   # the scripted provider only counts samples
+
+    def turn():
+        provider = get_provider("scripted", transcript=next(answers, "goodbye"))
+        return provider.stream(iter_chunks(silence))
+    return turn
+
+
+# ---------------------------
+# Scripted OpenAI client
+# ---------------------------
+
+class _Stream:
+    def __init__(self, text):
+        self._words = iter(text.split(" "))
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        word = next(self._words, None)
+        if word is None:
+            raise StopAsyncIteration
+        await asyncio.sleep(0)
+        delta = SimpleNamespace(content=word + " ")
+        return SimpleNamespace(choices=[SimpleNamespace(delta=delta)])
+
+    async def close(self):
+        pass
+
+
+class ScriptedLLM:
+    """Answers chat.completions.create like the API would, without calling it."""
+
+    def __init__(self):
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+        self.requests = 0
+
+    async def create(self, messages, stream=False, **kwargs):
+        self.requests += 1
+        await asyncio.sleep(0.01)
+        if stream:
+            return _Stream("Thank you. I understand, let me take care of that for you.")
+        if '"summary"' in messages[-1]["content"]:
+            content = json.dumps({"summary": "Customer did not recognise the transactions.",
+                                  "actions": ["BLOCK_CARD"]})
+        else:
+            content = "REPEAT"        # classification the fast path could not settle
+        message = SimpleNamespace(content=content)
+        return SimpleNamespace(choices=[SimpleNamespace(message=message, finish_reason="stop")],
+                               usage=SimpleNamespace(completion_tokens=len(content.split())))
+
+
+async def scripted_flow(*args, **kwargs):
+    _answers.set(iter(CUSTOMER_SCRIPT))
+    return await fraud_flow.full_fraud_flow(*args, **kwargs)
+
+
+# ---------------------------
+# Run
+# ---------------------------
+
+async def seed(n_alerts):
+    await aio.init_db()
+    start = datetime.utcnow() - timedelta(hours=1)
+    alert_ids = []
+    for i in range(n_alerts):
+        card = f"4000{i:012d}"
+        for minutes in (0, 5):          # an earlier transaction, then the alerted one
+            tx = await aio.create_transaction(None, card_number=card, amount=25.0 + i,
+                                              timestamp=start + timedelta(minutes=minutes),
+                                              merchant_name="Smoke Shop",
+                                              customer_first_name="Mario", customer_last_name="Rossi")
+        alert_ids.append((await aio.create_alert(None, tx.id)).id)
+    return alert_ids
+
+
+async def run(args):
+    alert_ids = await seed(args.alerts)
+    orchestrator = CallOrchestrator(max_concurrent_calls=args.concurrency, call_timeout=30,
+                                    poll_interval=0.05, tts_backend="text", flow=scripted_flow,
+                                    transcript_streams=scripted_transcript_streams if args.streaming else None)
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output if not args.verbose else sys.stdout):
+        stats = await orchestrator.run(until_idle=True)
+
+    failures = []
+    if stats["started"] != args.alerts or stats["completed"] != args.alerts:
+        failures.append(f"expected {args.alerts} completed calls exactly once, got {stats}")
+    for alert_id in alert_ids:
+        alert = await aio.get_alert(None, alert_id)
+        tx = await aio.get_transaction(None, alert.transaction_id)
+        if alert.status != STATUS_CLOSED:
+            failures.append(f"alert {alert_id}: status {alert.status}")
+        if not tx.is_fraud:
+            failures.append(f"alert {alert_id}: transaction not flagged as fraud")
+        if not await aio.is_card_blocked(None, tx.card_number):
+            failures.append(f"alert {alert_id}: card not blocked")
+        if len(get_conversation(None, alert_id)) < 2 * len(CUSTOMER_SCRIPT):
+            failures.append(f"alert {alert_id}: transcript incomplete")
+    return stats, failures
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--alerts", type=int, default=8)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--streaming", action="store_true", help="answer through streaming STT")
+    parser.add_argument("--verbose", action="store_true", help="show the call transcripts")
+    args = parser.parse_args()
+
+    llm = ScriptedLLM()
+    fraud_flow.client = llm_agent.async_client = llm
+    if not args.streaming:
+        builtins.input = scripted_input
+
+    stats, failures = asyncio.run(run(args))
+    print(f"database {DB_PATH}")
+    print(f"orchestrator {stats}  llm requests {llm.requests}")
+    for failure in failures:
+        print("FAIL", failure)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())